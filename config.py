@@ -1,7 +1,23 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+def _load_dotenv():
+    # Same lookup as dotenv.find_dotenv() from this file (walk up to the first .env), but
+    # python-dotenv itself is only imported when there is a file to load
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
+
+
+_load_dotenv()
 
 # LLM Configuration
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
@@ -15,11 +31,51 @@ OPEN_WEBUI_API_KEY = os.getenv("OPEN_WEBUI_API_KEY", "")
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.0"))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "1"))
 
+# Planning Mode: joint (one PDDL problem for the whole fleet) or decomposed (per-robot subproblems)
+PLANNING_MODE = os.getenv("PLANNING_MODE", "joint").lower()
+PLANNER_WORKERS = int(os.getenv("PLANNER_WORKERS", "0")) or None
+
+# Allocation: optional re-solve deadline (seconds) for the incremental allocator, 0 = solve to optimality
+ALLOCATION_TIME_LIMIT = float(os.getenv("ALLOCATION_TIME_LIMIT", "0")) or None
+
+# Tracing: per-stage timing spans (always on in run_eval) and optional Chrome trace export path
+TRACING = os.getenv("TRACING", "False").lower() == "true"
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+
+# Sweeps: concurrent trials per LLM provider (a local server thrashes when it has to juggle models)
+# and an optional global cap on in-flight trials, 0 = sum of the provider limits
+SWEEP_PROVIDER_LIMITS = os.getenv("SWEEP_PROVIDER_LIMITS", "ollama=1,openwebui=2,openai=4")
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "0")) or None
+
+# Pipelined trials (run_eval.py --pipeline): workers per stage and queue depth between stages
+PIPELINE_WORKERS = os.getenv("PIPELINE_WORKERS", "llm=2,milp=1,planner=2")
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+
+# ROS node: worker threads for instructions (0 = handle inline in the callback), waiting-queue bound,
+# what to drop when it is full (oldest, newest, supersede) and max seconds a request may wait (0 = no limit)
+NODE_WORKERS = int(os.getenv("NODE_WORKERS", "2"))
+NODE_QUEUE_SIZE = int(os.getenv("NODE_QUEUE_SIZE", "8"))
+NODE_DROP_POLICY = os.getenv("NODE_DROP_POLICY", "oldest").lower()
+NODE_MAX_AGE_S = float(os.getenv("NODE_MAX_AGE_S", "0")) or None
+
+# AI2-THOR execution: fast mode drops the on-screen pauses and move interpolation, and saves frames
+# only with THOR_CAPTURE_FRAMES (written in the background); headless renders without an X display
+THOR_FAST = os.getenv("THOR_FAST", "False").lower() == "true"
+THOR_CAPTURE_FRAMES = os.getenv("THOR_CAPTURE_FRAMES", "").lower()
+THOR_CAPTURE_FRAMES = None if not THOR_CAPTURE_FRAMES else THOR_CAPTURE_FRAMES == "true"
+THOR_HEADLESS = os.getenv("THOR_HEADLESS", "False").lower() == "true"
+
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TESTCASES_DIR = os.path.join(BASE_DIR, "testcases")
 RESULTS_DIR = os.path.join(BASE_DIR, "results")
 
+# Results sink: csv, parquet (partitioned store in RESULTS_DIR/store, needs pyarrow) or both
+RESULTS_FORMAT = os.getenv("RESULTS_FORMAT", "both").lower()
+
+# Successful parses are recorded here for LLM-free replay (evaluation/replay_corpus.py); empty disables
+PARSE_CORPUS = os.getenv("PARSE_CORPUS", os.path.join(RESULTS_DIR, "parse_corpus.jsonl"))
+
 # Hybrid Mode
 FALLBACK_TO_CLOUD = os.getenv("FALLBACK_TO_CLOUD", "False").lower() == "true"
 CLOUD_FALLBACK_MODEL = os.getenv("CLOUD_FALLBACK_MODEL", "gpt-4o")
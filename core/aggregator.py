@@ -0,0 +1,263 @@
+import os
+import json
+import math
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+from core.results_store import normalize_row
+
+GROUP_KEYS = ("model", "provider", "quantization")
+# Trial field -> stage name; per-stage timings logged as 'stage_<name>' (seconds) are picked up too
+STAGE_FIELDS = {"latency": "parse"}
+STAGE_PREFIX = "stage_"
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    Mergeable relative-error quantile sketch (DDSketch-style log buckets).
+    Values land in bucket ceil(log_gamma(x)); any quantile is returned within
+    `relative_accuracy` of the true value, and two sketches merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        if value <= 1e-9:
+            self.zero_count += 1
+            value = max(value, 0.0)
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.sum_sq += value * value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_sq += other.sum_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        # Sample standard deviation, as pandas reports it
+        if self.count < 2:
+            return None
+        var = (self.sum_sq - self.sum * self.sum / self.count) / (self.count - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(k): n for k, n in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "sum_sq": self.sum_sq,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data.get("relative_accuracy", 0.01))
+        sketch.bins = {int(k): n for k, n in data.get("bins", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.sum_sq = data.get("sum_sq", 0.0)
+        sketch.min = data["min"] if data.get("min") is not None else math.inf
+        sketch.max = data["max"] if data.get("max") is not None else -math.inf
+        return sketch
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+class StreamingAggregator:
+    """
+    Running per-(model, provider, quantization) summaries: trial, success and retry
+    counts, logical score sums, and one QuantileSketch per pipeline stage.
+    Aggregators merge, so per-batch deltas can be folded into a persisted total.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.groups: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    def _group(self, key: Tuple[str, str, str]) -> Dict[str, Any]:
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {"count": 0, "success": 0, "retries": 0.0, "logical_score": 0.0, "stages": {}}
+        return group
+
+    def _sketch(self, group: Dict[str, Any], stage: str) -> QuantileSketch:
+        sketch = group["stages"].get(stage)
+        if sketch is None:
+            sketch = group["stages"][stage] = QuantileSketch(self.relative_accuracy)
+        return sketch
+
+    def add(self, row: Dict[str, Any]):
+        """
+        Folds one logger/CSV/store row into its group.
+        """
+        row = normalize_row(row)
+        group = self._group(tuple(row[k] for k in GROUP_KEYS))
+        group["count"] += 1
+        group["success"] += int(bool(row.get("success")))
+        group["retries"] += row.get("retries") or 0
+        group["logical_score"] += row.get("logical_score") or 0.0
+
+        for field, value in row.items():
+            stage = STAGE_FIELDS.get(field) or (field[len(STAGE_PREFIX):] if field.startswith(STAGE_PREFIX) else None)
+            if stage is None:
+                continue
+            value = _to_float(value)
+            if value is not None:
+                self._sketch(group, stage).add(value)
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.add(row)
+
+    def merge(self, other: "StreamingAggregator"):
+        for key, theirs in other.groups.items():
+            ours = self._group(key)
+            for field in ("count", "success", "retries", "logical_score"):
+                ours[field] += theirs[field]
+            for stage, sketch in theirs["stages"].items():
+                self._sketch(ours, stage).merge(sketch)
+
+    def summary(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        One row per (group, stage) with rates, mean/std and percentiles; O(groups).
+        :param filters: {model/provider/quantization: value or list of values}
+        """
+        rows = []
+        for key, group in sorted(self.groups.items()):
+            labels = dict(zip(GROUP_KEYS, key))
+            if not all(labels[col] in (want if isinstance(want, (list, tuple, set)) else [want])
+                       for col, want in (filters or {}).items() if col in labels):
+                continue
+            n = group["count"]
+            for stage, sketch in sorted(group["stages"].items()):
+                row = dict(labels, stage=stage, count=n,
+                           validity_rate=100.0 * group["success"] / n if n else 0.0,
+                           logical_rate=100.0 * group["logical_score"] / n if n else 0.0,
+                           avg_retries=group["retries"] / n if n else 0.0,
+                           latency_mean=sketch.mean, latency_std=sketch.std)
+                for q in PERCENTILES:
+                    row[f"p{int(q * 100)}"] = sketch.quantile(q)
+                rows.append(row)
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "groups": [
+                dict(zip(GROUP_KEYS, key), count=g["count"], success=g["success"], retries=g["retries"],
+                     logical_score=g["logical_score"], stages={s: sk.to_dict() for s, sk in g["stages"].items()})
+                for key, g in self.groups.items()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingAggregator":
+        agg = cls(data.get("relative_accuracy", 0.01))
+        for item in data.get("groups", []):
+            group = agg._group(tuple(item[k] for k in GROUP_KEYS))
+            for field in ("count", "success", "retries", "logical_score"):
+                group[field] = item.get(field, 0)
+            group["stages"] = {s: QuantileSketch.from_dict(sk) for s, sk in item.get("stages", {}).items()}
+        return agg
+
+
+class SummaryFile:
+    """
+    Persisted StreamingAggregator (JSON). `update` merges a batch under an exclusive
+    lock and swaps the file in atomically, so several loggers can feed one summary.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            from config import RESULTS_DIR
+            path = os.path.join(RESULTS_DIR, "summaries.json")
+        self.path = path
+        self.lockpath = path + ".lock"
+
+    def load(self) -> StreamingAggregator:
+        if not os.path.exists(self.path):
+            return StreamingAggregator()
+        with open(self.path, 'r') as f:
+            return StreamingAggregator.from_dict(json.load(f))
+
+    def update(self, rows: Iterable[Dict[str, Any]]):
+        delta = StreamingAggregator()
+        delta.add_rows(rows)
+        if delta.groups:
+            self._write(delta, merge=True)
+
+    def replace(self, aggregator: StreamingAggregator):
+        self._write(aggregator, merge=False)
+
+    def _write(self, aggregator: StreamingAggregator, merge: bool):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.lockpath, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                total = self.load() if merge else StreamingAggregator(aggregator.relative_accuracy)
+                total.merge(aggregator)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(total.to_dict(), f)
+                os.replace(tmp_path, self.path)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,94 @@
+import os
+import json
+import hashlib
+import datetime
+import threading
+from typing import Dict, Any, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+
+def run_id(**params) -> str:
+    """
+    Deterministic ID for an evaluation run: the same parameters always give the same ID,
+    so a restarted run finds its checkpoint. Leave the trial count out of `params` to let
+    a resumed run extend an earlier one.
+    """
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"run-{digest[:12]}"
+
+
+def cell_key(model: str, provider: str, quantization: str, testcase: str, trial: int) -> str:
+    return f"{provider}|{model}|{quantization}|{testcase}|{trial}"
+
+
+class Checkpoint:
+    """
+    Append-only journal of completed (model, testcase, trial) cells for one run, in
+    RESULTS_DIR/checkpoints/<run_id>.jsonl. The first line describes the run; every
+    completed cell is one line appended with a single O_APPEND write under an exclusive
+    lock, so concurrent threads and processes never interleave or tear entries, and a
+    line cut short by a crash is ignored on load.
+    Mark a cell only once its results row is written (BenchmarkingLogger on_written).
+    """
+
+    def __init__(self, run: str, checkpoint_dir: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
+                 resume: bool = True):
+        if checkpoint_dir is None:
+            from config import RESULTS_DIR
+            checkpoint_dir = os.path.join(RESULTS_DIR, "checkpoints")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.run_id = run
+        self.path = os.path.join(checkpoint_dir, f"{run}.jsonl")
+        self._lock = threading.Lock()
+        self._done: Set[str] = set()
+
+        if resume and os.path.exists(self.path):
+            self._done = self._load()
+        else:
+            # Fresh run: swap in a journal holding only the header
+            header = {"run_id": run, "params": params or {}, "started": datetime.datetime.now().isoformat()}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(json.dumps(header, default=str) + "\n")
+            os.replace(tmp_path, self.path)
+
+    def _load(self) -> Set[str]:
+        done = set()
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line
+                if "cell" in entry:
+                    done.add(entry["cell"])
+        return done
+
+    def is_done(self, key: str) -> bool:
+        with self._lock:
+            return key in self._done
+
+    def completed(self) -> Set[str]:
+        with self._lock:
+            return set(self._done)
+
+    def mark(self, key: str, **info):
+        """
+        Records a completed cell.
+        """
+        line = (json.dumps(dict(info, cell=key), default=str) + "\n").encode()
+        with self._lock:
+            if key in self._done:
+                return
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                os.write(fd, line)
+            finally:
+                os.close(fd)  # releases the lock
+            self._done.add(key)
@@ -0,0 +1,192 @@
+import json
+import os
+import re
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from core.tracing import traced
+from core.predicates import predicate_args, predicate_name
+from core.optimizer import WH_PER_COST_UNIT
+from core.robot_profiles import get_registry
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config')
+SCENE_LOCATIONS_PATH = os.path.join(CONFIG_DIR, 'scene_locations.json')
+
+# Fixed on-site time per task kind (seconds), on top of travel
+MANIPULATION_TIME_S = 5.0
+SENSING_TIME_S = 3.0
+DEFAULT_START_LOCATION = "floor6_charging_dock"
+
+
+def load_scene_locations(scene: str) -> Dict[str, Dict[str, float]]:
+    """
+    Named locations for a scene; scenes without their own entry use the FloorPlan1 demo map.
+    """
+    try:
+        with open(SCENE_LOCATIONS_PATH, 'r') as f:
+            scenes = json.load(f)
+    except Exception:
+        return {}
+    return dict(scenes.get(scene, scenes.get("FloorPlan1", {})))
+
+
+class CostMatrices:
+    """
+    Robot x task time (s) and energy (Wh) matrices, row/column aligned with robots/tasks.
+    """
+
+    def __init__(self, robots: List[str], tasks: List[str], time_s: np.ndarray, energy_wh: np.ndarray):
+        self.robots = robots
+        self.tasks = tasks
+        self.time_s = time_s
+        self.energy_wh = energy_wh
+
+    @property
+    def allocation_costs(self) -> np.ndarray:
+        """
+        Energy in the MILP's cost unit, so it is comparable with the battery capacities it is checked against.
+        """
+        return self.energy_wh / WH_PER_COST_UNIT
+
+    def as_dict(self, kind: str = "energy") -> Dict[str, Dict[str, float]]:
+        """
+        Nested {robot: {task: cost}} view for callers that still take dict costs.
+        :param kind: 'energy' (Wh), 'time' (s) or 'allocation' (MILP cost units)
+        """
+        matrix = {"energy": self.energy_wh, "time": self.time_s, "allocation": self.allocation_costs}[kind]
+        return {r: dict(zip(self.tasks, row.tolist())) for r, row in zip(self.robots, matrix)}
+
+
+class CostModel:
+    """
+    Builds robot x task time and energy matrices in one vectorized NumPy pass
+    from config/robot_profiles.json (speed, power draw) and scene geometry.
+    Pairwise location distances are computed once per scene and cached.
+    """
+
+    def __init__(self, scene: str = "FloorPlan1"):
+        self.scene = scene
+        # scene -> (location name -> index, coordinates [N, 2], distances [N, N])
+        self._distance_cache: Dict[str, Tuple[Dict[str, int], np.ndarray, np.ndarray]] = {}
+        # scene -> regex matching any location name, for tasks written as move_to_lab
+        self._name_patterns: Dict[str, "re.Pattern"] = {}
+
+    @property
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        return get_registry().profiles
+
+    def _resolve_profile(self, robot: str) -> Dict[str, Any]:
+        return get_registry().resolve(robot)
+
+    def distance_matrix(self, scene: Optional[str] = None) -> Tuple[Dict[str, int], np.ndarray]:
+        """
+        Floor-plane (x, z) Euclidean distances between every named location of a scene.
+        :return: ({location: index}, distances [N, N])
+        """
+        scene = scene or self.scene
+        if scene not in self._distance_cache:
+            locations = load_scene_locations(scene)
+            index = {name: i for i, name in enumerate(locations)}
+            coords = np.array([[p["x"], p["z"]] for p in locations.values()], dtype=float).reshape(len(locations), 2)
+            diff = coords[:, None, :] - coords[None, :, :]
+            self._distance_cache[scene] = (index, coords, np.sqrt((diff ** 2).sum(axis=-1)))
+        index, _, distances = self._distance_cache[scene]
+        return index, distances
+
+    def register_scene(self, scene: str, locations: Dict[str, Dict[str, float]],
+                       edges: Optional[List[Tuple[str, str]]] = None):
+        """
+        Adds a scene that is not in config/scene_locations.json (e.g. a generated testcase).
+        :param locations: {name: {'x': ..., 'z': ...}}
+        :param edges: Optional corridors between locations; distances are then shortest paths along them.
+        """
+        index = {name: i for i, name in enumerate(locations)}
+        coords = np.array([[p["x"], p["z"]] for p in locations.values()], dtype=float).reshape(len(locations), 2)
+        diff = coords[:, None, :] - coords[None, :, :]
+        straight = np.sqrt((diff ** 2).sum(axis=-1))
+        distances = straight
+        if edges:
+            distances = np.full_like(straight, np.inf)
+            np.fill_diagonal(distances, 0.0)
+            for a, b in edges:
+                i, j = index[a], index[b]
+                distances[i, j] = distances[j, i] = straight[i, j]
+            # Floyd-Warshall, one vectorized relaxation per intermediate location
+            for k in range(len(index)):
+                np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+            distances = np.where(np.isinf(distances), straight, distances)
+        self._distance_cache[scene] = (index, coords, distances)
+        self._name_patterns.pop(scene, None)
+
+    @staticmethod
+    def robot_locations_from_state(initial_state: List[str]) -> Dict[str, str]:
+        """
+        {entity: location} from at(entity, location) predicates.
+        """
+        locations = {}
+        for p in initial_state:
+            args = predicate_args(p)
+            if predicate_name(p) == "at" and len(args) == 2:
+                locations[args[0]] = args[1]
+        return locations
+
+    def _name_pattern(self, scene: str, index: Dict[str, int]) -> Optional["re.Pattern"]:
+        if scene not in self._name_patterns:
+            # Whole tokens only (hall is not halls); longest names first so floor6_hallway beats hallway
+            names = sorted(index, key=len, reverse=True)
+            alternation = "|".join(map(re.escape, names))
+            self._name_patterns[scene] = re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])") if names else None
+        return self._name_patterns[scene]
+
+    def _task_locations(self, tasks: List[str], index: Dict[str, int], entity_locations: Dict[str, str],
+                        scene: Optional[str] = None) -> np.ndarray:
+        """
+        Location index per task: the last argument that is a known location, or whose
+        object sits at one. Tasks written as move_to_lab fall back to a name match. -1 if unknown.
+        """
+        # One name -> location index table; a location name wins over an entity of the same name
+        lookup = {e: index[loc] for e, loc in entity_locations.items() if loc in index}
+        lookup.update(index)
+        pattern = self._name_pattern(scene or self.scene, index)
+
+        def key(task: str) -> Optional[str]:
+            resolved = [a for a in predicate_args(task) if a in lookup]
+            if resolved:
+                return resolved[-1]
+            matches = pattern.findall(task.lower()) if pattern else []
+            return max(matches, key=len) if matches else None
+
+        return np.fromiter((lookup.get(key(t), -1) for t in tasks), dtype=int, count=len(tasks))
+
+    @traced("cost_model")
+    def build(self, robots: List[str], tasks: List[str], initial_state: Optional[List[str]] = None,
+              robot_locations: Optional[Dict[str, str]] = None, scene: Optional[str] = None) -> CostMatrices:
+        """
+        :param initial_state: PDDL-style predicates; at(...) facts locate robots and objects.
+        :param robot_locations: Explicit {robot: location} overrides.
+        """
+        index, distances = self.distance_matrix(scene)
+        entity_locations = self.robot_locations_from_state(initial_state or [])
+        entity_locations.update({k.lower(): v.lower() for k, v in (robot_locations or {}).items()})
+
+        default = index.get(DEFAULT_START_LOCATION, 0)
+        robot_loc = np.array([index.get(entity_locations.get(r.lower()), default) for r in robots], dtype=int)
+        task_loc = self._task_locations(tasks, index, entity_locations, scene)
+
+        profiles = get_registry().resolve_all(robots)
+        speed = np.array([p.get("base_speed_mps", 0.8) for p in profiles], dtype=float)
+        move_w = np.array([p.get("move_power_w", 30.0) for p in profiles], dtype=float)
+        idle_w = np.array([p.get("idle_power_w", 7.0) for p in profiles], dtype=float)
+
+        service = np.zeros(len(tasks))
+        lowered = [t.lower() for t in tasks]
+        service[[("pick" in t or "place" in t or "open" in t) for t in lowered]] = MANIPULATION_TIME_S
+        service[[("detect" in t or "search" in t) for t in lowered]] = SENSING_TIME_S
+
+        if len(index):
+            travel_m = np.where(task_loc[None, :] >= 0, distances[robot_loc[:, None], np.maximum(task_loc, 0)[None, :]], 0.0)
+        else:
+            travel_m = np.zeros((len(robots), len(tasks)))
+        travel_s = travel_m / speed[:, None]
+        time_s = travel_s + service[None, :]
+        energy_wh = (move_w[:, None] * travel_s + idle_w[:, None] * service[None, :]) / 3600.0
+        return CostMatrices(robots, tasks, time_s, energy_wh)
@@ -0,0 +1,202 @@
+import os
+import re
+import copy
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from core.pddl_generator import PDDLGenerator
+from core.planner_client import FastDownwardClient
+from core.predicates import predicate_args
+from core.tracing import traced
+
+
+def _mentions(task: str, entity: str) -> bool:
+    """
+    Whole-token match of an entity inside a free-form task string (e.g. red_block in
+    pick_up_red_block), so block_1 does not match pick_up(block_10).
+    """
+    return re.search(rf"(?<![a-z0-9]){re.escape(entity)}(?![a-z0-9])", task) is not None
+
+
+def _solve_problem(executable_path: str, domain_path: str, problem_pddl: str) -> Optional[List[str]]:
+    """
+    Writes a PDDL problem to a private temp file and runs Fast Downward on it.
+    Module-level so it can be shipped to a process pool worker.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        problem_path = os.path.join(tmpdir, "problem.pddl")
+        with open(problem_path, "w") as f:
+            f.write(problem_pddl)
+        return FastDownwardClient(executable_path).run_planner(domain_path, problem_path)
+
+
+class DecomposedPlanner:
+    """
+    Plans multi-robot problems by splitting the goals along the MILP allocation.
+    Each robot gets an independent single-robot PDDL subproblem; subproblems are
+    solved concurrently in a process pool and merged into a multi-robot schedule.
+    Falls back to a single joint problem whenever the subproblems interact.
+    """
+
+    def __init__(self, planner: Optional[FastDownwardClient] = None, pddl_gen: Optional[PDDLGenerator] = None,
+                 max_workers: Optional[int] = None):
+        self.planner = planner or FastDownwardClient()
+        self.pddl_gen = pddl_gen or PDDLGenerator()
+        self.max_workers = max_workers
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def decompose(self, data: Dict[str, Any], allocation: Dict[str, List[str]]) -> Tuple[Optional[Dict[str, Dict[str, Any]]], Optional[str]]:
+        """
+        Splits a parsed task into per-robot subproblems.
+        :return: ({robot: sub_data}, None) or (None, reason) if the robots interact.
+        """
+        robots = [r.lower() for r in data.get("robots", [])]
+        goals = data.get("goal_predicates", [])
+        initial_state = data.get("initial_state", [])
+        if len(robots) < 2:
+            return None, "single robot"
+        if not goals:
+            return None, "no goals"
+
+        # Entities that are only ever used as a place are shared freely between robots;
+        # anything that moves or carries state (opened, switchedOn, ...) is not.
+        stateful = set()
+        for p in initial_state + goals:
+            args = predicate_args(p)
+            if args and args[0] not in robots:
+                stateful.add(args[0])
+
+        # Entities each robot touches through its allocated tasks
+        objects = [o.lower() for o in data.get("objects", [])]
+        alloc = {r.lower(): tasks for r, tasks in allocation.items()}
+        touched = {}
+        for r in robots:
+            entities = {r}
+            for t in alloc.get(r, []):
+                t = t.lower()
+                entities.update(predicate_args(t))
+                entities.update(o for o in objects if _mentions(t, o))
+            touched[r] = entities
+
+        # Attribute each goal to exactly one robot via its subject argument
+        goals_by_robot = {r: [] for r in robots}
+        for g in goals:
+            args = predicate_args(g)
+            if not args:
+                return None, f"cannot attribute goal {g}"
+            subject = args[0]
+            if subject in robots:
+                owners = [subject]
+            else:
+                owners = [r for r in robots if subject in touched[r]]
+            if len(owners) != 1:
+                return None, f"goal {g} has {len(owners)} candidate robots"
+            goals_by_robot[owners[0]].append(g)
+
+        # Robots interact if their goals share a movable or stateful entity
+        claimed = {}
+        for r, r_goals in goals_by_robot.items():
+            for g in r_goals:
+                for a in predicate_args(g):
+                    if a in robots or a not in stateful:
+                        continue
+                    if claimed.setdefault(a, r) != r:
+                        return None, f"{a} is shared by {claimed[a]} and {r}"
+
+        subproblems = {}
+        for r in robots:
+            if not goals_by_robot[r]:
+                continue
+            others = set(robots) - {r}
+            sub = copy.deepcopy(data)
+            sub["robots"] = [r]
+            sub["goal_predicates"] = goals_by_robot[r]
+            sub["initial_state"] = [p for p in initial_state if not others.intersection(predicate_args(p))]
+            sub["objects"] = [o for o in data.get("objects", []) if o.lower() not in others]
+            sub["tasks"] = alloc.get(r, [])
+            subproblems[r] = sub
+        return subproblems, None
+
+    def plan_joint(self, domain_path: str, data: Dict[str, Any]) -> Optional[List[str]]:
+        problem = self.pddl_gen.generate_problem_skeleton(copy.deepcopy(data))
+        return _solve_problem(self.planner.executable_path, domain_path, problem)
+
+    @traced("plan_decomposed")
+    def plan(self, domain_path: str, data: Dict[str, Any], allocation: Dict[str, List[str]],
+             on_subplan: Optional[Callable[[str, List[str], str], None]] = None) -> Dict[str, Any]:
+        """
+        Plans per robot when the allocation decomposes the goals, jointly otherwise.
+        :param on_subplan: Called as on_subplan(robot, plan, problem_pddl) as soon as each robot's
+                           subplan is found, before the others finish. If a later subproblem fails
+                           the result falls back to joint planning, so treat these as provisional.
+        :return: Dict with the merged 'plan', per-robot 'schedule', 'mode' and 'fallback_reason'.
+        """
+        domain_abs = os.path.abspath(domain_path)
+        subproblems, reason = self.decompose(data, allocation)
+
+        if subproblems:
+            pool = self._get_pool()
+            problems = {r: self.pddl_gen.generate_problem_skeleton(sub, problem_name=f"robotics_task_{r}")
+                        for r, sub in subproblems.items()}
+            futures = {pool.submit(_solve_problem, self.planner.executable_path, domain_abs, problem): r
+                       for r, problem in problems.items()}
+            schedule = {}
+            for future in as_completed(futures):
+                r = futures[future]
+                schedule[r] = future.result()
+                if on_subplan and schedule[r] is not None:
+                    on_subplan(r, schedule[r], problems[r])
+            schedule = {r: schedule[r] for r in subproblems}
+            failed = [r for r, p in schedule.items() if p is None]
+            if not failed:
+                return {
+                    "plan": self.merge(schedule),
+                    "schedule": schedule,
+                    "mode": "decomposed",
+                    "subproblems": len(subproblems),
+                    "fallback_reason": None
+                }
+            reason = f"subproblem failed for {', '.join(failed)}"
+
+        logging.info(f"Decomposition not applicable ({reason}); planning jointly")
+        plan = self.plan_joint(domain_abs, data)
+        return {
+            "plan": plan,
+            "schedule": None,
+            "mode": "joint",
+            "subproblems": 0,
+            "fallback_reason": reason
+        }
+
+    @staticmethod
+    def merge(schedule: Dict[str, List[str]]) -> List[str]:
+        """
+        Interleaves independent per-robot plans into one sequential plan.
+        Step k of every robot comes before step k+1 of any robot, so the list
+        doubles as a timestep schedule for parallel execution.
+        """
+        merged = []
+        plans = [schedule[r] for r in sorted(schedule)]
+        for k in range(max((len(p) for p in plans), default=0)):
+            for p in plans:
+                if k < len(p):
+                    merged.append(p[k])
+        return merged
@@ -0,0 +1,181 @@
+import time
+import threading
+import itertools
+import collections
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+DROP_POLICIES = ("oldest", "newest", "supersede")
+
+
+class Request:
+    """
+    One accepted instruction. Identical instructions submitted while it is pending or
+    running are coalesced onto it (their IDs are in `coalesced`) and share its outcome.
+    """
+
+    def __init__(self, request_id: int, instruction: str, key: str):
+        self.id = request_id
+        self.instruction = instruction
+        self.key = key
+        self.received = time.monotonic()
+        self.started: Optional[float] = None
+        self.coalesced: List[int] = []
+        self.outcome: Optional[str] = None
+        self.error: Optional[str] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Blocks until the request finished or was dropped.
+        :return: The handler's outcome, 'dropped', 'failed', or None on timeout.
+        """
+        self._done.wait(timeout)
+        return self.outcome
+
+
+class InstructionDispatcher:
+    """
+    Runs `handler(instruction, request_id) -> outcome` on a bounded pool of worker threads so the
+    caller (a ROS subscription callback) returns immediately.
+    - Coalescing: an instruction identical (up to whitespace) to one already pending or
+      running is attached to it instead of being computed again.
+    - Backpressure: at most `queue_size` requests wait; when full, policy 'oldest' drops
+      the longest-waiting one, 'newest' rejects the incoming one. Policy 'supersede'
+      drops every waiting request as soon as a newer instruction arrives.
+    - Staleness: a request that waited longer than `max_age` seconds is dropped at dequeue.
+    Every transition is reported to `on_status` as a dict with 'id' and 'status'; it is
+    called under the dispatcher's lock, so it must be quick and must not submit.
+    """
+
+    def __init__(self, handler: Callable[[str, int], Optional[str]], workers: int = 2, queue_size: int = 8,
+                 policy: str = "oldest", max_age: Optional[float] = None,
+                 on_status: Optional[Callable[[Dict[str, Any]], None]] = None):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{policy}' (expected one of {', '.join(DROP_POLICIES)})")
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 1)
+        self.policy = policy
+        self.max_age = max_age
+        self.on_status = on_status
+        self.counts: Dict[str, int] = collections.Counter()
+        self._pending: Deque[Request] = collections.deque()
+        self._inflight: Dict[str, Request] = {}
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._closing = False
+        self._threads = [threading.Thread(target=self._work, name=f"dispatch-{w}", daemon=True) for w in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def key(instruction: str) -> str:
+        return " ".join(instruction.split())
+
+    def _status(self, request: Request, status: str, **info):
+        self.counts[status] += 1
+        if self.on_status:
+            self.on_status(dict(info, id=request.id, status=status))
+
+    def _drop(self, request: Request, reason: str):
+        # Caller holds the condition lock
+        self._inflight.pop(request.key, None)
+        request.outcome = "dropped"
+        request._done.set()
+        self._status(request, "dropped", reason=reason, coalesced=request.coalesced)
+
+    def submit(self, instruction: str) -> Request:
+        """
+        Queues an instruction without waiting for it.
+        :return: The request that will carry its outcome (an earlier one if coalesced).
+        """
+        key = self.key(instruction)
+        with self._cond:
+            request_id = next(self._ids)
+            existing = self._inflight.get(key)
+            if existing is not None:
+                existing.coalesced.append(request_id)
+                self.counts["coalesced"] += 1
+                if self.on_status:
+                    self.on_status({"id": request_id, "status": "coalesced", "into": existing.id})
+                return existing
+
+            request = Request(request_id, instruction, key)
+            if self._closing:
+                request.outcome = "dropped"
+                request._done.set()
+                self._status(request, "rejected", reason="shutting_down")
+                return request
+            if self.policy == "supersede":
+                while self._pending:
+                    self._drop(self._pending.popleft(), f"superseded_by_{request.id}")
+            elif len(self._pending) >= self.queue_size:
+                if self.policy == "newest":
+                    request.outcome = "dropped"
+                    request._done.set()
+                    self._status(request, "rejected", reason="queue_full", queue_depth=len(self._pending))
+                    return request
+                self._drop(self._pending.popleft(), "queue_full")
+
+            self._pending.append(request)
+            self._inflight[key] = request
+            self._status(request, "accepted", queue_depth=len(self._pending))
+            self._cond.notify()
+            return request
+
+    def _next(self) -> Optional[Request]:
+        with self._cond:
+            while True:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return None
+                request = self._pending.popleft()
+                waited = time.monotonic() - request.received
+                if self.max_age is not None and waited > self.max_age:
+                    self._drop(request, "stale")
+                    continue
+                request.started = time.monotonic()
+                self._status(request, "started", waited=round(waited, 3))
+                return request
+
+    def _work(self):
+        while True:
+            request = self._next()
+            if request is None:
+                return
+            start = time.monotonic()
+            try:
+                request.outcome = self.handler(request.instruction, request.id) or "done"
+                status = "done"
+            except Exception as e:
+                request.outcome, request.error = "failed", repr(e)
+                status = "failed"
+            with self._cond:
+                # Identical instructions arriving from here on start a fresh computation
+                self._inflight.pop(request.key, None)
+                self._status(request, status, outcome=request.outcome, error=request.error,
+                             seconds=round(time.monotonic() - start, 3), coalesced=request.coalesced)
+            request._done.set()
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def close(self, wait: bool = True):
+        """
+        Stops the workers. With wait=True queued requests are still processed first,
+        otherwise they are dropped; running requests always finish.
+        """
+        with self._cond:
+            self._closing = True
+            if not wait:
+                while self._pending:
+                    self._drop(self._pending.popleft(), "shutdown")
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,76 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Any, Set
+
+
+class FrameWriter:
+    """
+    Saves simulator frames (RGB arrays) as PNGs on a small thread pool, so execution does not
+    wait for PNG encoding and disk writes. At most `max_pending` frames are held in memory
+    (queued or being written); submit() blocks once that many are outstanding.
+    """
+
+    def __init__(self, directory: str = ".", workers: int = 2, max_pending: int = 8):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.written = 0
+        self.failed = 0
+        # Seconds submit() spent waiting for a free slot (the writer falling behind)
+        self.blocked_s = 0.0
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="frame-writer")
+
+    def submit(self, frame: Any, name: str) -> str:
+        """
+        Queues one frame; the array must not be modified afterwards (AI2-THOR returns a fresh one per step).
+        :return: The path the frame will be written to.
+        """
+        path = os.path.join(self.directory, name)
+        start = time.perf_counter()
+        self._slots.acquire()
+        self.blocked_s += time.perf_counter() - start
+        future = self._pool.submit(self._write, frame, path)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return path
+
+    def _write(self, frame: Any, path: str):
+        try:
+            import PIL.Image
+            PIL.Image.fromarray(frame).save(path)
+            with self._lock:
+                self.written += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logging.warning(f"Failed to write frame {path}: {e}")
+        finally:
+            self._slots.release()
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def flush(self):
+        """
+        Blocks until every frame submitted so far is on disk.
+        """
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -1,21 +1,48 @@
 import os
 import time
 import logging
-from typing import Dict, Any, Optional
-import openai
+from typing import Callable, Dict, Any, Optional
 from config import (
     LLM_PROVIDER, LLM_MODEL, OLLAMA_BASE_URL, 
     OPENAI_API_KEY, TEMPERATURE, MAX_RETRIES,
     FALLBACK_TO_CLOUD, CLOUD_FALLBACK_MODEL,
     OPEN_WEBUI_BASE_URL, OPEN_WEBUI_API_KEY
 )
-from core.schema import validate_json_response, get_empty_schema
+from core.tracing import span
+
+SCHEMA_EXAMPLES = {
+    "tasks": '["task1", "task2"]',
+    "objects": '["obj1", "obj2"]',
+    "initial_state": '["predicate1(arg1)", "predicate2(arg1, arg2)"]',
+    "constraints": '["constraint1"]',
+    "robots": '["robot1", "robot2"]',
+    "goal_predicates": '["predicate1(arg1)", "predicate2(arg1, arg2)"]',
+}
+# Everything the PDDL problem needs comes first, so a streamed parse can start planning early.
+# Streamed and plain parses share this order so their latencies stay comparable.
+FIELD_ORDER = ["robots", "objects", "initial_state", "goal_predicates", "tasks", "constraints"]
+
+
+def build_system_prompt(field_order=FIELD_ORDER) -> str:
+    schema = ",\n".join(f'  "{name}": {SCHEMA_EXAMPLES[name]}' for name in field_order)
+    return f"""You are a robotics planning assistant. 
+Your goal is to parse natural language instructions into a structured JSON format for multi-robot coordination.
+You MUST output ONLY a valid JSON object matching this schema:
+{{
+{schema}
+}}
+Ensure all predicates use PDDL-style formatting like 'at(robot1, location1)'."""
+
 
 class LLMClient:
     def __init__(self, provider: str = LLM_PROVIDER, model: str = LLM_MODEL):
         self.provider = provider.lower()
         self.model = model
-        
+
+        # Deferred: the openai SDK takes most of a second to import and scripts that never
+        # build a client (visualizer, benchmarks, offline replays) should not pay for it
+        import openai
+
         if self.provider == "openai":
             self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
         elif self.provider == "ollama":
@@ -37,60 +64,20 @@ class LLMClient:
         Calls the LLM to parse a natural language instruction into JSON.
         Includes schema enforcement and retry logic.
         """
-        if system_prompt is None:
-            system_prompt = f"""You are a robotics planning assistant. 
-Your goal is to parse natural language instructions into a structured JSON format for multi-robot coordination.
-You MUST output ONLY a valid JSON object matching this schema:
-{{
-  "tasks": ["task1", "task2"],
-  "objects": ["obj1", "obj2"],
-  "initial_state": ["predicate1(arg1)", "predicate2(arg1, arg2)"],
-  "constraints": ["constraint1"],
-  "robots": ["robot1", "robot2"],
-  "goal_predicates": ["predicate1(arg1)", "predicate2(arg1, arg2)"]
-}}
-Ensure all predicates use PDDL-style formatting like 'at(robot1, location1)'."""
+        return self._parse(instruction, system_prompt, self._complete)
 
-        retries = 0
-        while retries <= MAX_RETRIES:
-            start_time = time.time()
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": instruction}
-                    ],
-                    temperature=TEMPERATURE,
-                    response_format={"type": "json_object"} if self.provider == "openai" else None
-                )
-                
-                content = response.choices[0].message.content
-                latency = time.time() - start_time
-                
-                parsed_json = validate_json_response(content)
-                if parsed_json:
-                    return {
-                        "data": parsed_json,
-                        "latency": latency,
-                        "retries": retries,
-                        "success": True,
-                        "provider": self.provider,
-                        "model": self.model
-                    }
-                
-                logging.warning(f"Malformed JSON on attempt {retries + 1} from {self.model}")
-            except Exception as e:
-                logging.error(f"LLM call failed: {e}")
-                latency = time.time() - start_time
-
-            retries += 1
+    def _failed(self, instruction: str, system_prompt: str, retries: int, stream: bool = False,
+                on_fields: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        from core.schema import get_empty_schema
 
         # Check for Hybrid Fallback
         if FALLBACK_TO_CLOUD and self.provider == "ollama":
             logging.info(f"Falling back to cloud model: {CLOUD_FALLBACK_MODEL}")
             fallback_client = LLMClient(provider="openai", model=CLOUD_FALLBACK_MODEL)
-            result = fallback_client.parse_instruction(instruction, system_prompt)
+            if stream:
+                result = fallback_client.parse_instruction_stream(instruction, system_prompt, on_fields)
+            else:
+                result = fallback_client.parse_instruction(instruction, system_prompt)
             result["fallback_occurred"] = True
             return result
 
@@ -102,3 +89,88 @@ Ensure all predicates use PDDL-style formatting like 'at(robot1, location1)'."""
             "provider": self.provider,
             "model": self.model
         }
+
+    def parse_instruction_stream(self, instruction: str, system_prompt: Optional[str] = None,
+                                 on_fields: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Like parse_instruction, but streams the completion and calls on_fields(fields) with
+        all top-level JSON fields closed so far each time another one closes. A retry starts
+        a fresh scan, so on_fields may see the same fields again with different values.
+        """
+        return self._parse(instruction, system_prompt, lambda messages: self._complete_stream(messages, on_fields),
+                           stream=True, on_fields=on_fields)
+
+    def _parse(self, instruction: str, system_prompt: Optional[str], complete: Callable[[list], str],
+               stream: bool = False, on_fields: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Retry/validate loop shared by both parse methods.
+        :param complete: Sends the chat messages and returns the completion text.
+        """
+        # pydantic model construction is slow; loaded with the first parse, like the SDK
+        from core.schema import validate_json_response
+
+        if system_prompt is None:
+            system_prompt = build_system_prompt()
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": instruction}
+        ]
+
+        retries = 0
+        with span("llm", provider=self.provider, model=self.model, **({"stream": True} if stream else {})):
+            while retries <= MAX_RETRIES:
+                start_time = time.time()
+                try:
+                    with span("llm.request", attempt=retries):
+                        content = complete(messages)
+                    latency = time.time() - start_time
+
+                    with span("llm.schema"):
+                        parsed_json = validate_json_response(content)
+                    if parsed_json:
+                        return {
+                            "data": parsed_json,
+                            "latency": latency,
+                            "retries": retries,
+                            "success": True,
+                            "provider": self.provider,
+                            "model": self.model
+                        }
+
+                    logging.warning(f"Malformed JSON on attempt {retries + 1} from {self.model}")
+                except Exception as e:
+                    logging.error(f"LLM call failed: {e}")
+
+                retries += 1
+
+        return self._failed(instruction, system_prompt, retries, stream=stream, on_fields=on_fields)
+
+    def _complete(self, messages: list) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=TEMPERATURE,
+            response_format={"type": "json_object"} if self.provider == "openai" else None
+        )
+        return response.choices[0].message.content
+
+    def _complete_stream(self, messages: list, on_fields: Optional[Callable[[Dict[str, Any]], None]]) -> str:
+        from core.partial_json import PartialJSONObject
+
+        scanner = PartialJSONObject()
+        parts = []
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=TEMPERATURE,
+            response_format={"type": "json_object"} if self.provider == "openai" else None,
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content or ""
+            parts.append(text)
+            if scanner.feed(text) and on_fields:
+                on_fields(dict(scanner.fields))
+        return "".join(parts)
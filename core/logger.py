@@ -1,30 +1,85 @@
+import atexit
 import csv
 import os
 import datetime
-from typing import Dict, Any
+import logging
+import threading
+import uuid
+from typing import Dict, Any, List, Optional, Callable
+
+from core.results_store import open_store
+from core.aggregator import SummaryFile
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+# Core columns, always first and in this order; any other scalar trial field is appended after them
+BASE_HEADERS = [
+    "timestamp", "model", "provider", "instruction_id",
+    "success", "latency", "retries", "json_valid",
+    "fallback_used", "quantization", "logical_score"
+]
+# Trial fields already mapped onto a core column (or too large for a CSV cell)
+_SKIP_FIELDS = {"data", "fallback_occurred"}
+
 
 class BenchmarkingLogger:
-    def __init__(self, filename: str = "benchmarking_results.csv"):
-        from config import RESULTS_DIR
-        if not os.path.exists(RESULTS_DIR):
-            os.makedirs(RESULTS_DIR)
-        
-        self.filepath = os.path.join(RESULTS_DIR, filename)
-        self.headers = [
-            "timestamp", "model", "provider", "instruction_id", 
-            "success", "latency", "retries", "json_valid", 
-            "fallback_used", "quantization", "logical_score"
-        ]
-        
+    """
+    Buffered CSV logger for benchmark trials.
+    Rows are queued in memory and written by a background thread once `flush_every`
+    rows are pending or `flush_interval` seconds have passed, and always on close/exit.
+    Writes hold an exclusive lock on a sidecar .lock file so several threads or
+    processes can share one CSV. New per-trial fields extend the header instead of
+    being dropped; the file is rewritten once when its schema grows.
+    With results_format 'parquet' or 'both', each batch also goes to the partitioned
+    ResultsStore under results_dir/store (CSV only if pyarrow is missing); close() merges
+    this logger's batch files into one file per partition.
+    Each batch is also folded into the running latency sketches in results_dir/summaries.json.
+    """
+
+    def __init__(self, filename: str = "results_benchmarking.csv", flush_every: int = 50,
+                 flush_interval: float = 2.0, results_dir: Optional[str] = None,
+                 results_format: Optional[str] = None, summarize: bool = True):
+        if results_dir is None:
+            from config import RESULTS_DIR
+            results_dir = RESULTS_DIR
+        if results_format is None:
+            from config import RESULTS_FORMAT
+            results_format = RESULTS_FORMAT
+        os.makedirs(results_dir, exist_ok=True)
+
+        self.store = open_store(os.path.join(results_dir, "store")) if results_format in ("parquet", "both") else None
+        self.write_csv = results_format != "parquet" or self.store is None
+        self._store_prefix = f"run-{uuid.uuid4().hex}-"
+        self._store_batches = 0
+        self.summaries = SummaryFile(os.path.join(results_dir, "summaries.json")) if summarize else None
+        self.filepath = os.path.join(results_dir, filename)
+        self.lockpath = self.filepath + ".lock"
+        self.headers = list(BASE_HEADERS)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._on_written: List[Callable[[], None]] = []
+        self._buffer_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
         # Initialize file with headers if it doesn't exist
-        if not os.path.exists(self.filepath):
-            with open(self.filepath, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=self.headers)
-                writer.writeheader()
+        if self.write_csv:
+            self._write_rows([])
+
+        self._thread = threading.Thread(target=self._flush_loop, name="BenchmarkingLogger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
 
-    def log_trial(self, trial_data: Dict[str, Any]):
+    def log_trial(self, trial_data: Dict[str, Any], on_written: Optional[Callable[[], None]] = None):
         """
-        Logs a single trial result to the CSV file.
+        Queues a single trial result for the CSV file.
+        :param on_written: Called from the flushing thread once the row's batch has been written.
         """
         row = {
             "timestamp": datetime.datetime.now().isoformat(),
@@ -39,7 +94,139 @@ class BenchmarkingLogger:
             "quantization": trial_data.get("quantization", "none"),
             "logical_score": trial_data.get("logical_score", 0.0)
         }
-        
-        with open(self.filepath, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=self.headers)
-            writer.writerow(row)
+        # Keep every other scalar field (planning_success, plan_length, per-stage metrics, ...)
+        for key, value in trial_data.items():
+            if key not in row and key not in _SKIP_FIELDS and (value is None or isinstance(value, (str, int, float, bool))):
+                row[key] = value
+
+        with self._buffer_lock:
+            if self._closed:
+                raise RuntimeError("BenchmarkingLogger is closed")
+            self._buffer.append(row)
+            if on_written is not None:
+                self._on_written.append(on_written)
+            pending = len(self._buffer)
+        if pending >= self.flush_every:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Writes all buffered rows now.
+        """
+        with self._io_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+                callbacks, self._on_written = self._on_written, []
+            if not rows:
+                return
+            try:
+                self._write_batch(rows)
+            except Exception:
+                # Put the batch back so the next flush retries it
+                with self._buffer_lock:
+                    self._buffer[:0] = rows
+                    self._on_written[:0] = callbacks
+                raise
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"on_written callback failed: {e}")
+
+    def close(self):
+        """
+        Stops the background thread and flushes what is left. Safe to call twice.
+        """
+        with self._buffer_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=self.flush_interval + 5.0)
+        self.flush()
+        if self.store is not None and self._store_batches > 1:
+            try:
+                # Only this run's files: other loggers may still be writing to the store
+                self.store.compact(prefix=self._store_prefix)
+            except Exception as e:
+                logging.error(f"Results store compaction failed: {e}")
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"BenchmarkingLogger flush failed: {e}")
+
+    def _write_batch(self, rows: List[Dict[str, Any]]):
+        if self.write_csv:
+            self._write_rows(rows)
+        if self.store is not None:
+            try:
+                self.store.write(rows, basename=f"{self._store_prefix}{self._store_batches}")
+                self._store_batches += 1
+            except Exception as e:
+                # The CSV already holds this batch; only retry when the store is the sole sink
+                if not self.write_csv:
+                    raise
+                logging.error(f"Results store write failed: {e}")
+        if self.summaries is not None:
+            try:
+                self.summaries.update(rows)
+            except Exception as e:
+                # Summaries can be rebuilt from the raw results (visualize_results.py --rebuild-summaries)
+                logging.error(f"Summary update failed: {e}")
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        with open(self.lockpath, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                existing = self._read_header()
+                headers = existing or list(BASE_HEADERS)
+                new_fields = []
+                for row in rows:
+                    for key in row:
+                        if key not in headers and key not in new_fields:
+                            new_fields.append(key)
+
+                if existing is None:
+                    with open(self.filepath, 'w', newline='') as f:
+                        writer = csv.DictWriter(f, fieldnames=headers + new_fields, restval="")
+                        writer.writeheader()
+                        writer.writerows(rows)
+                elif new_fields:
+                    self._rewrite_with_headers(headers + new_fields, rows)
+                else:
+                    with open(self.filepath, 'a', newline='') as f:
+                        writer = csv.DictWriter(f, fieldnames=headers, restval="")
+                        writer.writerows(rows)
+                self.headers = headers + new_fields
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_header(self) -> Optional[List[str]]:
+        if not os.path.exists(self.filepath) or os.path.getsize(self.filepath) == 0:
+            return None
+        with open(self.filepath, 'r', newline='') as f:
+            return next(csv.reader(f), None)
+
+    def _rewrite_with_headers(self, headers: List[str], rows: List[Dict[str, Any]]):
+        # Schema grew: copy old rows under the wider header, then swap the file in atomically
+        tmp_path = self.filepath + ".tmp"
+        with open(self.filepath, 'r', newline='') as src, open(tmp_path, 'w', newline='') as dst:
+            writer = csv.DictWriter(dst, fieldnames=headers, restval="")
+            writer.writeheader()
+            writer.writerows(csv.DictReader(src))
+            writer.writerows(rows)
+        os.replace(tmp_path, self.filepath)
@@ -1,97 +1,382 @@
-import pulp
-import json
-import os
-from typing import List, Dict, Any
+import numpy as np
+from typing import List, Dict, Any, Optional, Union
+from core.tracing import traced
+from core.robot_profiles import get_registry
+
+# Tolerance when checking the greedy assignment against battery capacities
+CAPACITY_TOL = 1e-9
+# Allocation costs and battery capacities share one unit of 10 Wh (the scale of hand-written
+# demo costs); CostModel energies in Wh are converted via CostMatrices.allocation_costs
+WH_PER_COST_UNIT = 10.0
 
 class MILPOptimizer:
     """
     Mixed-Integer Linear Programming optimizer for multi-robot task allocation.
     Uses PuLP to minimize global travel costs while respecting robot capabilities.
+    Easy instances (battery constraints slack, or a single robot) are solved
+    exactly in-process with NumPy; CBC is only spawned when capacities bind.
     """
 
     def __init__(self):
-        # Load robot profiles
-        profiles_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            'config', 'robot_profiles.json'
-        )
-        try:
-            with open(profiles_path, 'r') as f:
-                self.profiles = json.load(f)
-        except Exception:
-            self.profiles = {}
-
-    def allocate_tasks(self, robots: List[str], tasks: List[str], costs: Dict[str, Dict[str, float]], capabilities: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        # Which solver handled the last allocate_tasks call: "fast", "cbc" or "infeasible"
+        self.last_solver = None
+
+    @property
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        return get_registry().profiles
+
+    def _resolve_profile(self, robot: str) -> Dict[str, Any]:
+        """
+        Match robot instance to profile (e.g. limo_scout1 -> limo_scout).
+        """
+        return get_registry().resolve(robot)
+
+    @staticmethod
+    def _capability_mask(profiles: List[Dict[str, Any]], tasks: List[str]) -> np.ndarray:
+        """
+        Boolean matrix [robot, task], True where the robot may take the task.
+        """
+        needs_manip = np.array([("pick" in t or "place" in t or "open" in t) for t in tasks], dtype=bool)
+        needs_sense = np.array([("detect" in t or "search" in t) for t in tasks], dtype=bool)
+        can_manip = np.array(["can_manipulate" in p.get("capabilities", []) for p in profiles], dtype=bool)
+        can_sense = np.array(["can_sense" in p.get("capabilities", []) for p in profiles], dtype=bool)
+        # A task is forbidden if it requires manipulation/sensing the robot lacks
+        return ~(needs_manip[None, :] & ~can_manip[:, None]) & ~(needs_sense[None, :] & ~can_sense[:, None])
+
+    @staticmethod
+    def _battery_capacities(profiles: List[Dict[str, Any]]) -> np.ndarray:
+        # Battery in Wh converted to allocation cost units
+        return np.array([p.get("battery_capacity_wh", 150) / WH_PER_COST_UNIT for p in profiles], dtype=float)
+
+    @traced("milp")
+    def allocate_tasks(self, robots: List[str], tasks: List[str], costs: Union[Dict[str, Dict[str, float]], np.ndarray], capabilities: Dict[str, List[str]]) -> Dict[str, List[str]]:
         """
         Allocate tasks to robots to minimize total cost.
         :param robots: List of robot IDs.
         :param tasks: List of task IDs.
-        :param costs: Nested dict {robot: {task: cost}}.
+        :param costs: Nested dict {robot: {task: cost}}, or a [robot, task] matrix (e.g. from CostModel).
         :param capabilities: Dict {robot: [task_type1, task_type2]}.
         :return: Dict {robot: [task1, task2, ...]}.
         """
+        if isinstance(costs, np.ndarray):
+            cost_matrix = costs.astype(float).reshape(len(robots), len(tasks))
+        else:
+            cost_matrix = np.array([[costs[r][t] for t in tasks] for r in robots], dtype=float).reshape(len(robots), len(tasks))
+        profiles = get_registry().resolve_all(robots)
+        feasible = self._capability_mask(profiles, tasks)
+        capacity = self._battery_capacities(profiles)
+
+        allocation = self._solve_fast(robots, tasks, cost_matrix, feasible, capacity)
+        if allocation is None:
+            allocation = self._solve_cbc(robots, tasks, cost_matrix, feasible, capacity)
+        return allocation
+
+    @traced("milp.fast")
+    def _solve_fast(self, robots: List[str], tasks: List[str], cost_matrix: np.ndarray, feasible: np.ndarray, capacity: np.ndarray) -> Optional[Dict[str, List[str]]]:
+        """
+        Exact in-process solve for the easy structures.
+        Without battery limits the problem separates per task, so each task goes to
+        its cheapest capable robot. That assignment is optimal for the relaxation,
+        hence optimal overall whenever it also respects every battery capacity.
+        Returns None when capacities bind and CBC is needed.
+        """
+        allocation = {r: [] for r in robots}
+        if not tasks:
+            self.last_solver = "fast"
+            return allocation
+
+        # A task no robot can perform makes the whole problem infeasible
+        if not robots or not feasible.any(axis=0).all():
+            self.last_solver = "infeasible"
+            return allocation
+
+        masked = np.where(feasible, cost_matrix, np.inf)
+        choice = masked.argmin(axis=0)
+        load = np.bincount(choice, weights=cost_matrix[choice, np.arange(len(tasks))], minlength=len(robots))
+
+        if (load <= capacity + CAPACITY_TOL).all():
+            self.last_solver = "fast"
+            for j, i in enumerate(choice):
+                allocation[robots[i]].append(tasks[j])
+            return allocation
+
+        # A single robot has no alternative assignment: over capacity means infeasible
+        if len(robots) == 1:
+            self.last_solver = "infeasible"
+            return allocation
+
+        return None
+
+    @traced("milp.build")
+    def _build_model(self, robots: List[str], tasks: List[str], cost_matrix: np.ndarray, feasible: np.ndarray, capacity: np.ndarray):
+        """
+        Builds the sparse allocation MILP: variables exist only for capable robot-task pairs.
+        :return: (problem, {(robot_idx, task_idx): variable})
+        """
+        # PuLP is only imported once an instance actually needs CBC; _solve_fast covers the rest
+        import pulp
+
         # Create the LP problem
         prob = pulp.LpProblem("MultiRobotAllocation", pulp.LpMinimize)
 
-        # Decision variables: x[r][t] = 1 if robot r is assigned to task t
-        x = pulp.LpVariable.dicts("x", (robots, tasks), 0, 1, pulp.LpBinary)
+        # Decision variables: x[i, j] = 1 if robot i is assigned to task j (feasible pairs only)
+        x = {}
+        by_robot = [[] for _ in robots]
+        by_task = [[] for _ in tasks]
+        for i, j in zip(*np.nonzero(feasible)):
+            i, j = int(i), int(j)
+            var = pulp.LpVariable(f"x_{i}_{j}", 0, 1, pulp.LpBinary)
+            x[i, j] = var
+            by_robot[i].append((var, cost_matrix[i, j]))
+            by_task[j].append((var, 1))
 
         # Objective Function: Minimize total cost
-        prob += pulp.lpSum([costs[r][t] * x[r][t] for r in robots for t in tasks])
+        prob += pulp.LpAffineExpression([term for terms in by_robot for term in terms])
 
-        # Constraint 1: Each task must be assigned to exactly one robot
-        for t in tasks:
-            prob += pulp.lpSum([x[r][t] for r in robots]) == 1
+        # Constraint 1: Each task must be assigned to exactly one capable robot
+        for j in range(len(tasks)):
+            prob += pulp.LpAffineExpression(by_task[j]) == 1, f"assign_{j}"
 
-        # Constraint 2: Robot must have the capability for the assigned task
-        for r in robots:
-            # Match robot instance to profile
-            profile_name = "limo_standard"
-            for p_name in self.profiles:
-                if p_name in r:
-                    profile_name = p_name
-                    break
-            profile = self.profiles.get(profile_name, {})
-            caps = profile.get("capabilities", [])
-            
-            for t in tasks:
-                # If task requires manipulation but robot lacks it, forbid assignment
-                if "pick" in t or "place" in t or "open" in t:
-                    if "can_manipulate" not in caps:
-                        prob += x[r][t] == 0
-                # If task requires sensing but robot lacks it, forbid assignment
-                if "detect" in t or "search" in t:
-                    if "can_sense" not in caps:
-                        prob += x[r][t] == 0
-
-        # Constraint 3: Battery constraints
-        # Assume energy cost is proportional to travel cost + fixed task cost
-        for r in robots:
-            profile_name = "limo_standard"
-            for p_name in self.profiles:
-                if p_name in r:
-                    profile_name = p_name
-                    break
-            profile = self.profiles.get(profile_name, {})
-            # Battery in Wh converted to arbitrary cost units for demo
-            capacity = profile.get("battery_capacity_wh", 150) / 10.0 
-            
-            # Simple energy model: cost[r][t] is the energy consumed
-            prob += pulp.lpSum([costs[r][t] * x[r][t] for t in tasks]) <= capacity
+        # Constraint 2: Battery constraints
+        # Simple energy model: cost[r][t] is the energy consumed
+        for i in range(len(robots)):
+            prob += pulp.LpAffineExpression(by_robot[i]) <= capacity[i], f"battery_{i}"
+
+        return prob, x
+
+    @traced("milp.cbc")
+    def _solve_cbc(self, robots: List[str], tasks: List[str], cost_matrix: np.ndarray, feasible: np.ndarray, capacity: np.ndarray) -> Dict[str, List[str]]:
+        import pulp
+        prob, x = self._build_model(robots, tasks, cost_matrix, feasible, capacity)
 
         # Solve the problem
         prob.solve(pulp.PULP_CBC_CMD(msg=0))
 
         # Format output
         allocation = {r: [] for r in robots}
+        self.last_solver = "infeasible"
         if pulp.LpStatus[prob.status] == 'Optimal':
-            for r in robots:
-                for t in tasks:
-                    if pulp.value(x[r][t]) == 1:
-                        allocation[r].append(t)
-        
+            self.last_solver = "cbc"
+            for (i, j), var in x.items():
+                if var.varValue is not None and var.varValue > 0.5:
+                    allocation[robots[i]].append(tasks[j])
+
+        return allocation
+
+class IncrementalAllocator:
+    """
+    Persistent allocator for streaming task arrivals.
+    Keeps the cost and capability matrices alive in reusable robot/task slots, so
+    adding or removing a task or robot only touches its own row/column. Each
+    re-solve tries the in-process fast path first and otherwise warm-starts CBC
+    from the previous incumbent, reusing the model's variables across solves.
+    """
+
+    def __init__(self, optimizer: Optional[MILPOptimizer] = None, initial_slots: int = 64):
+        self.optimizer = optimizer or MILPOptimizer()
+        # robot/task -> row/column slot (insertion ordered); freed slots are reused
+        self._robot_slot: Dict[str, int] = {}
+        self._task_slot: Dict[str, int] = {}
+        self._free_robot_slots: List[int] = []
+        self._free_task_slots: List[int] = []
+        self._cost = np.zeros((initial_slots, initial_slots))
+        self._feasible = np.zeros((initial_slots, initial_slots), dtype=bool)
+        self._capacity = np.zeros(initial_slots)
+        # robot -> capability profile, (robot, task) -> binary variable, created on first CBC solve
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._vars: Dict[tuple, Any] = {}
+        self._var_counter = 0
+        # task -> robot from the last successful solve
+        self.incumbent: Dict[str, str] = {}
+        # "fast", "cbc", "cbc_timeout", "incumbent" or "infeasible"
+        self.last_solver = None
+
+    @property
+    def robots(self) -> List[str]:
+        return list(self._robot_slot)
+
+    @property
+    def tasks(self) -> List[str]:
+        return list(self._task_slot)
+
+    def _take_slot(self, slots: Dict[str, int], free: List[int], axis: int) -> int:
+        if free:
+            return free.pop()
+        slot = len(slots)
+        if slot >= self._cost.shape[axis]:
+            # Double the matrices along the exhausted axis
+            pad = [(0, 0), (0, 0)]
+            pad[axis] = (0, self._cost.shape[axis])
+            self._cost = np.pad(self._cost, pad)
+            self._feasible = np.pad(self._feasible, pad)
+            if axis == 0:
+                self._capacity = np.pad(self._capacity, (0, self._capacity.shape[0]))
+        return slot
+
+    def add_robot(self, robot: str, costs: Dict[str, float]):
+        """
+        :param costs: Dict {task: cost} for the tasks currently in the model.
+        """
+        if robot in self._robot_slot:
+            self.remove_robot(robot)
+        i = self._take_slot(self._robot_slot, self._free_robot_slots, 0)
+        self._robot_slot[robot] = i
+        profile = self._profiles[robot] = self.optimizer._resolve_profile(robot)
+        self._capacity[i] = self.optimizer._battery_capacities([profile])[0]
+        tasks = self.tasks
+        cols = np.fromiter(self._task_slot.values(), dtype=int, count=len(tasks))
+        self._feasible[i, :] = False
+        self._feasible[i, cols] = self.optimizer._capability_mask([profile], tasks)[0]
+        self._cost[i, cols] = [costs[t] for t in tasks]
+
+    def remove_robot(self, robot: str):
+        i = self._robot_slot.pop(robot, None)
+        if i is None:
+            return
+        self._free_robot_slots.append(i)
+        self._feasible[i, :] = False
+        self._profiles.pop(robot, None)
+        self._vars = {k: v for k, v in self._vars.items() if k[0] != robot}
+        self.incumbent = {t: r for t, r in self.incumbent.items() if r != robot}
+
+    def add_task(self, task: str, costs: Dict[str, float]):
+        """
+        :param costs: Dict {robot: cost} for the robots currently in the model.
+        """
+        if task in self._task_slot:
+            self.remove_task(task)
+        j = self._take_slot(self._task_slot, self._free_task_slots, 1)
+        self._task_slot[task] = j
+        robots = self.robots
+        rows = np.fromiter(self._robot_slot.values(), dtype=int, count=len(robots))
+        self._feasible[:, j] = False
+        self._feasible[rows, j] = self.optimizer._capability_mask([self._profiles[r] for r in robots], [task])[:, 0]
+        self._cost[rows, j] = [costs[r] for r in robots]
+
+    def remove_task(self, task: str):
+        j = self._task_slot.pop(task, None)
+        if j is None:
+            return
+        self._free_task_slots.append(j)
+        self._feasible[:, j] = False
+        self._vars = {k: v for k, v in self._vars.items() if k[1] != task}
+        self.incumbent.pop(task, None)
+
+    def update_cost(self, robot: str, task: str, cost: float):
+        self._cost[self._robot_slot[robot], self._task_slot[task]] = cost
+
+    def sync(self, robots: List[str], tasks: List[str], costs: Dict[str, Dict[str, float]]):
+        """
+        Applies the minimal set of adds/removes/cost updates to match a full snapshot.
+        """
+        robot_set, task_set = set(robots), set(tasks)
+        for r in [r for r in self._robot_slot if r not in robot_set]:
+            self.remove_robot(r)
+        for t in [t for t in self._task_slot if t not in task_set]:
+            self.remove_task(t)
+        for r in robots:
+            if r not in self._robot_slot:
+                self.add_robot(r, {t: costs[r][t] for t in self._task_slot})
+        for t in tasks:
+            if t not in self._task_slot:
+                self.add_task(t, {r: costs[r][t] for r in self._robot_slot})
+        rows = np.fromiter(self._robot_slot.values(), dtype=int, count=len(self._robot_slot))
+        cols = np.fromiter(self._task_slot.values(), dtype=int, count=len(self._task_slot))
+        self._cost[np.ix_(rows, cols)] = [[costs[r][t] for t in self._task_slot] for r in self._robot_slot]
+
+    def _warm_start(self, robots: List[str], tasks: List[str], cost_matrix: np.ndarray, feasible: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+        """
+        Previous incumbent for surviving tasks; new or orphaned tasks go greedily
+        to their cheapest capable robot with spare capacity.
+        :return: Robot index per task (-1 where no capable robot exists).
+        """
+        r_idx = {r: i for i, r in enumerate(robots)}
+        start = np.full(len(tasks), -1)
+        load = np.zeros(len(robots))
+        for j, t in enumerate(tasks):
+            i = r_idx.get(self.incumbent.get(t), -1)
+            if i >= 0 and feasible[i, j]:
+                start[j] = i
+                load[i] += cost_matrix[i, j]
+        for j in np.nonzero(start < 0)[0]:
+            options = np.nonzero(feasible[:, j])[0]
+            if len(options) == 0:
+                continue
+            options = options[np.argsort(cost_matrix[options, j])]
+            fits = options[load[options] + cost_matrix[options, j] <= capacity[options] + CAPACITY_TOL]
+            i = fits[0] if len(fits) else options[0]
+            start[j] = i
+            load[i] += cost_matrix[i, j]
+        return start
+
+    @traced("milp")
+    def solve(self, time_limit: Optional[float] = None) -> Dict[str, List[str]]:
+        """
+        Re-solves the current model.
+        :param time_limit: Optional deadline in seconds; the best incumbent found by then is returned.
+        :return: Dict {robot: [task1, task2, ...]}.
+        """
+        robots, tasks = self.robots, self.tasks
+        rows = np.fromiter(self._robot_slot.values(), dtype=int, count=len(robots))
+        cols = np.fromiter(self._task_slot.values(), dtype=int, count=len(tasks))
+        cost_matrix = self._cost[np.ix_(rows, cols)]
+        feasible = self._feasible[np.ix_(rows, cols)]
+        capacity = self._capacity[rows]
+
+        fast = self.optimizer._solve_fast(robots, tasks, cost_matrix, feasible, capacity)
+        if fast is not None:
+            self.last_solver = self.optimizer.last_solver
+            self.incumbent = {t: r for r, ts in fast.items() for t in ts}
+            return fast
+
+        import pulp
+        start = self._warm_start(robots, tasks, cost_matrix, feasible, capacity)
+        pairs = list(zip(*np.nonzero(feasible)))
+        by_robot = [[] for _ in robots]
+        by_task = [[] for _ in tasks]
+        for i, j in pairs:
+            key = (robots[i], tasks[j])
+            var = self._vars.get(key)
+            if var is None:
+                var = self._vars[key] = pulp.LpVariable(f"x_{self._var_counter}", 0, 1, pulp.LpBinary)
+                self._var_counter += 1
+            var.setInitialValue(1 if start[j] == i else 0)
+            by_robot[i].append((var, cost_matrix[i, j]))
+            by_task[j].append((var, 1))
+
+        prob = pulp.LpProblem("IncrementalAllocation", pulp.LpMinimize)
+        prob += pulp.LpAffineExpression([term for terms in by_robot for term in terms])
+        for j in range(len(tasks)):
+            prob += pulp.LpAffineExpression(by_task[j]) == 1, f"assign_{j}"
+        for i in range(len(robots)):
+            prob += pulp.LpAffineExpression(by_robot[i]) <= capacity[i], f"battery_{i}"
+
+        prob.solve(pulp.PULP_CBC_CMD(msg=0, warmStart=True, timeLimit=time_limit))
+
+        allocation = {r: [] for r in robots}
+        if prob.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+            self.last_solver = "cbc" if prob.sol_status == pulp.LpSolutionOptimal else "cbc_timeout"
+            self.incumbent = {
+                tasks[j]: robots[i] for i, j in pairs
+                if self._vars[robots[i], tasks[j]].varValue is not None and self._vars[robots[i], tasks[j]].varValue > 0.5
+            }
+        elif time_limit is not None and (start >= 0).all() and self._fits(start, cost_matrix, capacity):
+            # Deadline hit before CBC reported anything: fall back to the warm start
+            self.last_solver = "incumbent"
+            self.incumbent = {t: robots[start[j]] for j, t in enumerate(tasks)}
+        else:
+            self.last_solver = "infeasible"
+            return allocation
+
+        for t in tasks:
+            allocation[self.incumbent[t]].append(t)
         return allocation
 
+    @staticmethod
+    def _fits(assignment: np.ndarray, cost_matrix: np.ndarray, capacity: np.ndarray) -> bool:
+        load = np.bincount(assignment, weights=cost_matrix[assignment, np.arange(len(assignment))], minlength=len(capacity))
+        return bool((load <= capacity + CAPACITY_TOL).all())
+
 if __name__ == "__main__":
     # Example usage
     robots = ["limo_1", "limo_2"]
@@ -100,7 +385,7 @@ if __name__ == "__main__":
         "limo_1": {"pick_up_red_block": 5.0, "move_to_lab": 10.0},
         "limo_2": {"pick_up_red_block": 2.0, "move_to_lab": 15.0}
     }
-    
+
     optimizer = MILPOptimizer()
     result = optimizer.allocate_tasks(robots, tasks, costs, {})
     print(f"Optimal Allocation: {result}")
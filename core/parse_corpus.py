@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+import datetime
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+
+def entry_id(testcase: str, data: Dict[str, Any]) -> str:
+    """
+    Content hash of a parse, so the same output for the same testcase is stored once
+    no matter which model or trial produced it.
+    """
+    canonical = json.dumps({"testcase": testcase, "data": data}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+class ParseCorpus:
+    """
+    JSONL corpus of successful LLM parses (result['data']) for LLM-free replay of the
+    downstream stages (evaluation/replay_corpus.py). One compact line per distinct parse,
+    appended with a single O_APPEND write under an exclusive lock like core.checkpoint,
+    so concurrent trials can share a corpus; a torn final line is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids: Set[str] = {e["id"] for e in self._read()}
+
+    def _read(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # torn final line
+        return entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
+
+    def record(self, result: Dict[str, Any], testcase: str) -> bool:
+        """
+        Appends a successful parse unless the corpus already has it.
+        :return: True if a new entry was written.
+        """
+        if not result.get("success"):
+            return False
+        key = entry_id(testcase, result["data"])
+        with self._lock:
+            if key in self._ids:
+                return False
+            entry = {"id": key, "testcase": testcase, "provider": result.get("provider"), "model": result.get("model"),
+                     "quantization": result.get("quantization"), "recorded": datetime.datetime.now().isoformat(timespec="seconds"),
+                     "data": result["data"]}
+            line = (json.dumps(entry, separators=(",", ":"), default=str) + "\n").encode()
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                os.write(fd, line)
+            finally:
+                os.close(fd)  # releases the lock
+            self._ids.add(key)
+        return True
+
+    def entries(self, testcases: Optional[List[str]] = None, models: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Corpus entries in recording order, optionally filtered by testcase and model.
+        """
+        for entry in self._read():
+            if testcases and entry["testcase"] not in testcases:
+                continue
+            if models and entry.get("model") not in models:
+                continue
+            yield entry
+
+
+_CORPUS: Optional[ParseCorpus] = None
+
+
+def configure(path: Optional[str]) -> Optional[ParseCorpus]:
+    """
+    Points the process-wide recorder at a corpus file; None switches recording off.
+    """
+    global _CORPUS
+    _CORPUS = ParseCorpus(path) if path else None
+    return _CORPUS
+
+
+def record(result: Dict[str, Any], testcase: str) -> bool:
+    """
+    Records a parse in the configured corpus (no-op unless configure() was called).
+    """
+    if _CORPUS is None:
+        return False
+    return _CORPUS.record(result, testcase)
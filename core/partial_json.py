@@ -0,0 +1,90 @@
+import json
+from typing import Any, Dict
+
+
+class PartialJSONObject:
+    """
+    Incremental scanner for a JSON object that arrives in chunks (a streamed LLM response).
+    feed() returns the top-level fields whose values closed in that chunk, so callers can act
+    on e.g. 'goal_predicates' while later fields are still being generated. Text before the
+    first '{' (such as a ```json fence) and after the closing '}' is ignored. Values that do
+    not parse are skipped; the full response is still validated once complete.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.closed = False
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "object"  # object, key, colon, value, in_value, comma
+        self._key = None
+        self._key_start = 0
+        self._value_start = 0
+
+    def _complete(self, text: str, new: Dict[str, Any]):
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        self.fields[self._key] = new[self._key] = value
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        """
+        :return: {field: value} for the top-level fields completed by this chunk.
+        """
+        new: Dict[str, Any] = {}
+        self._buf += text
+        buf = self._buf
+        i = self._pos
+        while i < len(buf) and not self.closed:
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._expect = "colon"
+                    elif self._depth == 1 and self._expect == "in_value":
+                        self._complete(buf[self._value_start:i + 1], new)
+                        self._expect = "comma"
+            elif self._depth == 0:
+                if c == "{":
+                    self._depth, self._expect = 1, "key"
+            elif c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+                elif self._depth == 1 and self._expect == "value":
+                    self._value_start, self._expect = i, "in_value"
+            elif c in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start, self._expect = i, "in_value"
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "in_value":
+                    self._complete(buf[self._value_start:i + 1], new)
+                    self._expect = "comma"
+                elif self._depth == 0:
+                    if self._expect == "in_value":  # bare number/literal as the last value
+                        self._complete(buf[self._value_start:i].strip(), new)
+                    self.closed = True
+            elif self._depth == 1:
+                if c == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif c == ",":
+                    if self._expect == "in_value":
+                        self._complete(buf[self._value_start:i].strip(), new)
+                    self._expect = "key"
+                elif not c.isspace() and self._expect == "value":
+                    self._value_start, self._expect = i, "in_value"
+            i += 1
+        self._pos = i
+        return new
@@ -1,6 +1,7 @@
-import json
-import os
 from typing import Dict, Any
+from core.tracing import traced
+from core.robot_profiles import get_registry
+from core.predicates import predicate_args
 
 class PDDLGenerator:
     """
@@ -8,18 +9,11 @@ class PDDLGenerator:
     Suitable for integration with Fast Downward or ROS2 planning nodes.
     """
     
-    def __init__(self):
-        # Load robot profiles
-        profiles_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            'config', 'robot_profiles.json'
-        )
-        try:
-            with open(profiles_path, 'r') as f:
-                self.profiles = json.load(f)
-        except Exception:
-            self.profiles = {}
+    @property
+    def profiles(self) -> Dict[str, Any]:
+        return get_registry().profiles
     
+    @traced("pddl_gen")
     def generate_problem_skeleton(self, data: Dict[str, Any], problem_name: str = "robotics_task") -> str:
         # Extract robots explicitly
         robots = set(data.get("robots", []))
@@ -30,17 +24,10 @@ class PDDLGenerator:
         all_entities = set(data.get("objects", []))
         all_entities.update(robots)
         
-        # Helper to extract args from pred(a,b)
-        def get_args(p):
-            p = p.strip()
-            if "(" in p and ")" in p:
-                return [a.strip() for a in p.split("(")[1].split(")")[0].split(",")]
-            return [p]
-
         # Scan initial state and goals for missing entities (locations, etc)
         initial_state = data.get("initial_state", [])
         for p in initial_state + data.get("goal_predicates", []):
-            all_entities.update(get_args(p))
+            all_entities.update(predicate_args(p, lower=False) if "(" in p else [p.strip()])
 
         # Ensure each robot has at least one initial 'at' position
         has_at = {r: False for r in robots}
@@ -76,16 +63,9 @@ class PDDLGenerator:
         for p in initial_state:
             init_preds += f"    {format_predicate(p)}\n"
             
-        # Add robot capabilities
-        for r in robots:
-            # Try to find profile by name or substring (e.g. limo_1 -> limo_standard)
-            profile_name = "limo_standard" # Default
-            for p_name in self.profiles:
-                if p_name in r:
-                    profile_name = p_name
-                    break
-            
-            profile = self.profiles.get(profile_name, {})
+        # Add robot capabilities (e.g. limo_scout1 -> limo_scout; unknown IDs -> limo_standard)
+        robot_list = list(robots)
+        for r, profile in zip(robot_list, get_registry().resolve_all(robot_list)):
             for cap in profile.get("capabilities", []):
                 init_preds += f"    ({cap} {r})\n"
 
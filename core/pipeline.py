@@ -0,0 +1,135 @@
+import time
+import queue
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_END = object()
+
+
+class Stage:
+    """
+    One pipeline stage: `fn(item) -> item`, run by `workers` dispatcher threads.
+    Without an executor fn runs in the dispatcher thread (I/O-bound work such as LLM calls);
+    with one (e.g. a ProcessPoolExecutor) each dispatcher submits to it and waits, so the
+    stage never has more than `workers` items in flight. fn and items must then be picklable.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1, executor: Optional[Executor] = None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(workers, 1)
+        self.executor = executor
+
+
+class _Failed:
+    __slots__ = ("item", "error", "stage")
+
+    def __init__(self, item: Any, error: BaseException, stage: str):
+        self.item = item
+        self.error = error
+        self.stage = stage
+
+
+class StagedPipeline:
+    """
+    Moves items through a chain of stages connected by bounded queues, so item i+1 can be in
+    stage 1 while item i is in stage 2 and throughput approaches that of the slowest stage.
+    A full queue blocks the stage in front of it (backpressure), at most `max_inflight` items
+    are admitted at once, and results are yielded in input order. An item whose stage raises
+    skips the remaining stages and is yielded with the error.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 2, max_inflight: Optional[int] = None):
+        self.stages = stages
+        self.queue_size = max(queue_size, 1)
+        self.max_inflight = max_inflight or sum(s.workers for s in stages) + queue_size * len(stages)
+        # Seconds each stage spent working, summed over its workers
+        self.busy: Dict[str, float] = {s.name: 0.0 for s in stages}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _put(self, q: queue.Queue, entry) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _dispatch(self, stage: Stage, inq: queue.Queue, outq: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                index, item = inq.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if not isinstance(item, _Failed):
+                start = time.perf_counter()
+                try:
+                    item = stage.executor.submit(stage.fn, item).result() if stage.executor else stage.fn(item)
+                except Exception as e:
+                    item = _Failed(item, e, stage.name)
+                with self._lock:
+                    self.busy[stage.name] += time.perf_counter() - start
+            if not self._put(outq, (index, item)):
+                return
+
+    def _feed(self, items: Iterable[Any], first: queue.Queue, out: queue.Queue, slots: threading.Semaphore):
+        count = 0
+        try:
+            for item in items:
+                while not slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+                if not self._put(first, (count, item)):
+                    return
+                count += 1
+        finally:
+            out.put((_END, count))
+
+    def run(self, items: Iterable[Any]) -> Iterator[Tuple[Any, Optional[BaseException]]]:
+        """
+        :return: Iterator of (item, error) in input order; error is None on success, and
+                 item is the last value the item had before the failing stage otherwise.
+        """
+        self._stop.clear()
+        queues = [queue.Queue(self.queue_size) for _ in self.stages]
+        out: queue.Queue = queue.Queue()
+        slots = threading.Semaphore(self.max_inflight)
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0], out, slots), name="pipeline-feed", daemon=True)]
+        for k, stage in enumerate(self.stages):
+            outq = queues[k + 1] if k + 1 < len(queues) else out
+            threads += [threading.Thread(target=self._dispatch, args=(stage, queues[k], outq), name=f"pipeline-{stage.name}-{w}",
+                                         daemon=True) for w in range(stage.workers)]
+        for thread in threads:
+            thread.start()
+
+        pending: Dict[int, Any] = {}
+        next_index, total = 0, None
+        try:
+            while total is None or next_index < total:
+                index, item = out.get()
+                if index is _END:
+                    total = item
+                    continue
+                pending[index] = item
+                while next_index in pending:
+                    item = pending.pop(next_index)
+                    next_index += 1
+                    slots.release()
+                    if isinstance(item, _Failed):
+                        yield item.item, item.error
+                    else:
+                        yield item, None
+        finally:
+            # Also reached when the caller stops iterating early; workers notice within 0.1s
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def utilization(self, elapsed: float) -> Dict[str, float]:
+        """
+        Busy fraction of each stage's workers over `elapsed` seconds; the highest is the bottleneck.
+        """
+        return {s.name: self.busy[s.name] / (elapsed * s.workers) if elapsed > 0 else 0.0 for s in self.stages}
@@ -0,0 +1,183 @@
+import os
+import re
+from typing import List, Dict, Any, Optional, Tuple, Set
+
+from core.tracing import traced
+
+DOMAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'domain.pddl')
+
+Fact = Tuple[str, ...]
+
+
+def _parse_sexpr(text: str) -> list:
+    """
+    Parses PDDL text into nested lists of lowercase tokens (PDDL is case-insensitive).
+    """
+    tokens = re.findall(r"\(|\)|[^\s()]+", re.sub(r";[^\n]*", "", text).lower())
+    stack = [[]]
+    for tok in tokens:
+        if tok == "(":
+            stack.append([])
+        elif tok == ")":
+            closed = stack.pop()
+            stack[-1].append(closed)
+        else:
+            stack[-1].append(tok)
+    return stack[0][0] if stack[0] else []
+
+
+def _section(expr: list, key: str) -> Optional[list]:
+    for item in expr:
+        if isinstance(item, list) and item and item[0] == key:
+            return item
+    return None
+
+
+def _literals(expr: list) -> Tuple[List[list], List[list]]:
+    """
+    Flattens a conjunction into (positive atoms, negated atoms).
+    """
+    if not expr:
+        return [], []
+    if expr[0] == "and":
+        pos, neg = [], []
+        for sub in expr[1:]:
+            p, n = _literals(sub)
+            pos += p
+            neg += n
+        return pos, neg
+    if expr[0] == "not":
+        return [], [expr[1]]
+    if expr[0].startswith(":") or expr[0] in ("or", "imply", "forall", "exists", "when"):
+        raise ValueError(f"Unsupported PDDL construct: {expr[0]}")
+    return [expr], []
+
+
+class _CompiledAction:
+    """
+    Precondition/effect templates where every argument is a parameter index
+    (int) or a constant (str), so grounding is a tuple lookup per literal.
+    """
+    __slots__ = ("name", "arity", "pre_pos", "pre_neg", "add", "delete")
+
+    def __init__(self, name: str, params: List[str], pre: list, eff: list):
+        index = {p: i for i, p in enumerate(params)}
+
+        def compile_atoms(atoms):
+            return tuple((a[0], tuple(index.get(arg, arg) for arg in a[1:])) for a in atoms)
+
+        pre_pos, pre_neg = _literals(pre)
+        add, delete = _literals(eff)
+        self.name = name
+        self.arity = len(params)
+        self.pre_pos = compile_atoms(pre_pos)
+        self.pre_neg = compile_atoms(pre_neg)
+        self.add = compile_atoms(add)
+        self.delete = compile_atoms(delete)
+
+
+def _ground(templates, args: List[str]) -> List[Fact]:
+    return [(pred,) + tuple(args[a] if type(a) is int else a for a in spec) for pred, spec in templates]
+
+
+class PlanChecker:
+    """
+    Fast in-process STRIPS plan simulator for core/domain.pddl.
+    The domain is parsed once into compiled precondition/effect templates; a plan
+    is replayed over a hashed set of ground facts and the first failing step is reported.
+    """
+
+    def __init__(self, domain_path: str = DOMAIN_PATH):
+        with open(domain_path, 'r') as f:
+            domain = _parse_sexpr(f.read())
+        self.actions: Dict[str, _CompiledAction] = {}
+        for item in domain:
+            if isinstance(item, list) and item and item[0] == ":action":
+                name = item[1]
+                fields = dict(zip(item[2::2], item[3::2]))
+                params = [t for t in fields.get(":parameters", []) if isinstance(t, str) and t.startswith("?")]
+                self.actions[name] = _CompiledAction(name, params, fields.get(":precondition", []), fields.get(":effect", []))
+        # plan step string -> ground preconditions/effects, shared across plans
+        self._steps: Dict[str, tuple] = {}
+
+    def _ground_step(self, step: str):
+        """
+        :return: (error or None, pre_pos, pre_neg, add, delete) ground facts for one plan step.
+        """
+        parts = step.lower().replace("(", " ").replace(")", " ").split()
+        if not parts:
+            return None, (), (), (), ()
+        action = self.actions.get(parts[0])
+        args = parts[1:]
+        if action is None:
+            return f"unknown action '{parts[0]}'", (), (), (), ()
+        if len(args) != action.arity:
+            return f"{parts[0]} expects {action.arity} arguments, got {len(args)}", (), (), (), ()
+        return (None, _ground(action.pre_pos, args), _ground(action.pre_neg, args),
+                _ground(action.add, args), _ground(action.delete, args))
+
+    @staticmethod
+    def parse_problem(problem_pddl: str) -> Tuple[Set[Fact], List[Fact], List[Fact]]:
+        """
+        :return: (initial facts, positive goal facts, negative goal facts)
+        """
+        problem = _parse_sexpr(problem_pddl)
+        init = _section(problem, ":init") or [":init"]
+        goal = _section(problem, ":goal") or [":goal"]
+        goal_pos, goal_neg = _literals(goal[1]) if len(goal) > 1 else ([], [])
+        return {tuple(f) for f in init[1:]}, [tuple(g) for g in goal_pos], [tuple(g) for g in goal_neg]
+
+    def simulate(self, init: Set[Fact], plan: List[str], goal_pos: Optional[List[Fact]] = None,
+                 goal_neg: Optional[List[Fact]] = None) -> Dict[str, Any]:
+        """
+        Applies a plan (Fast Downward format, e.g. 'move_to r1 a b') to a set of facts.
+        :return: Dict with 'valid', 'failed_step', 'reason', 'goal_reached' and 'steps'.
+        """
+        state = set(init)
+        steps = self._steps
+        for i, step in enumerate(plan):
+            grounded = steps.get(step)
+            if grounded is None:
+                grounded = steps[step] = self._ground_step(step)
+            error, pre_pos, pre_neg, add, delete = grounded
+            if error is None:
+                missing = [f for f in pre_pos if f not in state]
+                violated = [f for f in pre_neg if f in state]
+                if missing:
+                    error = f"unsatisfied precondition ({' '.join(missing[0])})"
+                elif violated:
+                    error = f"negative precondition violated (not ({' '.join(violated[0])}))"
+            if error:
+                return {"valid": False, "failed_step": i, "reason": f"step {i + 1} '{step}': {error}",
+                        "goal_reached": False, "steps": i}
+
+            state.difference_update(delete)
+            state.update(add)
+
+        unmet = [g for g in (goal_pos or []) if g not in state] + [g for g in (goal_neg or []) if g in state]
+        return {
+            "valid": True,
+            "failed_step": None,
+            "reason": f"goal not reached: ({' '.join(unmet[0])})" if unmet else None,
+            "goal_reached": not unmet,
+            "steps": len(plan)
+        }
+
+    @traced("plan_check")
+    def check(self, problem_pddl: str, plan: List[str]) -> Dict[str, Any]:
+        """
+        Checks a plan against a PDDL problem string (e.g. from PDDLGenerator).
+        """
+        init, goal_pos, goal_neg = self.parse_problem(problem_pddl)
+        return self.simulate(init, plan, goal_pos, goal_neg)
+
+if __name__ == "__main__":
+    checker = PlanChecker()
+    problem = """(define (problem demo) (:domain lamma_p_domain)
+  (:objects r1 - robot hall lab block - target)
+  (:init (at r1 hall) (at block hall) (can_manipulate r1))
+  (:goal (and (at block lab))))"""
+    good = ["pick_up r1 block hall", "move_to r1 hall lab", "place r1 block lab"]
+    bad = ["move_to r1 hall lab", "pick_up r1 block hall"]
+    print(f"Valid plan: {checker.check(problem, good)}")
+    print(f"Invalid plan: {checker.check(problem, bad)}")
@@ -3,6 +3,8 @@ import subprocess
 import tempfile
 from typing import List, Optional
 
+from core.tracing import traced, span
+
 class FastDownwardClient:
     """
     Client to interface with the Fast Downward planner.
@@ -11,6 +13,7 @@ class FastDownwardClient:
     def __init__(self, executable_path: str = "/home/gautham/LaMMA-P/downward/fast-downward.py"):
         self.executable_path = executable_path
 
+    @traced("planner")
     def run_planner(self, domain_path: str, problem_path: str, alias: str = "llama-p-alias") -> Optional[List[str]]:
         """
         Run Fast Downward and return the plan as a list of actions.
@@ -35,7 +38,8 @@ class FastDownwardClient:
             
             try:
                 # Run the planner
-                result = subprocess.run(cmd, capture_output=True, text=True, cwd=tmpdir)
+                with span("planner.subprocess"):
+                    result = subprocess.run(cmd, capture_output=True, text=True, cwd=tmpdir)
                 
                 if result.returncode != 0:
                     print(f"Planner failed with return code {result.returncode}")
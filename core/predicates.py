@@ -0,0 +1,19 @@
+from typing import List
+
+
+def predicate_name(p: str) -> str:
+    """
+    'at(limo1, hall)' -> 'at'; a bare name is returned as-is (lowercased).
+    """
+    return p.lower().strip().split("(")[0].strip()
+
+
+def predicate_args(p: str, lower: bool = True) -> List[str]:
+    """
+    'at(limo1, hall)' -> ['limo1', 'hall']; [] for a bare name or an unclosed call.
+    :param lower: Lowercase the arguments (the LLM's casing is not reliable).
+    """
+    p = p.strip().lower() if lower else p.strip()
+    if "(" in p and ")" in p:
+        return [a.strip() for a in p.split("(")[1].split(")")[0].split(",") if a.strip()]
+    return []
@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from typing import Dict, Any, List, Optional, Tuple
+
+from core.tracing import PIPELINE_STAGES, Tracer, get_tracer
+
+PROFILE_MODES = ("cpu", "mem")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # ';' separates frames in collapsed stacks
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class RunProfiler:
+    """
+    Opt-in profiling for one evaluation run or node session, driven by the tracing spans.
+
+    cpu: one cProfile per top-level pipeline stage (pstats .prof + text report), plus a
+         sampling profiler whose stacks are written in collapsed format with the active
+         stage as root frame (flamegraph.pl, speedscope, inferno).
+    mem: tracemalloc snapshots after trial N and trial M (default: first and last),
+         diffed by source line, plus per-trial traced/peak memory for the results row.
+    """
+
+    def __init__(self, mode: str, out_dir: str, tracer: Optional[Tracer] = None, sample_interval: float = 0.005,
+                 mem_trials: Tuple[int, Optional[int]] = (1, None), top: int = 30):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.out_dir = out_dir
+        self.tracer = tracer or get_tracer()
+        self.sample_interval = sample_interval
+        self.mem_first, self.mem_last = mem_trials
+        self.top = top
+
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._active: Dict[int, List[str]] = {}  # thread id -> open span names
+        self._profiled_stage: Dict[int, str] = {}  # thread id -> stage whose cProfile is enabled
+        self._owner = threading.get_ident()
+        self._samples: Dict[str, int] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._snapshots: Dict[int, tracemalloc.Snapshot] = {}
+        self._running = False
+        self._last_trial = 0
+        self._tracer_was_enabled = False
+
+    # --- lifecycle ---
+
+    def start(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        # Spans drive the profiles; stop() switches tracing back off if it was off before
+        self._tracer_was_enabled = self.tracer.enabled
+        self.tracer.enabled = True
+        self.tracer.hooks.append(self)
+        if self.mode == "cpu":
+            self._sampler = threading.Thread(target=self._sample_loop, name="RunProfilerSampler", daemon=True)
+            self._sampler.start()
+        else:
+            tracemalloc.start(25)
+        self._running = True
+        return self
+
+    def stop(self) -> List[str]:
+        """
+        Stops profiling and writes every artifact.
+        :return: Paths written.
+        """
+        if not self._running:
+            return []
+        self._running = False
+        if self in self.tracer.hooks:
+            self.tracer.hooks.remove(self)
+        self.tracer.enabled = self._tracer_was_enabled
+        if self.mode == "cpu":
+            self._stop.set()
+            self._sampler.join()
+            for profile in self._profiles.values():
+                profile.disable()
+            paths = self._write_cpu()
+        else:
+            paths = self._write_mem()
+            tracemalloc.stop()
+        for path in paths:
+            logging.info(f"Profile written: {path}")
+        return paths
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- tracing hooks ---
+
+    def span_enter(self, name: str):
+        tid = threading.get_ident()
+        stack = self._active.setdefault(tid, [])
+        stack.append(name)
+        # cProfile is per thread and cannot nest: profile the outermost pipeline stage on the run's thread
+        if self.mode == "cpu" and tid == self._owner and name in PIPELINE_STAGES and tid not in self._profiled_stage:
+            profile = self._profiles.get(name)
+            if profile is None:
+                profile = self._profiles[name] = cProfile.Profile()
+            self._profiled_stage[tid] = name
+            profile.enable()
+
+    def span_exit(self, name: str):
+        tid = threading.get_ident()
+        stack = self._active.get(tid)
+        if stack:
+            stack.pop()
+        if self._profiled_stage.get(tid) == name and name not in (stack or []):
+            self._profiles[name].disable()
+            del self._profiled_stage[tid]
+
+    # --- per-trial memory ---
+
+    def trial_done(self, trial: int) -> Dict[str, Any]:
+        """
+        Call after each trial (1-based). Snapshots trials N and M in mem mode.
+        :return: Fields for the trial's results row (empty in cpu mode).
+        """
+        if self.mode != "mem" or not tracemalloc.is_tracing():
+            return {}
+        self._last_trial = trial
+        if trial in (self.mem_first, self.mem_last):
+            self._snapshots[trial] = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return {"mem_current_mb": round(current / 1e6, 3), "mem_peak_mb": round(peak / 1e6, 3)}
+
+    # --- cpu artifacts ---
+
+    def _sample_loop(self):
+        owner = self._owner
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(owner)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            active = self._active.get(owner) or ["(no span)"]
+            key = ";".join([active[0]] + stack[::-1])
+            self._samples[key] = self._samples.get(key, 0) + 1
+
+    def _write_cpu(self) -> List[str]:
+        paths = []
+        for stage, profile in sorted(self._profiles.items()):
+            prof_path = os.path.join(self.out_dir, f"cpu_{stage}.prof")
+            profile.dump_stats(prof_path)
+            txt_path = os.path.join(self.out_dir, f"cpu_{stage}.txt")
+            with open(txt_path, 'w') as f:
+                stats = pstats.Stats(profile, stream=f)
+                stats.sort_stats("cumulative").print_stats(self.top)
+            paths += [prof_path, txt_path]
+
+        collapsed = os.path.join(self.out_dir, "cpu_samples.collapsed")
+        with open(collapsed, 'w') as f:
+            for stack, count in sorted(self._samples.items()):
+                f.write(f"{stack} {count}\n")
+        paths.append(collapsed)
+        return paths
+
+    # --- memory artifacts ---
+
+    def _write_mem(self) -> List[str]:
+        last = self.mem_last
+        if last not in self._snapshots and self._last_trial > self.mem_first:
+            # M = last trial (or M was never reached): the state now is the state after the last trial
+            last = self._last_trial
+            self._snapshots[last] = tracemalloc.take_snapshot()
+        first_snap = self._snapshots.get(self.mem_first)
+        if first_snap is None or last not in self._snapshots:
+            logging.warning("Memory profile needs at least two trials; no diff written")
+            return []
+
+        paths = []
+        for trial in (self.mem_first, last):
+            path = os.path.join(self.out_dir, f"mem_trial{trial}.tracemalloc")
+            self._snapshots[trial].dump(path)
+            paths.append(path)
+
+        diff_path = os.path.join(self.out_dir, f"mem_diff_trial{self.mem_first}_trial{last}.txt")
+        noise = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+        old = first_snap.filter_traces(noise)
+        new = self._snapshots[last].filter_traces(noise)
+        with open(diff_path, 'w') as f:
+            f.write(f"Memory growth from trial {self.mem_first} to trial {last} (top {self.top} by size delta)\n\n")
+            for stat in new.compare_to(old, "lineno")[:self.top]:
+                f.write(f"{stat}\n")
+            f.write(f"\nTop {self.top} growing allocation sites with tracebacks\n\n")
+            for stat in new.compare_to(old, "traceback")[:self.top]:
+                f.write(f"{stat.size_diff / 1024:+.1f} KiB, {stat.count_diff:+d} blocks\n")
+                for line in stat.traceback.format(limit=8):
+                    f.write(f"    {line}\n")
+        paths.append(diff_path)
+        return paths
+
+
+def profile_dir(results_dir: str, run_name: str) -> str:
+    """
+    Artifact directory for one run: <results_dir>/profiles/<run_name>_<timestamp>.
+    """
+    return os.path.join(results_dir, "profiles", f"{run_name}_{time.strftime('%Y%m%d-%H%M%S')}")
@@ -0,0 +1,290 @@
+import os
+import uuid
+import logging
+import importlib.util
+from typing import Dict, Any, List, Optional, Iterable, Union
+
+from core.tracing import PIPELINE_STAGES
+
+# pyarrow is imported on first store use (see _require); CSV-only runs never pay for it
+pa = ds = pq = None
+
+# Hive-style directory levels, e.g. model=mistral%3A7b/provider=ollama/quantization=none/testcase=floor6/part-*.parquet
+PARTITION_COLS = ["model", "provider", "quantization", "testcase"]
+# Rows per row group after compaction; files are sorted by date so date filters skip row groups by statistics
+ROW_GROUP_SIZE = 4096
+
+# Typed columns; any other scalar trial field is stored with a type inferred from its values
+_COLUMN_TYPES = {
+    "timestamp": "string",
+    "date": "string",
+    "instruction_id": "string",
+    "success": "bool",
+    "latency": "float64",
+    "retries": "int64",
+    "json_valid": "bool",
+    "fallback_used": "bool",
+    "logical_score": "float64",
+    "optimization_success": "bool",
+    "planning_success": "bool",
+    "planning_mode": "string",
+    "plan_length": "int64",
+    "plan_valid": "bool",
+    "plan_failed_step": "int64",
+    "run_id": "string",
+    "trial_index": "int64",
+    "speculation": "string",
+    "time_to_plan_s": "float64",
+    "time_to_plan_nospec_s": "float64",
+}
+_COLUMN_TYPES.update({f"stage_{stage}": "float64" for stage in PIPELINE_STAGES})
+
+
+_ARROW_TYPES = {
+    "bool": lambda: pa.bool_(),
+    "int64": lambda: pa.int64(),
+    "float64": lambda: pa.float64(),
+    "string": lambda: pa.string(),
+}
+
+
+def available() -> bool:
+    return pa is not None or importlib.util.find_spec("pyarrow") is not None
+
+
+def _require():
+    global pa, ds, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:  # CSV-only installs
+        raise ImportError("pyarrow is required for the columnar results store (pip install pyarrow)")
+    pa, ds, pq = pyarrow, pyarrow.dataset, pyarrow.parquet
+
+
+def _partition_value(value: Any) -> str:
+    # Directory names are URI-encoded by pyarrow, so values are kept as-is
+    return str(value) if value not in (None, "") else "unknown"
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(c, pa.string()) for c in PARTITION_COLS]), flavor="hive")
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _to_number(value: Any, cast):
+    if value is None or value == "":
+        return None
+    try:
+        return cast(float(value)) if cast is int else cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_CONVERTERS = {
+    "bool": _to_bool,
+    "int64": lambda v: _to_number(v, int),
+    "float64": lambda v: _to_number(v, float),
+    "string": lambda v: None if v is None else str(v),
+}
+
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Maps a logger/CSV row onto store columns: typed values plus partition keys.
+    CSV rows (all strings) and in-memory trial rows normalize to the same thing.
+    """
+    out = {}
+    for key, value in row.items():
+        if key in PARTITION_COLS or key == "date":
+            continue
+        kind = _COLUMN_TYPES.get(key)
+        out[key] = _CONVERTERS[kind](value) if kind else value
+
+    timestamp = str(row.get("timestamp") or "")
+    out["model"] = _partition_value(row.get("model"))
+    out["provider"] = _partition_value(row.get("provider"))
+    out["quantization"] = _partition_value(row.get("quantization", "none"))
+    out["testcase"] = _partition_value(row.get("testcase", row.get("instruction_id")))
+    out["date"] = timestamp[:10] if len(timestamp) >= 10 else "unknown"
+    return out
+
+
+class ResultsStore:
+    """
+    Partitioned Parquet dataset of benchmark trials under RESULTS_DIR/store.
+    Each write adds new files (one per touched partition); readers select columns and
+    prune partitions through pyarrow.dataset filters, so only matching files are opened.
+    The date is a sorted column rather than a directory level: daily directories leave
+    thousands of tiny files per history, and per-file overhead then dominates full scans.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        _require()
+        if root is None:
+            from config import RESULTS_DIR
+            root = os.path.join(RESULTS_DIR, "store")
+        self.root = root
+
+    def write(self, rows: Iterable[Dict[str, Any]], basename: Optional[str] = None) -> int:
+        """
+        Appends trial rows to the dataset.
+        :param basename: File name prefix; reusing one overwrites that batch (idempotent migration).
+        :return: Number of rows written.
+        """
+        rows = [normalize_row(r) for r in rows]
+        if not rows:
+            return 0
+        table = pa.Table.from_pylist(rows, schema=self._schema_for(rows))
+        ds.write_dataset(
+            table, self.root, format="parquet", partitioning=_partitioning(),
+            basename_template=f"{basename or 'part-' + uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+        return len(rows)
+
+    def read(self, columns: Optional[List[str]] = None,
+             filters: Optional[Dict[str, Union[Any, List[Any]]]] = None, since: Optional[str] = None):
+        """
+        Loads trials as a pandas DataFrame.
+        :param columns: Columns to read (None = all); missing ones come back as nulls.
+        :param filters: {column: value or list of values}; partition columns prune whole directories.
+        :param since: Keep only dates >= this ISO date (row groups pruned by statistics).
+        """
+        expr = None
+        for col, wanted in (filters or {}).items():
+            if col in PARTITION_COLS:
+                wanted = [_partition_value(v) for v in wanted] if isinstance(wanted, (list, tuple, set)) else _partition_value(wanted)
+            term = ds.field(col).isin(list(wanted)) if isinstance(wanted, (list, tuple, set)) else ds.field(col) == wanted
+            expr = term if expr is None else expr & term
+        if since:
+            term = ds.field("date") >= since
+            expr = term if expr is None else expr & term
+
+        dataset = self.dataset(expr, columns + list(filters or {}) if columns else None)
+        if dataset is None:
+            import pandas as pd
+            return pd.DataFrame(columns=columns or [])
+
+        present = [c for c in columns if c in dataset.schema.names] if columns else None
+        # Sweeps leave many small partition files; read more of them ahead than the default 4
+        df = dataset.to_table(columns=present, filter=expr, fragment_readahead=16).to_pandas()
+        for col in columns or []:
+            if col not in df.columns:
+                df[col] = None
+        return df[columns] if columns else df
+
+    def keys(self, columns: List[str], exclude_prefix: Optional[str] = None) -> set:
+        """
+        Distinct value tuples of `columns` over the stored rows (empty values as None).
+        :param exclude_prefix: Ignore files whose name starts with this.
+        """
+        dataset = self.dataset(columns=columns, exclude_prefix=exclude_prefix)
+        if dataset is None:
+            return set()
+        table = dataset.to_table(columns=columns)
+        values = [[v if v != "" else None for v in table.column(c).to_pylist()] for c in columns]
+        return set(zip(*values))
+
+    def dataset(self, partition_filter=None, columns: Optional[List[str]] = None, exclude_prefix: Optional[str] = None):
+        """
+        :param partition_filter: pyarrow expression; files in non-matching partitions are skipped unopened.
+        :param columns: Columns the caller needs; if all are typed core columns no footer is read up front.
+        :param exclude_prefix: Skip files whose name starts with this.
+        :return: pyarrow Dataset over the matching files, or None if there are none.
+        """
+        if not os.path.isdir(self.root):
+            return None
+        files = [os.path.join(d, f) for d, _, names in os.walk(self.root) for f in names
+                 if f.endswith(".parquet") and not (exclude_prefix and f.startswith(exclude_prefix))]
+        if not files:
+            return None
+        partitioning = _partitioning()
+        if partition_filter is not None:
+            # Prune on directory names alone, before any footer is read
+            pruned = ds.dataset(files, format="parquet", partitioning=partitioning, partition_base_dir=self.root)
+            files = [f.path for f in pruned.get_fragments(filter=partition_filter)]
+            if not files:
+                return None
+        if columns is not None and all(c in _COLUMN_TYPES or c in PARTITION_COLS for c in columns):
+            # Core columns are always written with these types, so the schema is known without I/O
+            schema = pa.schema([(c, _ARROW_TYPES[t]()) for c, t in _COLUMN_TYPES.items()] + list(partitioning.schema))
+        else:
+            # Batches may carry different extra columns: unify the surviving footers
+            schema = pa.unify_schemas([pq.read_schema(f) for f in files] + [partitioning.schema], promote_options="permissive")
+        return ds.dataset(files, schema=schema, format="parquet", partitioning=partitioning,
+                          partition_base_dir=self.root)
+
+    def compact(self, prefix: Optional[str] = None) -> int:
+        """
+        Rewrites each partition's small batch files as a single date-sorted file.
+        :param prefix: Only merge files whose name starts with this (e.g. one writer's batches).
+        :return: Number of partitions compacted.
+        """
+        compacted = 0
+        for directory, _, names in os.walk(self.root):
+            parts = sorted(os.path.join(directory, n) for n in names
+                           if n.endswith(".parquet") and n.startswith(prefix or ""))
+            if len(parts) < 2:
+                continue
+            schema = pa.unify_schemas([pq.read_schema(p) for p in parts], promote_options="permissive")
+            table = ds.dataset(parts, schema=schema, format="parquet").to_table()
+            if "date" in table.column_names:
+                table = table.sort_by([("date", "ascending"), ("timestamp", "ascending")])
+            target = os.path.join(directory, f"compact-{uuid.uuid4().hex}-0.parquet")
+            pq.write_table(table, target + ".tmp", row_group_size=ROW_GROUP_SIZE)
+            os.replace(target + ".tmp", target)
+            for p in parts:
+                os.remove(p)
+            compacted += 1
+        return compacted
+
+    @staticmethod
+    def _schema_for(rows: List[Dict[str, Any]]):
+        names = []
+        for row in rows:
+            for key in row:
+                if key not in names:
+                    names.append(key)
+        fields = []
+        for name in names:
+            kind = _COLUMN_TYPES.get(name)
+            if name in PARTITION_COLS:
+                kind = "string"
+            if kind is None:
+                values = [r.get(name) for r in rows if r.get(name) is not None]
+                if not values:
+                    continue  # all-null extra column: leave it out of this batch
+                if all(isinstance(v, bool) for v in values):
+                    kind = "bool"
+                elif all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+                    kind = "int64"
+                elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                    kind = "float64"
+                else:
+                    kind = "string"
+                    for r in rows:
+                        if r.get(name) is not None:
+                            r[name] = str(r[name])
+            fields.append(pa.field(name, _ARROW_TYPES[kind]()))
+        return pa.schema(fields)
+
+
+def open_store(root: Optional[str] = None) -> Optional[ResultsStore]:
+    """
+    :return: ResultsStore, or None (with a warning) when pyarrow is not installed.
+    """
+    if not available():
+        logging.warning("pyarrow not installed; results are written to CSV only")
+        return None
+    return ResultsStore(root)
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from core import tracing
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'robot_profiles.json')
+# Profile for robot IDs that name no known profile (e.g. robot1, limo_1)
+DEFAULT_PROFILE = "limo_standard"
+
+
+class ProfileSnapshot:
+    """
+    One loaded version of the profiles file plus its resolution index. Never mutated after
+    construction apart from the memo, so a consumer that holds a snapshot for a whole call
+    sees a single consistent version even if the file is reloaded meanwhile.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]], version: int = 0, mtime_ns: Optional[int] = None):
+        self.profiles = profiles
+        self.version = version
+        self.mtime_ns = mtime_ns
+        # Longest names first, so limo_heavy_xl wins over limo_heavy for limo_heavy_xl_2
+        self._names = sorted(profiles, key=len, reverse=True)
+        # robot ID -> resolved profile; filled lazily, dies with the snapshot on reload
+        self._memo: Dict[str, Dict[str, Any]] = {}
+
+    def _match(self, robot: str) -> str:
+        for name in self._names:
+            if robot.startswith(name):
+                return name
+        # Profile named inside the ID (e.g. my_limo_scout); matches the old substring scan
+        for name in self._names:
+            if name in robot:
+                return name
+        return DEFAULT_PROFILE
+
+    def resolve(self, robot: str) -> Dict[str, Any]:
+        """
+        Profile for a robot instance (e.g. limo_scout1 -> limo_scout), memoized per robot ID.
+        """
+        profile = self._memo.get(robot)
+        if profile is None:
+            profile = self._memo[robot] = self.profiles.get(self._match(robot), {})
+        return profile
+
+    def resolve_all(self, robots: List[str]) -> List[Dict[str, Any]]:
+        with tracing.span("profiles.resolve"):
+            return [self.resolve(r) for r in robots]
+
+
+class ProfileRegistry:
+    """
+    Process-wide view of config/robot_profiles.json. The file is read once; afterwards its
+    mtime is checked at most every `check_interval` seconds and an edited file is loaded
+    into a new ProfileSnapshot that replaces the old one in a single assignment, so a
+    long-running node picks up profile changes without a restart. A file that fails to
+    load keeps the previous snapshot (empty profiles if there never was one).
+    """
+
+    def __init__(self, path: str = PROFILES_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._snapshot = self._load(None)
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, previous: Optional[ProfileSnapshot]) -> ProfileSnapshot:
+        mtime_ns = self._stat()
+        version = previous.version + 1 if previous else 0
+        try:
+            with open(self.path, 'r') as f:
+                profiles = json.load(f)
+        except Exception as e:
+            if previous is not None:
+                print(f"⚠️ Keeping robot profiles v{previous.version}: failed to reload {self.path}: {e}")
+                return ProfileSnapshot(previous.profiles, previous.version, mtime_ns)
+            print(f"⚠️ Failed to load robot profiles from {self.path}: {e}")
+            profiles = {}
+        return ProfileSnapshot(profiles, version, mtime_ns)
+
+    def snapshot(self) -> ProfileSnapshot:
+        """
+        The current profiles, reloaded first if the file changed since the last check.
+        """
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if now - self._checked < self.check_interval:
+            return snapshot
+        with self._lock:
+            self._checked = now
+            snapshot = self._snapshot
+            if self._stat() != snapshot.mtime_ns:
+                snapshot = self._snapshot = self._load(snapshot)
+        return snapshot
+
+    def reload(self) -> ProfileSnapshot:
+        with self._lock:
+            self._checked = time.monotonic()
+            snapshot = self._snapshot = self._load(self._snapshot)
+        return snapshot
+
+    @property
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        return self.snapshot().profiles
+
+    def resolve(self, robot: str) -> Dict[str, Any]:
+        return self.snapshot().resolve(robot)
+
+    def resolve_all(self, robots: List[str]) -> List[Dict[str, Any]]:
+        return self.snapshot().resolve_all(robots)
+
+
+_REGISTRY: Optional[ProfileRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> ProfileRegistry:
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = ProfileRegistry()
+    return _REGISTRY
+
+
+def configure(path: str = PROFILES_PATH, check_interval: float = 1.0) -> ProfileRegistry:
+    """
+    Points the process-wide registry at another profiles file (tests, generated fleets);
+    every consumer picks it up on its next lookup.
+    """
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        _REGISTRY = ProfileRegistry(path, check_interval)
+    return _REGISTRY
+
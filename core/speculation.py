@@ -0,0 +1,93 @@
+import copy
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# The fields the PDDL problem is built from; 'tasks' and 'constraints' only feed the MILP
+GOAL_FIELDS = ("robots", "initial_state", "goal_predicates")
+
+
+class SpeculativePlan:
+    """
+    Starts planning on a partially streamed parse as soon as the goal-relevant fields have
+    closed (pass on_fields to LLMClient.parse_instruction_stream), in a background thread
+    while the LLM is still generating the rest. resolve() then confirms the speculative plan
+    against the problem built from the full, validated parse, or discards it.
+    """
+
+    def __init__(self, plan_fn: Callable[[Dict[str, Any]], Optional[List[str]]], required=GOAL_FIELDS):
+        """
+        :param plan_fn: Plans a (partial) parse: PDDL generation + planner; returns the plan or None.
+        """
+        self.plan_fn = plan_fn
+        self.required = required
+        self.fields: Optional[Dict[str, Any]] = None
+        self.plan: Optional[List[str]] = None
+        self.error: Optional[BaseException] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def on_fields(self, fields: Dict[str, Any]):
+        if self._thread is not None or not all(k in fields for k in self.required):
+            return
+        # Missing fields default to empty; objects only adds :objects entries the goals do not need
+        self.fields = copy.deepcopy(fields)
+        data = {"tasks": [], "objects": [], "constraints": []}
+        data.update(copy.deepcopy(fields))
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, args=(data,), name="speculative-plan", daemon=True)
+        self._thread.start()
+
+    def _run(self, data: Dict[str, Any]):
+        try:
+            self.plan = self.plan_fn(data)
+        except Exception as e:
+            self.error = e
+        self.finished_at = time.perf_counter()
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def resolve(self, final_data: Optional[Dict[str, Any]], final_problem: Optional[str], checker) -> Dict[str, Any]:
+        """
+        Waits for the speculative plan and checks it against the full parse's PDDL problem.
+        :param final_data: The validated parse, or None if the LLM call failed
+        :param checker: core.plan_checker.PlanChecker
+        :return: {'status': 'confirmed' | 'discarded' | 'not_started', 'plan', 'reason', 'plan_s'}
+        """
+        if not self.started:
+            return {"status": "not_started", "plan": None, "reason": "goal fields never closed", "plan_s": None}
+        self._thread.join()
+        outcome = {"status": "discarded", "plan": None, "reason": None, "plan_s": self.finished_at - self.started_at}
+        if final_data is None:
+            outcome["reason"] = "parse failed"
+        elif self.error is not None:
+            outcome["reason"] = f"speculative planning failed: {self.error!r}"
+        elif not self.plan:
+            outcome["reason"] = "no speculative plan"
+        elif any(final_data.get(k) != self.fields.get(k) for k in self.required):
+            # A retried completion can change the goal fields
+            outcome["reason"] = "goal fields changed"
+        else:
+            # The objects/other fields may differ; the plan stands only if it still reaches the final goals
+            check = checker.check(final_problem, self.plan)
+            if check["valid"] and check["goal_reached"]:
+                outcome.update(status="confirmed", plan=self.plan)
+            else:
+                outcome["reason"] = f"plan check failed: {check['reason']}"
+        return outcome
+
+
+def speculative_timings(t_parse: float, t_plan: float, plan_s: Optional[float], after_parse_s: float,
+                        status: str) -> Tuple[float, float]:
+    """
+    Time-to-plan with speculation (measured) and without it: the parse, then the allocation/
+    PDDL work after it, then planning; the speculative planning time stands in for the latter
+    when it was confirmed, since the same problem would have been planned.
+    :return: (with speculation, without speculation) in seconds from the start of the trial.
+    """
+    if status == "confirmed" and plan_s is not None:
+        return t_plan, t_parse + after_parse_s + plan_s
+    return t_plan, t_plan
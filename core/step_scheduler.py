@@ -0,0 +1,139 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Argument positions (after the robot) that name a place rather than an object the action changes
+PLACE_ARGS = {"move_to": (0, 1), "pick_up": (1,), "place": (1,), "drop": (1,)}
+
+
+def parse_action(action_str: str) -> Optional[Tuple[str, str, List[str]]]:
+    """
+    '(pick_up limo1 box hall)' -> ('pick_up', 'limo1', ['box', 'hall']); None for blank or robot-less actions.
+    """
+    parts = action_str.lower().replace('(', '').replace(')', '').strip().split()
+    if len(parts) < 2:
+        return None
+    return parts[0], parts[1], parts[2:]
+
+
+class ScheduledAction:
+    """
+    One plan action with the earlier actions (plan indices) it has to wait for.
+    """
+
+    def __init__(self, index: int, action: str, name: str, robot: str, args: List[str], agent: int):
+        self.index = index
+        self.action = action
+        self.name = name
+        self.robot = robot
+        self.args = args
+        self.agent = agent
+        self.deps: Set[int] = set()
+        self.timestep = 0
+
+    def __repr__(self):
+        return f"ScheduledAction({self.index}, {self.action!r}, agent={self.agent}, t={self.timestep})"
+
+
+class StepSchedule:
+    """
+    A plan as a dependency graph over its actions. Actions of the same agent run in plan order;
+    actions of different agents only wait for each other when they touch the same object.
+    timesteps groups actions by their earliest start (as soon as every dependency is done),
+    so actions within one timestep are independent and can be issued together.
+    """
+
+    def __init__(self, actions: List[ScheduledAction]):
+        self.actions = actions
+        by_index = {a.index: a for a in actions}
+        for a in actions:
+            a.timestep = 1 + max((by_index[d].timestep for d in a.deps), default=-1)
+
+    @property
+    def timesteps(self) -> List[List[ScheduledAction]]:
+        steps: List[List[ScheduledAction]] = [[] for _ in range(1 + max((a.timestep for a in self.actions), default=-1))]
+        for a in self.actions:
+            steps[a.timestep].append(a)
+        return steps
+
+    def critical_path(self, durations: Dict[int, int]) -> int:
+        """
+        Length of the longest dependency chain, weighting each action by its duration
+        (e.g. simulator steps); the best makespan any parallel execution can reach.
+        """
+        finish: Dict[int, int] = {}
+        for a in self.actions:  # deps always precede their dependents in plan order
+            finish[a.index] = durations.get(a.index, 1) + max((finish[d] for d in a.deps), default=0)
+        return max(finish.values(), default=0)
+
+    def robot_prefixes(self) -> Dict[str, List[str]]:
+        """
+        {robot: its leading actions}, up to its first action that waits for another robot's;
+        a robot can run its prefix without coordinating with the rest of the fleet.
+        """
+        by_index = {a.index: a for a in self.actions}
+        prefixes: Dict[str, List[str]] = {}
+        blocked = set()
+        for a in self.actions:
+            if a.robot in blocked:
+                continue
+            if any(by_index[d].robot != a.robot for d in a.deps):
+                blocked.add(a.robot)
+                continue
+            prefixes.setdefault(a.robot, []).append(a.action)
+        return prefixes
+
+
+def schedule_plan(plan: List[str], agent_of: Optional[Callable[[str], int]] = None) -> StepSchedule:
+    """
+    Dependency analysis of a sequential (possibly multi-robot) plan.
+    Entities that only ever appear as a place are shared freely; an entity that some action
+    changes (picked, placed, opened, ...) orders every action that mentions it.
+    :param agent_of: Simulator agent executing a robot's actions (default: one agent per robot).
+    """
+    parsed = [(i, action, parse_action(action)) for i, action in enumerate(plan)]
+    parsed = [(i, action, p) for i, action, p in parsed if p]
+    robots = {p[1] for _, _, p in parsed}
+    agents: Dict[str, int] = {}
+    agent_of = agent_of or (lambda r: agents.setdefault(r, len(agents)))
+
+    stateful = set()
+    for _, _, (name, _, args) in parsed:
+        places = PLACE_ARGS.get(name, ())
+        stateful.update(a for k, a in enumerate(args) if k not in places and a not in robots)
+
+    actions = []
+    last: Dict[Tuple[str, object], int] = {}
+    for i, action, (name, robot, args) in parsed:
+        scheduled = ScheduledAction(i, action, name, robot, args, agent_of(robot))
+        keys = {("agent", scheduled.agent)}
+        keys.update(("agent", agent_of(a)) for a in args if a in robots)
+        keys.update(("entity", a) for a in args if a in stateful)
+        scheduled.deps = {last[k] for k in keys if k in last}
+        for k in keys:
+            last[k] = i
+        actions.append(scheduled)
+    return StepSchedule(actions)
+
+
+def schedule_per_robot(schedule: Dict[str, List[str]], agent_of: Optional[Callable[[str], int]] = None) -> StepSchedule:
+    """
+    Schedule for independent per-robot plans (DecomposedPlanner.plan()['schedule']): each agent's
+    actions only wait for its own earlier ones. Indices follow DecomposedPlanner.merge order.
+    """
+    agents: Dict[str, int] = {}
+    agent_of = agent_of or (lambda r: agents.setdefault(r, len(agents)))
+    plans = [schedule[r] for r in sorted(schedule)]
+    actions = []
+    last: Dict[int, int] = {}
+    index = 0
+    for k in range(max((len(p) for p in plans), default=0)):
+        for robot, p in zip(sorted(schedule), plans):
+            if k >= len(p):
+                continue
+            name, action_robot, args = parse_action(p[k]) or ("", robot, [])
+            scheduled = ScheduledAction(index, p[k], name, action_robot, args, agent_of(action_robot))
+            if scheduled.agent in last:
+                scheduled.deps = {last[scheduled.agent]}
+            last[scheduled.agent] = index
+            actions.append(scheduled)
+            index += 1
+    return StepSchedule(actions)
@@ -1,28 +1,67 @@
-import ai2thor.controller
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Deque, Set
 import time
 import logging
+import collections
+from core.cost_model import load_scene_locations
+from core.frame_writer import FrameWriter
+from core.step_scheduler import ScheduledAction, StepSchedule, parse_action, schedule_plan, schedule_per_robot
+from core.tracing import traced
+
+# Pauses in visual mode so the simulation can be followed on screen; fast mode skips them
+STEP_PAUSE_S = 0.5
+MOVE_PAUSE_S = 0.05
+ROTATE_PAUSE_S = 0.1
+# Intermediate teleports per move_to in visual mode (fast mode teleports straight to the target)
+MOVE_INTERPOLATION_STEPS = 5
 
 class ThorController:
     """
     Enhanced bridge between PDDL action plans and AI2-THOR simulation.
     Supports multi-agent coordination, continuous movement, and third-party cameras.
+    With several agents, plan actions are scheduled by their dependencies (core.step_scheduler)
+    and independent agents advance together, one simulator step each per tick.
+    In fast mode there are no artificial pauses, moves are a single teleport and frame
+    capture is off unless requested; captured frames are written by a background FrameWriter.
     """
-    def __init__(self, scene: str = "FloorPlan1", num_agents: int = 1):
+    def __init__(self, scene: str = "FloorPlan1", num_agents: int = 1, fast: bool = False,
+                 capture_frames: Optional[bool] = None, frame_dir: str = ".", frame_workers: int = 2,
+                 max_pending_frames: int = 8, headless: bool = False, controller: Any = None):
+        """
+        :param capture_frames: Save agent/overview PNGs after every action (default: on unless fast).
+        :param max_pending_frames: Frames held in memory before execution waits for the writer.
+        :param headless: Render off-screen (CloudRendering; no X display needed).
+        :param controller: Object with AI2-THOR's step()/last_event interface to use instead of
+            launching the simulator (tests, remote controllers).
+        """
         self.scene = scene
         self.num_agents = num_agents
-        self.controller = ai2thor.controller.Controller(
-            agentMode="default",
-            visibilityDistance=2.0,
-            scene=scene,
-            gridSize=0.25,
-            width=800, # Increased for better visuals
-            height=600,
-            agentCount=num_agents
-        )
+        self.fast = fast
+        self.capture_frames = not fast if capture_frames is None else capture_frames
+        self.frame_dir = frame_dir
+        self.frame_workers = frame_workers
+        self.max_pending_frames = max_pending_frames
+        self.stats = self._empty_stats()
+        if controller is None:
+            # Imported here so headless code paths (ROS node, run_eval) never load the simulator
+            import ai2thor.controller
+            extra = {}
+            if headless:
+                import ai2thor.platform
+                extra["platform"] = ai2thor.platform.CloudRendering
+            controller = ai2thor.controller.Controller(
+                agentMode="default",
+                visibilityDistance=2.0,
+                scene=scene,
+                gridSize=0.25,
+                width=800, # Increased for better visuals
+                height=600,
+                agentCount=num_agents,
+                **extra
+            )
+        self.controller = controller
         
         # Add a Third-Party Camera for a global overview (Kitchen/Lab friendly)
-        self.controller.step(
+        self._step(
             action="AddThirdPartyCamera",
             position={"x": -1.5, "y": 2.5, "z": 0.0},
             rotation={"x": 30, "y": 90, "z": 0}
@@ -31,29 +70,38 @@ class ThorController:
         # Mapping robot IDs to agent indices
         self.robot_to_agent = {}
         
-        # Enhanced mapping for demo locations to THOR coordinates (Kitchen/Lab)
-        self.location_map = {
-            "floor6_charging_dock": {"x": -1.25, "y": 0.9, "z": -1.5},
-            "floor6_hallway": {"x": 0.0, "y": 0.9, "z": 0.0},
-            "floor2_lab": {"x": 1.5, "y": 0.9, "z": 1.5},
-            "workbench": {"x": 0.5, "y": 0.9, "z": 1.0},
-            "floor2_lab_workbench": {"x": 0.5, "y": 0.9, "z": 1.0},
-            "sink": {"x": -0.5, "y": 0.9, "z": 1.2}
-        }
+        # Enhanced mapping for demo locations to THOR coordinates (Kitchen/Lab),
+        # shared with the cost model via config/scene_locations.json
+        self.location_map = load_scene_locations(scene)
         logging.info(f"AI2-THOR Controller initialized with {num_agents} agents on {scene}")
 
-    def execute_plan(self, plan: List[str], wait_at_end: bool = True):
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {"actions": 0, "sim_steps": 0, "sim_s": 0.0, "paused_s": 0.0, "frames_queued": 0}
+
+    def _step(self, **action):
         """
-        Executes a sequence of PDDL actions in the simulator.
+        controller.step() with step count and time spent inside the simulator recorded in self.stats.
         """
+        start = time.perf_counter()
+        event = self.controller.step(**action)
+        self.stats["sim_s"] += time.perf_counter() - start
+        self.stats["sim_steps"] += 1
+        return event
+
+    def _pause(self, seconds: float):
+        if self.fast or seconds <= 0:
+            return
+        time.sleep(seconds)
+        self.stats["paused_s"] += seconds
+
+    def _assign_agents(self, plan: List[str]):
         # Assign robots to agents
         robot_names = set()
         for action_str in plan:
-            clean_action = action_str.lower().replace('(', '').replace(')', '').strip()
-            if not clean_action: continue
-            parts = clean_action.split(' ')
-            if len(parts) > 1:
-                robot_names.add(parts[1])
+            parsed = parse_action(action_str)
+            if parsed:
+                robot_names.add(parsed[1])
         
         sorted_robots = sorted(list(robot_names))
         for i, robot in enumerate(sorted_robots):
@@ -65,102 +113,223 @@ class ThorController:
                     "y": 0.9, 
                     "z": -1.5
                 }
-                self.controller.step(
+                self._step(
                     action="Teleport", 
                     agentId=i, 
                     position=offset_pos,
                     rotation={"x": 0, "y": i * 90, "z": 0}
                 )
 
-        for i, action_str in enumerate(plan):
-            logging.info(f"Step {i+1}: Executing {action_str}")
-            clean_action = action_str.lower().replace('(', '').replace(')', '').strip()
-            if not clean_action: continue
-            parts = clean_action.split(' ')
-            if len(parts) < 2: continue
-            action_name = parts[0]
-            robot_id = parts[1]
-            args = parts[2:]
-            
-            agent_id = self.robot_to_agent.get(robot_id, 0)
-            
-            if action_name == "move_to":
-                target_loc = args[-1] if args else "floor6_hallway"
-                self.move_to_location(robot_id, target_loc)
-            elif action_name == "pick_up":
-                obj = args[0] if args else "item"
-                self.pick_up_object(robot_id, obj)
-            elif action_name in ["place", "drop"]:
-                obj = args[0] if args else "item"
-                loc = args[1] if len(args) > 1 else "here"
-                self.put_object(robot_id, obj, loc)
-            
-            # Save frames for documentation
-            event = self.controller.last_event
-            import PIL.Image
-            
-            # Agent View
-            if len(event.events) > agent_id:
-                img_agent = PIL.Image.fromarray(event.events[agent_id].frame)
-                img_agent.save(f"demo_step_{i+1}_agent_{agent_id}.png")
-                
-                # Third-Party Overview
-                if len(event.events[agent_id].third_party_camera_frames) > 0:
-                    img_ov = PIL.Image.fromarray(event.events[agent_id].third_party_camera_frames[0])
-                    img_ov.save(f"demo_step_{i+1}_overview.png")
-            
-            time.sleep(0.5)
+    def _action_steps(self, action_name: str, robot_id: str, args: List[str]) -> Iterator[Tuple[Dict[str, Any], float]]:
+        """
+        The simulator steps of one plan action, as (step kwargs, pause after it) pairs.
+        """
+        if action_name == "move_to":
+            target_loc = args[-1] if args else "floor6_hallway"
+            yield from self._move_steps(robot_id, target_loc)
+        elif action_name == "pick_up":
+            obj = args[0] if args else "item"
+            yield from self._pick_steps(robot_id, obj)
+        elif action_name in ["place", "drop"]:
+            obj = args[0] if args else "item"
+            loc = args[1] if len(args) > 1 else "here"
+            yield from self._put_steps(robot_id, obj, loc)
+
+    def _run_steps(self, steps: Iterator[Tuple[Dict[str, Any], float]]) -> int:
+        count = 0
+        for action, pause in steps:
+            self._step(**action)
+            self._pause(pause)
+            count += 1
+        return count
+
+    def _capture(self, writer: FrameWriter, step: int, agent_id: int):
+        """
+        Hands the agent view and third-party overview after a step to the background writer.
+        """
+        event = self.controller.last_event
+        if len(event.events) > agent_id:
+            writer.submit(event.events[agent_id].frame, f"demo_step_{step}_agent_{agent_id}.png")
+            self.stats["frames_queued"] += 1
+            if len(event.events[agent_id].third_party_camera_frames) > 0:
+                writer.submit(event.events[agent_id].third_party_camera_frames[0], f"demo_step_{step}_overview.png")
+                self.stats["frames_queued"] += 1
+
+    def _finish_action(self, scheduled: ScheduledAction, writer: Optional[FrameWriter]):
+        self.stats["actions"] += 1
+        # Save frames for documentation
+        if writer:
+            self._capture(writer, scheduled.index + 1, scheduled.agent)
+
+    def _run_sequential(self, steps: StepSchedule, writer: Optional[FrameWriter], durations: Dict[int, int]) -> int:
+        for scheduled in steps.actions:
+            logging.info(f"Step {scheduled.index + 1}: Executing {scheduled.action}")
+            durations[scheduled.index] = self._run_steps(self._action_steps(scheduled.name, scheduled.robot, scheduled.args))
+            self._finish_action(scheduled, writer)
+            self._pause(STEP_PAUSE_S)
+        return sum(durations.values())
+
+    def _run_concurrent(self, steps: StepSchedule, writer: Optional[FrameWriter], durations: Dict[int, int]) -> int:
+        """
+        Ticks the simulator: every tick advances each agent whose current action is ready by one
+        step, and an action starts in the tick after its last dependency finished.
+        :return: Ticks until the last action finished (the makespan in simulator steps per agent).
+        """
+        queues: Dict[int, Deque[ScheduledAction]] = {}
+        for scheduled in steps.actions:
+            queues.setdefault(scheduled.agent, collections.deque()).append(scheduled)
+        done: Set[int] = set()
+        # agent -> [action, its remaining steps, its next step]
+        running: Dict[int, list] = {}
+        ticks = 0
+        while True:
+            started = True
+            while started:
+                started = False
+                for agent in sorted(queues):
+                    queue = queues[agent]
+                    if agent in running or not queue or not queue[0].deps <= done:
+                        continue
+                    scheduled = queue.popleft()
+                    logging.info(f"Step {scheduled.index + 1} (timestep {scheduled.timestep}, agent {agent}): "
+                                 f"Executing {scheduled.action}")
+                    action_steps = self._action_steps(scheduled.name, scheduled.robot, scheduled.args)
+                    durations[scheduled.index] = 0
+                    first = next(action_steps, None)
+                    if first is None:
+                        # No simulator steps (e.g. sensing): done at once, dependents may start this tick
+                        done.add(scheduled.index)
+                        self._finish_action(scheduled, writer)
+                        started = True
+                    else:
+                        running[agent] = [scheduled, action_steps, first]
+            if not running:
+                break
+
+            ticks += 1
+            pause = 0.0
+            finished = []
+            for agent in sorted(running):
+                entry = running[agent]
+                action, step_pause = entry[2]
+                self._step(**action)
+                pause = max(pause, step_pause)
+                durations[entry[0].index] += 1
+                entry[2] = next(entry[1], None)
+                if entry[2] is None:
+                    finished.append(agent)
+            for agent in finished:
+                scheduled = running.pop(agent)[0]
+                done.add(scheduled.index)
+                self._finish_action(scheduled, writer)
+            self._pause(pause + (STEP_PAUSE_S if finished else 0.0))
+        return ticks
+
+    @traced("thor")
+    def execute_plan(self, plan: List[str], wait_at_end: bool = True, concurrent: Optional[bool] = None,
+                     schedule: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """
+        Executes a sequence of PDDL actions in the simulator.
+        Concurrent execution (default with several agents) issues the steps of independent
+        agents' actions together instead of running the plan one action at a time.
+        :param schedule: Independent per-robot plans (DecomposedPlanner.plan()['schedule']) to run
+            instead of deriving the dependencies from `plan`.
+        :return: Execution stats: actions, sim_steps, sim_s (time inside the simulator), paused_s,
+            frames_queued/frames_written, wall_s, and the makespan in ticks (one step per agent)
+            next to the sequential and critical-path tick counts.
+        """
+        concurrent = self.num_agents > 1 if concurrent is None else concurrent
+        self.stats = self._empty_stats()
+        start = time.perf_counter()
+        if schedule is not None:
+            plan = [action for robot in sorted(schedule) for action in schedule[robot]]
+        self._assign_agents(plan)
+        agent_of = lambda robot: self.robot_to_agent.get(robot, 0)
+        steps = schedule_per_robot(schedule, agent_of) if schedule is not None else schedule_plan(plan, agent_of)
+        writer = FrameWriter(self.frame_dir, self.frame_workers, self.max_pending_frames) if self.capture_frames else None
+
+        durations: Dict[int, int] = {}
+        try:
+            if concurrent:
+                makespan = self._run_concurrent(steps, writer, durations)
+            else:
+                makespan = self._run_sequential(steps, writer, durations)
+        finally:
+            if writer:
+                writer.close()
+                self.stats.update(frames_written=writer.written, frames_blocked_s=round(writer.blocked_s, 6))
+        self.stats.update(concurrent=concurrent, timesteps=len(steps.timesteps), makespan_ticks=makespan,
+                          sequential_ticks=sum(durations.values()), critical_path_ticks=steps.critical_path(durations),
+                          wall_s=time.perf_counter() - start)
             
-        if wait_at_end:
+        if wait_at_end and not self.fast:
             print("\n🏁 Action Sequence Complete.")
-            print("📸 Check the project root for demo_step_* images.")
+            if writer:
+                print(f"📸 Check {self.frame_dir} for demo_step_* images.")
             input("Press Enter to close the AI2-THOR simulator window...")
+        return self.stats
 
-    def move_to_location(self, robot_id: str, location_id: str, teleport: bool = False):
+    def _move_steps(self, robot_id: str, location_id: str, teleport: bool = False):
         agent_id = self.robot_to_agent.get(robot_id, 0)
         target_pos = self.location_map.get(location_id, {"x": 0, "y": 0.95, "z": 0})
         
         if teleport:
-            self.controller.step(
+            yield dict(
                 action="Teleport",
                 agentId=agent_id,
                 position=target_pos,
                 rotation={"x": 0.0, "y": 0.0, "z": 0.0}
-            )
+            ), 0.0
+        elif self.fast:
+            # Same end pose as the interpolated move, in one simulator step
+            yield dict(action="Teleport", agentId=agent_id, position=target_pos), 0.0
         else:
             # Simple "smooth" movement: 5 steps of interpolation for visual continuity
             # Use metadata to get position
             current_event = self.controller.last_event.events[agent_id]
             current_pos = current_event.metadata['agent']['position']
             
-            for i in range(1, 6):
+            for i in range(1, MOVE_INTERPOLATION_STEPS + 1):
+                frac = i / float(MOVE_INTERPOLATION_STEPS)
                 step_pos = {
-                    "x": current_pos["x"] + (target_pos["x"] - current_pos["x"]) * (i / 5.0),
+                    "x": current_pos["x"] + (target_pos["x"] - current_pos["x"]) * frac,
                     "y": target_pos["y"],
-                    "z": current_pos["z"] + (target_pos["z"] - current_pos["z"]) * (i / 5.0)
+                    "z": current_pos["z"] + (target_pos["z"] - current_pos["z"]) * frac
                 }
-                self.controller.step(
+                yield dict(
                     action="Teleport",
                     agentId=agent_id,
                     position=step_pos
-                )
-                time.sleep(0.05)
+                ), MOVE_PAUSE_S
 
         logging.info(f"Robot {robot_id} (Agent {agent_id}) moved to {location_id}")
 
-    def pick_up_object(self, robot_id: str, object_id: str):
+    def _rotate_steps(self, agent_id: int, action: str):
+        # Visual mode turns in three 30 degree steps; fast mode turns the same 90 degrees at once
+        if self.fast:
+            yield dict(action=action, agentId=agent_id, degrees=90), 0.0
+            return
+        for _ in range(3):
+            yield dict(action=action, agentId=agent_id, degrees=30), ROTATE_PAUSE_S
+
+    def _pick_steps(self, robot_id: str, object_id: str):
         agent_id = self.robot_to_agent.get(robot_id, 0)
         logging.info(f"Robot {robot_id} picking up {object_id}")
-        for _ in range(3):
-            self.controller.step(action="RotateRight", agentId=agent_id, degrees=30)
-            time.sleep(0.1)
+        yield from self._rotate_steps(agent_id, "RotateRight")
 
-    def put_object(self, robot_id: str, object_id: str, receptacle_id: str):
+    def _put_steps(self, robot_id: str, object_id: str, receptacle_id: str):
         agent_id = self.robot_to_agent.get(robot_id, 0)
         logging.info(f"Robot {robot_id} placing {object_id} on {receptacle_id}")
-        for _ in range(3):
-            self.controller.step(action="RotateLeft", agentId=agent_id, degrees=30)
-            time.sleep(0.1)
+        yield from self._rotate_steps(agent_id, "RotateLeft")
+
+    def move_to_location(self, robot_id: str, location_id: str, teleport: bool = False):
+        self._run_steps(self._move_steps(robot_id, location_id, teleport))
+
+    def pick_up_object(self, robot_id: str, object_id: str):
+        self._run_steps(self._pick_steps(robot_id, object_id))
+
+    def put_object(self, robot_id: str, object_id: str, receptacle_id: str):
+        self._run_steps(self._put_steps(robot_id, object_id, receptacle_id))
 
     def cinematic_pan(self, output_name: str = "room_overview_360.mp4"):
         print(f"🎥 Starting 360° Cinematic Pan of {self.scene}")
@@ -170,7 +339,7 @@ class ThorController:
         
         # Rotate camera 360 degrees
         for angle in range(0, 361, 5):
-            self.controller.step(
+            self._step(
                 action="UpdateThirdPartyCamera",
                 thirdPartyCameraId=0,
                 rotation={"x": 30, "y": angle, "z": 0}
@@ -179,7 +348,7 @@ class ThorController:
             # Capture overview frame
             img_ov = PIL.Image.fromarray(event.events[0].third_party_camera_frames[0])
             frames.append(np.array(img_ov))
-            time.sleep(0.05)
+            self._pause(MOVE_PAUSE_S)
             
         print(f"🎬 Compiling {len(frames)} frames into video...")
         try:
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import threading
+import functools
+import contextvars
+from typing import Dict, Any, List, Optional, Tuple
+
+# Top-level pipeline stages; each becomes a 'stage_<name>' column (seconds) in the results
+PIPELINE_STAGES = ["llm", "cost_model", "milp", "pddl_gen", "io", "planner", "plan_decomposed",
+                   "plan_check", "validate", "thor"]
+
+# Per-trial stage totals for whichever trial the current context belongs to
+_trial_totals: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("trial_totals", default=None)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        for hook in self.tracer.hooks:
+            hook.span_enter(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._record(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        for hook in self.tracer.hooks:
+            hook.span_exit(self.name)
+        return False
+
+
+class Tracer:
+    """
+    Nested timing spans on the monotonic perf_counter clock.
+    Durations are summed per span name into the current trial's breakdown; with
+    keep_events the individual spans are kept for a Chrome trace / Perfetto export.
+    When disabled, span() returns a shared no-op context manager.
+    Hooks (objects with span_enter(name)/span_exit(name), e.g. RunProfiler) are called
+    around every span on the thread that runs it.
+    """
+
+    def __init__(self, enabled: bool = False, keep_events: bool = False):
+        self.enabled = enabled
+        self.keep_events = keep_events
+        self.events: List[Tuple[str, int, int, int, Optional[Dict[str, Any]]]] = []
+        self.hooks: List[Any] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str, **args):
+        """
+        Times a block: `with tracer.span("milp", tasks=12): ...`
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, args or None)
+
+    def start_trial(self) -> Dict[str, int]:
+        """
+        Starts a fresh stage breakdown for spans recorded in this context (thread/task).
+        """
+        totals: Dict[str, int] = {}
+        _trial_totals.set(totals)
+        return totals
+
+    def trial_stages(self, totals: Optional[Dict[str, int]] = None) -> Dict[str, float]:
+        """
+        :return: {'stage_<name>': seconds} for the current (or given) trial.
+        """
+        totals = _trial_totals.get() if totals is None else totals
+        return {f"stage_{name}": round(ns / 1e9, 6) for name, ns in (totals or {}).items()}
+
+    def _record(self, name: str, start_ns: int, dur_ns: int, args: Optional[Dict[str, Any]]):
+        totals = _trial_totals.get()
+        with self._lock:
+            if totals is not None:
+                totals[name] = totals.get(name, 0) + dur_ns
+            if self.keep_events:
+                self.events.append((name, start_ns, dur_ns, threading.get_ident(), args))
+
+    def export_chrome(self, path: str) -> str:
+        """
+        Writes kept spans as Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev).
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        trace = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "lamma_p"}}]
+        for name, start_ns, dur_ns, tid, args in events:
+            event = {"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start_ns - self._origin) / 1000.0, "dur": dur_ns / 1000.0}
+            if args:
+                event["args"] = {k: v if isinstance(v, (str, int, float, bool)) else str(v) for k, v in args.items()}
+            trace.append(event)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.events = []
+            self._origin = time.perf_counter_ns()
+
+
+def format_stages(stages: Dict[str, float]) -> str:
+    """
+    One-line breakdown of trial_stages() output, top-level stages only.
+    """
+    parts = [f"{name[len('stage_'):]} {secs:.3f}s" for name, secs in stages.items() if "." not in name]
+    return " | ".join(parts) if parts else "no spans recorded"
+
+
+_TRACER = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _TRACER
+
+
+def configure(enabled: bool = True, keep_events: bool = False) -> Tracer:
+    """
+    Switches the process-wide tracer on/off; instrumented code picks this up immediately.
+    """
+    _TRACER.enabled = enabled
+    _TRACER.keep_events = keep_events
+    return _TRACER
+
+
+def span(name: str, **args):
+    """
+    Span on the process-wide tracer (no-op unless tracing is configured on).
+    """
+    if not _TRACER.enabled:
+        return _NOOP_SPAN
+    return _Span(_TRACER, name, args or None)
+
+
+def traced(name: str):
+    """
+    Decorator form of span() for whole functions/methods.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _TRACER.enabled:
+                return func(*args, **kwargs)
+            with _Span(_TRACER, name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
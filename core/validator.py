@@ -1,5 +1,22 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
 import re
+import sys
+import collections
+
+from core.tracing import traced
+
+# Action grammar shared by both validators: name(arg1, arg2, ...)
+_CALL_RE = re.compile(r"(\w+)\((.*)\)")
+
+# Object state codes and the transition table of the compiled validator
+_CLOSED, _OPENED, _ON, _OFF = 1, 2, 3, 4
+_INIT_STATES = {"closed": _CLOSED, "opened": _OPENED, "switchedon": _ON, "switchedoff": _OFF}
+_ACTION_STATES = {"open": _OPENED, "close": _CLOSED, "switch_on": _ON, "switch_off": _OFF}
+# Opcodes: pick up, place/drop, set object state; anything else is a no-op
+_OP_PICK, _OP_PLACE, _OP_SET = 1, 2, 3
+_OPCODES = {"pick_up": _OP_PICK, "place": _OP_PLACE, "drop": _OP_PLACE}
+_OPCODES.update({a: _OP_SET for a in _ACTION_STATES})
 
 class PlanValidator:
     """
@@ -28,7 +45,7 @@ class PlanValidator:
         if initial_predicates:
             for p in initial_predicates:
                 p = p.lower().strip()
-                match = re.search(r"(\w+)\((.*)\)", p)
+                match = _CALL_RE.search(p)
                 if not match: continue
                 pred, args = match.group(1), [a.strip() for a in match.group(2).split(",")]
                 
@@ -43,7 +60,7 @@ class PlanValidator:
 
         for task in tasks:
             task = task.lower().strip()
-            match = re.search(r"(\w+)\((.*)\)", task)
+            match = _CALL_RE.search(task)
             if not match: continue
             action, args = match.group(1), [a.strip() for a in match.group(2).split(",")]
 
@@ -93,6 +110,7 @@ class PlanValidator:
         return True
 
     @staticmethod
+    @traced("validate")
     def calculate_logical_score(tasks: List[str], initial_predicates: Optional[List[str]] = None) -> float:
         """
         Returns a score between 0 and 1 based on task consistency.
@@ -100,7 +118,140 @@ class PlanValidator:
         if not tasks:
             return 1.0
         
-        return 1.0 if PlanValidator.validate_task_sequence(tasks, initial_predicates) else 0.0
+        return 1.0 if _DEFAULT_COMPILED.validate(tasks, initial_predicates) else 0.0
+
+class CompiledPlanValidator:
+    """
+    Table-driven equivalent of PlanValidator.validate_task_sequence for scoring
+    large result sets. Each distinct task string is parsed once into an opcode
+    tuple with interned symbols, initial predicates are compiled once per distinct
+    list, and a run is a flat loop over cached opcodes. Verdicts are identical.
+    Both caches are LRU-bounded so a long sweep does not grow them without limit.
+    """
+
+    def __init__(self, max_tasks: int = 100_000, max_inits: int = 1_000):
+        self.max_tasks = max_tasks
+        self.max_inits = max_inits
+        # task string -> (opcode, arg, arg) or None for no-ops
+        self._ops: "collections.OrderedDict[str, Optional[Tuple]]" = collections.OrderedDict()
+        # tuple(initial predicates) -> (object states, object -> containers)
+        self._inits: "collections.OrderedDict[Tuple[str, ...], Tuple[Dict[str, int], Dict[str, List[str]]]]" = collections.OrderedDict()
+
+    @staticmethod
+    def _touch(cache: collections.OrderedDict, key):
+        try:
+            cache.move_to_end(key)
+        except KeyError:  # evicted by another thread in between
+            pass
+
+    @staticmethod
+    def _remember(cache: collections.OrderedDict, key, value, limit: int):
+        cache[key] = value
+        while len(cache) > limit:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+        return value
+
+    def _compile_task(self, task: str) -> Optional[Tuple]:
+        match = _CALL_RE.search(task.lower().strip())
+        if not match:
+            return None
+        action, args = match.group(1), [sys.intern(a.strip()) for a in match.group(2).split(",")]
+        op = _OPCODES.get(action)
+        if op == _OP_PICK:
+            return (_OP_PICK, args[0])
+        if op == _OP_PLACE:
+            return (_OP_PLACE, args[0], args[1] if len(args) > 1 else None)
+        if op == _OP_SET:
+            return (_OP_SET, args[0], _ACTION_STATES[action])
+        return None
+
+    def _compile_init(self, initial_predicates: Optional[Sequence[str]]):
+        key = tuple(initial_predicates or ())
+        compiled = self._inits.get(key)
+        if compiled is not None:
+            self._touch(self._inits, key)
+        else:
+            states, inside = {}, {}
+            for p in key:
+                match = _CALL_RE.search(p.lower().strip())
+                if not match: continue
+                pred, args = match.group(1), [sys.intern(a.strip()) for a in match.group(2).split(",")]
+                if pred in _INIT_STATES:
+                    states[args[0]] = _INIT_STATES[pred]
+                elif pred == "inside":
+                    inside.setdefault(args[0], []).append(args[1])
+            compiled = self._remember(self._inits, key, (states, inside), self.max_inits)
+        return compiled
+
+    def validate(self, tasks: List[str], initial_predicates: Optional[Sequence[str]] = None) -> bool:
+        if not tasks:
+            return True
+        init_states, inside = self._compile_init(initial_predicates)
+        states = dict(init_states)
+        holding = None
+        ops = self._ops
+
+        for task in tasks:
+            op = ops.get(task, False)
+            if op is False:
+                op = self._remember(ops, task, self._compile_task(task), self.max_tasks)
+            else:
+                self._touch(ops, task)
+            if op is None:
+                continue
+
+            code = op[0]
+            if code == _OP_SET:
+                states[op[1]] = op[2]
+            elif code == _OP_PICK:
+                if holding: return False # Already holding something
+                for container in inside.get(op[1], ()):
+                    if states.get(container) == _CLOSED:
+                        return False # Cannot pick up from closed container
+                holding = op[1]
+            else:
+                if not holding: return False
+                if op[1] != holding: return False
+                if op[2] is not None and states.get(op[2]) == _CLOSED:
+                    return False # Cannot place in closed container
+                holding = None
+
+        return True
+
+    def validate_batch(self, sequences: Sequence[Union[List[str], Tuple[List[str], List[str]]]],
+                       initial_predicates: Optional[Sequence[str]] = None, workers: Optional[int] = None,
+                       chunksize: int = 2048) -> List[bool]:
+        """
+        Validates many task lists at once.
+        :param sequences: Task lists, or (tasks, initial_predicates) pairs to override the shared predicates.
+        :param initial_predicates: Predicates shared by every plain task list.
+        :param workers: Process pool size; None validates in-process.
+        """
+        if workers and len(sequences) > chunksize:
+            chunks = [(sequences[i:i + chunksize], initial_predicates) for i in range(0, len(sequences), chunksize)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return [v for part in pool.map(_validate_chunk, chunks) for v in part]
+
+        results = []
+        for item in sequences:
+            if isinstance(item, tuple):
+                results.append(self.validate(item[0], item[1]))
+            else:
+                results.append(self.validate(item, initial_predicates))
+        return results
+
+
+# Shared instance so parse caches persist across trials
+_DEFAULT_COMPILED = CompiledPlanValidator()
+
+
+def _validate_chunk(chunk) -> List[bool]:
+    sequences, initial_predicates = chunk
+    return CompiledPlanValidator().validate_batch(sequences, initial_predicates)
+
 
 if __name__ == "__main__":
     # Test cases
@@ -0,0 +1,94 @@
+import argparse
+import os
+import sys
+import csv
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.optimizer import MILPOptimizer
+from core.planner_client import FastDownwardClient
+from core.decomposition import DecomposedPlanner
+from config import RESULTS_DIR
+
+DOMAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'domain.pddl')
+
+
+def make_delivery_scenario(num_robots: int):
+    """
+    One delivery per robot: block_i starts in room_i_a and must end up in room_i_b.
+    The cost matrix makes robot i the cheapest choice for its own block.
+    """
+    robots = [f"limo_standard_{i}" for i in range(num_robots)]
+    data = {"robots": robots, "objects": [], "initial_state": [], "goal_predicates": [], "tasks": [], "constraints": []}
+    for i, r in enumerate(robots):
+        block, src, dst = f"block_{i}", f"room_{i}_a", f"room_{i}_b"
+        data["objects"].append(block)
+        data["initial_state"] += [f"at({r}, dock_{i})", f"at({block}, {src})"]
+        data["goal_predicates"].append(f"at({block}, {dst})")
+        data["tasks"] += [f"pick_up({block})", f"place({block}, {dst})"]
+    costs = {
+        r: {t: (0.1 if f"block_{i})" in t or f"block_{i}," in t else 1.0) for t in data["tasks"]}
+        for i, r in enumerate(robots)
+    }
+    return data, costs
+
+
+def run_benchmark(min_robots: int, max_robots: int, step: int, planner_path: str, workers: int, joint: bool):
+    planner = FastDownwardClient(planner_path) if planner_path else FastDownwardClient()
+    if not os.path.exists(planner.executable_path):
+        print(f"Error: Fast Downward executable not found at {planner.executable_path}")
+        return
+
+    optimizer = MILPOptimizer()
+    rows = []
+    with DecomposedPlanner(planner, max_workers=workers or None) as decomposed:
+        for n in range(min_robots, max_robots + 1, step):
+            data, costs = make_delivery_scenario(n)
+            allocation = optimizer.allocate_tasks(data["robots"], data["tasks"], costs, {})
+
+            start = time.perf_counter()
+            planned = decomposed.plan(DOMAIN_PATH, data, allocation)
+            decomposed_time = time.perf_counter() - start
+
+            joint_time, joint_len = float("nan"), 0
+            if joint:
+                start = time.perf_counter()
+                joint_plan = decomposed.plan_joint(DOMAIN_PATH, data)
+                joint_time = time.perf_counter() - start
+                joint_len = len(joint_plan) if joint_plan else 0
+
+            schedule = planned["schedule"] or {}
+            rows.append({
+                "robots": n,
+                "mode": planned["mode"],
+                "decomposed_time_s": f"{decomposed_time:.4f}",
+                "joint_time_s": f"{joint_time:.4f}",
+                "plan_length": len(planned["plan"] or []),
+                "joint_plan_length": joint_len,
+                "makespan_steps": max((len(p or []) for p in schedule.values()), default=0)
+            })
+            print(f"{n:>3} robots | {planned['mode']:<10} | decomposed {decomposed_time:8.3f}s | joint {joint_time:8.3f}s")
+
+    if not os.path.exists(RESULTS_DIR):
+        os.makedirs(RESULTS_DIR)
+    out_path = os.path.join(RESULTS_DIR, "bench_decomposed_planning.csv")
+    with open(out_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved scaling results to {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Joint vs decomposed planning scaling benchmark")
+    parser.add_argument("--min-robots", type=int, default=2)
+    parser.add_argument("--max-robots", type=int, default=20)
+    parser.add_argument("--step", type=int, default=2)
+    parser.add_argument("--planner", type=str, default="", help="Path to fast-downward.py")
+    parser.add_argument("--workers", type=int, default=0, help="Process pool size (0 = CPU count)")
+    parser.add_argument("--skip-joint", action="store_true", help="Only time the decomposed planner")
+
+    args = parser.parse_args()
+    run_benchmark(args.min_robots, args.max_robots, args.step, args.planner, args.workers, not args.skip_joint)
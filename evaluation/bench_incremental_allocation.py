@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+import csv
+import time
+import random
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.optimizer import MILPOptimizer, IncrementalAllocator
+from config import RESULTS_DIR
+
+ROBOT_KINDS = ["limo_scout", "limo_heavy", "limo_standard"]
+TASK_VERBS = ["pick_up", "place_on", "search_for", "move_to", "inspect"]
+
+
+def run_benchmark(num_robots: int, initial_tasks: int, updates: int, time_limit: float, cost_max: float, seed: int):
+    rng = random.Random(seed)
+    optimizer = MILPOptimizer()
+    allocator = IncrementalAllocator(optimizer)
+
+    robots = [f"{ROBOT_KINDS[i % len(ROBOT_KINDS)]}_{i}" for i in range(num_robots)]
+    tasks = []
+    costs = {r: {} for r in robots}
+    counter = 0
+
+    def new_task():
+        nonlocal counter
+        t = f"{rng.choice(TASK_VERBS)}_obj{counter}"
+        counter += 1
+        for r in robots:
+            costs[r][t] = rng.uniform(0.1, cost_max)
+        tasks.append(t)
+        return t
+
+    for r in robots:
+        allocator.add_robot(r, {})
+    for _ in range(initial_tasks):
+        t = new_task()
+        allocator.add_task(t, {r: costs[r][t] for r in robots})
+    allocator.solve()
+
+    rows = []
+    for step in range(updates):
+        # Streaming mix: arrivals, completions and cost drift
+        op = rng.random()
+        if op < 0.5 or not tasks:
+            kind = "add_task"
+            t = new_task()
+            start = time.perf_counter()
+            allocator.add_task(t, {r: costs[r][t] for r in robots})
+        elif op < 0.8:
+            kind = "remove_task"
+            t = tasks.pop(rng.randrange(len(tasks)))
+            start = time.perf_counter()
+            allocator.remove_task(t)
+        else:
+            kind = "update_cost"
+            t, r = rng.choice(tasks), rng.choice(robots)
+            costs[r][t] = rng.uniform(0.1, cost_max)
+            start = time.perf_counter()
+            allocator.update_cost(r, t, costs[r][t])
+        allocator.solve(time_limit=time_limit or None)
+        incremental_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        optimizer.allocate_tasks(robots, tasks, costs, {})
+        cold_time = time.perf_counter() - start
+
+        rows.append({
+            "step": step, "update": kind, "tasks": len(tasks),
+            "incremental_solver": allocator.last_solver, "cold_solver": optimizer.last_solver,
+            "incremental_s": f"{incremental_time:.5f}", "cold_s": f"{cold_time:.5f}"
+        })
+
+    inc = np.array([float(r["incremental_s"]) for r in rows])
+    cold = np.array([float(r["cold_s"]) for r in rows])
+    print(f"{num_robots} robots, ~{len(tasks)} tasks, {updates} updates")
+    for name, arr in (("incremental", inc), ("cold", cold)):
+        print(f"  {name:<12} p50 {np.percentile(arr, 50) * 1000:8.2f} ms | p95 {np.percentile(arr, 95) * 1000:8.2f} ms | total {arr.sum():7.3f} s")
+
+    if not os.path.exists(RESULTS_DIR):
+        os.makedirs(RESULTS_DIR)
+    out_path = os.path.join(RESULTS_DIR, "bench_incremental_allocation.csv")
+    with open(out_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved per-update latencies to {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental warm-started vs cold re-allocation latency")
+    parser.add_argument("--robots", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200, help="Tasks in the model before streaming starts")
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--time-limit", type=float, default=0.0, help="Bounded-time re-solve deadline in seconds (0 = none)")
+    parser.add_argument("--cost-max", type=float, default=2.0, help="Upper bound of random task costs (higher makes batteries bind)")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    run_benchmark(args.robots, args.tasks, args.updates, args.time_limit, args.cost_max, args.seed)
@@ -0,0 +1,112 @@
+import argparse
+import os
+import sys
+import csv
+import time
+import random
+
+import numpy as np
+import pulp
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.optimizer import MILPOptimizer
+from core.robot_profiles import get_registry
+from config import RESULTS_DIR
+
+SIZES = [(5, 50), (10, 200), (25, 500), (50, 1000), (100, 2000)]
+ROBOT_KINDS = ["limo_scout", "limo_heavy", "limo_standard"]
+TASK_VERBS = ["pick_up", "place_on", "search_for", "move_to", "inspect"]
+
+
+def make_instance(num_robots: int, num_tasks: int, seed: int = 0):
+    rng = random.Random(seed)
+    robots = [f"{ROBOT_KINDS[i % len(ROBOT_KINDS)]}_{i}" for i in range(num_robots)]
+    tasks = [f"{rng.choice(TASK_VERBS)}_obj{j}" for j in range(num_tasks)]
+    # Enough load per robot that battery constraints bind and CBC is actually exercised
+    cost_matrix = np.random.default_rng(seed).uniform(0.1, 2.0, size=(num_robots, num_tasks))
+    return robots, tasks, cost_matrix
+
+
+def build_dense_model(robots, tasks, cost_matrix, feasible, capacity):
+    """
+    The previous formulation: a variable for every pair plus one x == 0 row per capability mismatch.
+    """
+    prob = pulp.LpProblem("MultiRobotAllocation", pulp.LpMinimize)
+    x = pulp.LpVariable.dicts("x", (range(len(robots)), range(len(tasks))), 0, 1, pulp.LpBinary)
+    prob += pulp.lpSum([cost_matrix[i, j] * x[i][j] for i in range(len(robots)) for j in range(len(tasks))])
+    for j in range(len(tasks)):
+        prob += pulp.lpSum([x[i][j] for i in range(len(robots))]) == 1
+    for i, j in zip(*np.nonzero(~feasible)):
+        prob += x[int(i)][int(j)] == 0
+    for i in range(len(robots)):
+        prob += pulp.lpSum([cost_matrix[i, j] * x[i][j] for j in range(len(tasks))]) <= capacity[i]
+    return prob
+
+
+def model_size(prob):
+    nonzeros = sum(len(c) for c in prob.constraints.values())
+    return len(prob.variables()), len(prob.constraints), nonzeros
+
+
+def run_benchmark(solve: bool, time_limit: float, dense: bool):
+    optimizer = MILPOptimizer()
+    rows = []
+    for num_robots, num_tasks in SIZES:
+        robots, tasks, cost_matrix = make_instance(num_robots, num_tasks)
+
+        # Cold lookups: a fresh snapshot has an empty memo, as after a profile reload
+        registry = get_registry()
+        start = time.perf_counter()
+        profiles = registry.reload().resolve_all(robots)
+        profile_time = time.perf_counter() - start
+        start = time.perf_counter()
+        feasible = optimizer._capability_mask(profiles, tasks)
+        capacity = optimizer._battery_capacities(profiles)
+        mask_time = time.perf_counter() - start
+
+        variants = [("sparse", optimizer._build_model)]
+        if dense:
+            variants.append(("dense", lambda *a: (build_dense_model(*a), None)))
+
+        for name, build in variants:
+            start = time.perf_counter()
+            prob, _ = build(robots, tasks, cost_matrix, feasible, capacity)
+            build_time = time.perf_counter() - start
+            num_vars, num_rows, nonzeros = model_size(prob)
+
+            solve_time, status = float("nan"), "skipped"
+            if solve:
+                start = time.perf_counter()
+                prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit))
+                solve_time = time.perf_counter() - start
+                status = pulp.LpStatus[prob.status]
+
+            rows.append({
+                "robots": num_robots, "tasks": num_tasks, "formulation": name,
+                "profile_time_s": f"{profile_time:.4f}", "mask_time_s": f"{mask_time:.4f}", "build_time_s": f"{build_time:.4f}",
+                "variables": num_vars, "constraints": num_rows, "nonzeros": nonzeros,
+                "solve_time_s": f"{solve_time:.4f}", "status": status
+            })
+            print(f"{num_robots:>4}x{num_tasks:<5} {name:<6} | build {build_time:7.3f}s | "
+                  f"{num_vars:>7} vars {num_rows:>6} rows {nonzeros:>7} nz | solve {solve_time:7.3f}s ({status})")
+
+    if not os.path.exists(RESULTS_DIR):
+        os.makedirs(RESULTS_DIR)
+    out_path = os.path.join(RESULTS_DIR, "bench_milp_scaling.csv")
+    with open(out_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved scaling results to {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sparse vs dense MILP model build/size/solve benchmark")
+    parser.add_argument("--no-solve", action="store_true", help="Only measure model construction")
+    parser.add_argument("--no-dense", action="store_true", help="Skip the dense baseline formulation")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="CBC time limit per solve (seconds)")
+
+    args = parser.parse_args()
+    run_benchmark(not args.no_solve, args.time_limit, not args.no_dense)
@@ -0,0 +1,117 @@
+import argparse
+import csv
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import datetime
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from core.logger import BASE_HEADERS
+from core.results_store import ResultsStore
+from evaluation import visualize_results
+from evaluation.migrate_results import migrate
+
+MODELS = ["mistral:7b", "phi:latest", "llama3:8b", "qwen2:7b", "gemma:7b", "gpt-4o"]
+QUANTIZATIONS = ["none", "Q4_K_M", "Q8_0"]
+TESTCASES = ["floor6", "lab_maintenance", "kitchen"]
+EXTRA_HEADERS = ["planning_mode", "optimization_success", "planning_success", "plan_length", "plan_valid",
+                 "plan_failed_step", "executable_plan"]
+
+
+def write_history(results_dir: str, sweeps: int, trials: int, seed: int):
+    """
+    Writes one CSV per (model, quantization) like run_eval does, each holding `sweeps` runs
+    over every testcase on consecutive days.
+    """
+    rng = random.Random(seed)
+    start = datetime.datetime(2026, 1, 1)
+    rows = 0
+    for model in MODELS:
+        provider = "openai" if model.startswith("gpt") else "ollama"
+        for quant in QUANTIZATIONS:
+            path = os.path.join(results_dir, f"results_{model.replace(':', '_')}_{quant}.csv")
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=BASE_HEADERS + EXTRA_HEADERS)
+                writer.writeheader()
+                for sweep in range(sweeps):
+                    day = start + datetime.timedelta(days=sweep)
+                    for testcase in TESTCASES:
+                        for i in range(trials):
+                            success = rng.random() < 0.8
+                            plan = [f"move_to r{rng.randint(1, 3)} loc{j} loc{j + 1}" for j in range(rng.randint(2, 12))]
+                            writer.writerow({
+                                "timestamp": (day + datetime.timedelta(seconds=i)).isoformat(),
+                                "model": model, "provider": provider, "instruction_id": testcase,
+                                "success": success, "latency": f"{rng.uniform(0.2, 9.0):.4f}",
+                                "retries": rng.randint(0, 2), "json_valid": success, "fallback_used": False,
+                                "quantization": quant, "logical_score": round(rng.random(), 3),
+                                "planning_mode": "joint", "optimization_success": success,
+                                "planning_success": success, "plan_length": len(plan), "plan_valid": success,
+                                "plan_failed_step": "", "executable_plan": str(plan),
+                            })
+                            rows += 1
+    return rows
+
+
+def timed(label, fn, repeat):
+    best, df = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<44} {best * 1000:9.1f} ms  {len(df):>9} rows")
+    return best
+
+
+def run_benchmark(sweeps: int, trials: int, repeat: int, seed: int):
+    results_dir = tempfile.mkdtemp(prefix="lamma_results_")
+    original_dir = config.RESULTS_DIR
+    try:
+        rows = write_history(results_dir, sweeps, trials, seed)
+        print(f"Synthetic history: {rows} trials in {len(MODELS) * len(QUANTIZATIONS)} CSV files")
+
+        start = time.perf_counter()
+        migrate(results_dir, compact=True)
+        print(f"Migration: {time.perf_counter() - start:.2f}s\n")
+
+        visualize_results.RESULTS_DIR = results_dir
+        cols = visualize_results.CHART_COLUMNS
+        one_model = {"model": "mistral:7b", "quantization": "Q4_K_M"}
+        recent = (datetime.datetime(2026, 1, 1) + datetime.timedelta(days=max(sweeps - 7, 0))).date().isoformat()
+
+        print("Full history, chart columns")
+        csv_all = timed("CSV (read all files, concat)", lambda: visualize_results.load_csv_results(cols), repeat)
+        pq_all = timed("Parquet (column projection)", lambda: visualize_results.load_results(cols, source="store"), repeat)
+        print(f"  speedup x{csv_all / pq_all:.1f}\n")
+
+        print(f"One model/quantization, last 7 days (since {recent})")
+        csv_sel = timed("CSV (read all files, filter in pandas)",
+                        lambda: visualize_results.load_csv_results(cols, one_model, recent), repeat)
+        pq_sel = timed("Parquet (partition pruning + projection)",
+                       lambda: visualize_results.load_results(cols, one_model, recent, source="store"), repeat)
+        print(f"  speedup x{csv_sel / pq_sel:.1f}")
+
+        store = ResultsStore(os.path.join(results_dir, "store"))
+        csv_bytes = sum(os.path.getsize(os.path.join(results_dir, f)) for f in os.listdir(results_dir) if f.endswith(".csv"))
+        pq_bytes = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(store.root) for f in fs)
+        print(f"\nOn disk: CSV {csv_bytes / 1e6:.1f} MB, Parquet {pq_bytes / 1e6:.1f} MB")
+    finally:
+        visualize_results.RESULTS_DIR = original_dir
+        shutil.rmtree(results_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV vs partitioned Parquet results load time")
+    parser.add_argument("--sweeps", type=int, default=60, help="Daily sweeps of history to synthesize")
+    parser.add_argument("--trials", type=int, default=50, help="Trials per testcase per sweep")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    run_benchmark(args.sweeps, args.trials, args.repeat, args.seed)
@@ -0,0 +1,150 @@
+import argparse
+import os
+import sys
+import csv
+import time
+import statistics
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.scenario_generator import generate_scenario
+from evaluation.trials import TrialRunner
+from core import tracing
+from config import RESULTS_DIR
+
+BASE = {"robots": 4, "objects": 16, "rooms": 9, "goals": 4}
+AXES = {
+    "robots": [2, 4, 8, 16, 32],
+    "objects": [4, 8, 16, 32, 64],
+    "rooms": [4, 9, 16, 36, 64],
+    "goals": [1, 2, 4, 8, 16],
+}
+STAGES = ["cost_model", "milp", "pddl_gen", "planner", "plan_decomposed", "plan_check", "validate"]
+# Spans nested inside the stages above (reported, but not counted as the slowest stage)
+SUB_STAGES = ["profiles.resolve"]
+
+
+def parse_axis_values(values: str):
+    """
+    'robots=2,4,8;goals=1,2' -> {'robots': [2, 4, 8], 'goals': [1, 2]}
+    """
+    axes = {}
+    for part in filter(None, values.split(";")):
+        name, _, nums = part.partition("=")
+        if name.strip() not in AXES:
+            raise ValueError(f"Unknown axis '{name}' (expected one of {', '.join(AXES)})")
+        axes[name.strip()] = [int(n) for n in nums.split(",") if n.strip()]
+    return axes
+
+
+def run_point(runner: TrialRunner, params: dict, seed: int, use_planner: bool) -> dict:
+    """
+    One trial with the scenario's expected output standing in for the LLM parse.
+    Without a planner the reference plan is checked instead, so plan_check still scales with the scenario.
+    """
+    scenario = generate_scenario(seed=seed, **params)
+    result = {"success": True, "data": scenario["expected_output"], "tasks": scenario["expected_output"]["tasks"]}
+    tracer = tracing.get_tracer()
+    tracer.start_trial()
+    start = time.perf_counter()
+    allocation, pddl_problem = runner.allocate(result, scenario["initial_state"])
+    if use_planner:
+        runner.plan(result, allocation, pddl_problem)
+    else:
+        check = runner.plan_checker.check(pddl_problem, scenario["reference_plan"])
+        result["plan_valid"] = check["valid"] and check["goal_reached"]
+    TrialRunner.score(result, scenario["initial_state"])
+    total = time.perf_counter() - start
+    stages = tracer.trial_stages()
+    row = {f"stage_{s}": stages.get(f"stage_{s}", 0.0) for s in STAGES + SUB_STAGES}
+    row.update({"total_s": total, "plan_valid": result.get("plan_valid", False),
+                "optimization_success": result["optimization_success"]})
+    return row
+
+
+def run_benchmark(axes: dict, repeats: int, planning: str, planner_path: str, plots: bool):
+    tracing.configure(enabled=True)
+    runner = TrialRunner(planning, planner_path=planner_path)
+    use_planner = os.path.exists(runner.planner.executable_path)
+    if not use_planner:
+        print(f"Planner not found at {runner.planner.executable_path}; checking reference plans instead of planning.")
+
+    rows = []
+    try:
+        for axis, values in axes.items():
+            for value in values:
+                params = dict(BASE, **{axis: value})
+                if params["goals"] > params["objects"]:
+                    params["goals"] = params["objects"]
+                samples = [run_point(runner, params, seed, use_planner) for seed in range(repeats)]
+                row = {"axis": axis, "value": value, **params, "repeats": repeats,
+                       "plan_valid": sum(s["plan_valid"] for s in samples),
+                       "optimization_success": sum(s["optimization_success"] for s in samples)}
+                for key in ["total_s"] + [f"stage_{s}" for s in STAGES + SUB_STAGES]:
+                    row[key] = round(statistics.median(s[key] for s in samples), 6)
+                rows.append(row)
+                busiest = max(STAGES, key=lambda s: row[f"stage_{s}"])
+                print(f"{axis:>7}={value:<4} | total {row['total_s']:8.4f}s | slowest {busiest} "
+                      f"{row[f'stage_{busiest}']:.4f}s | valid {row['plan_valid']}/{repeats}")
+    finally:
+        runner.close()
+
+    if not os.path.exists(RESULTS_DIR):
+        os.makedirs(RESULTS_DIR)
+    out_path = os.path.join(RESULTS_DIR, "bench_scaling.csv")
+    with open(out_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved scaling results to {out_path}")
+    if plots:
+        plot_curves(rows)
+    return rows
+
+
+def plot_curves(rows):
+    """
+    One log-log chart per axis: median seconds per stage against the swept parameter.
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib not installed; skipping scaling plots.")
+        return
+    plots_dir = os.path.join(RESULTS_DIR, "plots")
+    os.makedirs(plots_dir, exist_ok=True)
+    for axis in dict.fromkeys(r["axis"] for r in rows):
+        points = [r for r in rows if r["axis"] == axis]
+        fig, ax = plt.subplots(figsize=(7, 5))
+        for stage in STAGES + SUB_STAGES:
+            ys = [r[f"stage_{stage}"] for r in points]
+            if any(ys):
+                ax.plot([r["value"] for r in points], ys, marker="o", label=stage)
+        ax.plot([r["value"] for r in points], [r["total_s"] for r in points], "k--", label="total")
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel(axis)
+        ax.set_ylabel("median seconds")
+        ax.set_title(f"Per-stage scaling with {axis}")
+        ax.legend()
+        path = os.path.join(plots_dir, f"scaling_{axis}.png")
+        fig.savefig(path, bbox_inches="tight")
+        plt.close(fig)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-stage scaling on generated scenarios (no LLM)")
+    parser.add_argument("--axes", type=str, default=None,
+                        help="Override swept values, e.g. 'robots=2,4,8;rooms=4,16' (default: all axes)")
+    parser.add_argument("--repeats", type=int, default=3, help="Seeds per point; medians are reported")
+    parser.add_argument("--planning", choices=["joint", "decomposed"], default="joint")
+    parser.add_argument("--planner", type=str, default=None, help="Path to fast-downward.py")
+    parser.add_argument("--no-plots", action="store_true")
+
+    args = parser.parse_args()
+    run_benchmark(parse_axis_values(args.axes) if args.axes else AXES, args.repeats, args.planning, args.planner,
+                  not args.no_plots)
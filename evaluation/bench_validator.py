@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+import random
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.validator import PlanValidator, CompiledPlanValidator
+
+OBJECTS = ["apple", "box", "red_block", "fridge", "microwave", "coffee_machine", "workbench"]
+ACTIONS = ["pick_up", "place", "open", "close", "switch_on", "switch_off", "move_to"]
+INITIAL_STATE = ["closed(fridge)", "inside(apple, fridge)", "switchedoff(coffee_machine)", "closed(microwave)"]
+
+
+def make_corpus(size: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        [f"{rng.choice(ACTIONS)}({rng.choice(OBJECTS)})" for _ in range(rng.randint(3, 15))]
+        for _ in range(size)
+    ]
+
+
+def run_benchmark(size: int, workers: int, seed: int):
+    corpus = make_corpus(size, seed)
+    print(f"Scoring {size} task lists")
+
+    start = time.perf_counter()
+    reference = [PlanValidator.validate_task_sequence(tasks, INITIAL_STATE) for tasks in corpus]
+    legacy_time = time.perf_counter() - start
+    print(f"  legacy    {legacy_time:8.3f}s  ({size / legacy_time:10.0f} seq/s)")
+
+    start = time.perf_counter()
+    compiled = CompiledPlanValidator().validate_batch(corpus, INITIAL_STATE)
+    compiled_time = time.perf_counter() - start
+    print(f"  compiled  {compiled_time:8.3f}s  ({size / compiled_time:10.0f} seq/s)  x{legacy_time / compiled_time:.1f}")
+
+    if workers:
+        start = time.perf_counter()
+        pooled = CompiledPlanValidator().validate_batch(corpus, INITIAL_STATE, workers=workers)
+        pooled_time = time.perf_counter() - start
+        print(f"  pool({workers})   {pooled_time:8.3f}s  ({size / pooled_time:10.0f} seq/s)  x{legacy_time / pooled_time:.1f}")
+        assert pooled == reference, "process-pool verdicts differ from the reference validator"
+
+    assert compiled == reference, "compiled verdicts differ from the reference validator"
+    print(f"Verdicts identical ({sum(reference)} valid / {size - sum(reference)} invalid)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Legacy vs compiled PlanValidator throughput")
+    parser.add_argument("--size", type=int, default=200000, help="Number of task lists to score")
+    parser.add_argument("--workers", type=int, default=0, help="Also run the batch API across a process pool")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    run_benchmark(args.size, args.workers, args.seed)
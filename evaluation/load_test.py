@@ -0,0 +1,308 @@
+import argparse
+import os
+import io
+import sys
+import csv
+import json
+import time
+import queue
+import random
+import itertools
+import threading
+import contextlib
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.parse_corpus import ParseCorpus
+from evaluation.trials import load_testcase
+from config import RESULTS_DIR, PARSE_CORPUS, TESTCASES_DIR
+
+RATES = [0.5, 1, 2, 5, 10, 20]
+
+
+def poisson_arrivals(rate: float, duration: float, seed: int = 0) -> List[float]:
+    """
+    Arrival offsets (seconds) of a Poisson process: exponential gaps with mean 1/rate.
+    """
+    rng = random.Random(seed)
+    arrivals, t = [], rng.expovariate(rate)
+    while t < duration:
+        arrivals.append(t)
+        t += rng.expovariate(rate)
+    return arrivals
+
+
+def load_trace(path: str) -> List[float]:
+    """
+    Recorded arrivals: one timestamp per line, or JSONL with a 't' field. Shifted to start at 0.
+    """
+    times = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                times.append(float(json.loads(line)["t"]) if line.startswith("{") else float(line))
+    times.sort()
+    return [t - times[0] for t in times]
+
+
+def trace_arrivals(trace: List[float], rate: float, duration: float) -> List[float]:
+    """
+    Replays a trace's burst pattern at `rate` requests/s: offsets are rescaled so the trace's
+    mean rate matches, and the trace repeats until `duration`.
+    """
+    if len(trace) < 2:
+        raise ValueError("Arrival trace needs at least two timestamps")
+    span = trace[-1] * len(trace) / (len(trace) - 1)  # one mean gap after the last arrival before looping
+    scale = (len(trace) / span) / rate
+    arrivals = []
+    for loop in itertools.count():
+        for t in trace:
+            at = (loop * span + t) * scale
+            if at >= duration:
+                return arrivals
+            arrivals.append(at)
+    return arrivals
+
+
+class RecordedLLMClient:
+    """
+    Stands in for LLMClient: cycles through recorded parses (the parse corpus or a testcase's
+    expected output) after sleeping `latency` seconds, exponentially distributed if `jitter`.
+    """
+
+    def __init__(self, parses: List[Dict[str, Any]], latency: float = 0.0, jitter: bool = False, seed: int = 0):
+        self.provider, self.model = "recorded", "recorded"
+        self.latency = latency
+        self.jitter = jitter
+        self._parses = itertools.cycle(parses)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def parse_instruction(self, instruction: str, system_prompt: Optional[str] = None) -> dict:
+        with self._lock:
+            data = next(self._parses)
+            delay = self._rng.expovariate(1 / self.latency) if self.jitter and self.latency > 0 else self.latency
+        start = time.time()
+        time.sleep(delay)
+        return {"data": json.loads(json.dumps(data)), "latency": time.time() - start, "retries": 0, "success": True,
+                "provider": self.provider, "model": self.model}
+
+
+def drive(handle: Callable[[str], Any], arrivals: List[float], instructions: List[str], workers: int = 1,
+          drain_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Open-loop run: a feeder thread releases request i at arrivals[i] regardless of how far
+    behind the service is, and `workers` threads serve the FIFO queue. Latency is measured
+    from the scheduled arrival, so a slow service cannot hide queueing delay by slowing
+    down the load (no coordinated omission). `handle` may return a dict of extra fields for
+    the record, e.g. {'queued_s': ...} for time spent queued inside the service itself.
+    :return: {'requests': one record per request with arrival/start/finish offsets
+             (finish None if still queued when the drain timeout ran out), 'max_queue_depth': n}
+    """
+    records = [{"arrival": a, "start": None, "finish": None, "error": None} for a in arrivals]
+    pending: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    depth = {"max": 0}
+    t0 = time.perf_counter()
+
+    def feed():
+        for i, at in enumerate(arrivals):
+            delay = t0 + at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pending.put(i)
+            depth["max"] = max(depth["max"], pending.qsize())
+
+    def serve():
+        while not stop.is_set():
+            try:
+                i = pending.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            rec = records[i]
+            rec["start"] = time.perf_counter() - t0
+            try:
+                rec.update(handle(instructions[i % len(instructions)]) or {})
+            except Exception as e:
+                rec["error"] = repr(e)
+            rec["finish"] = time.perf_counter() - t0
+
+    feeder = threading.Thread(target=feed, name="load-feed", daemon=True)
+    servers = [threading.Thread(target=serve, name=f"load-serve-{w}", daemon=True) for w in range(max(workers, 1))]
+    for thread in [feeder] + servers:
+        thread.start()
+    feeder.join()
+    deadline = None if drain_timeout is None else time.perf_counter() + drain_timeout
+    while any(r["finish"] is None for r in records) and (deadline is None or time.perf_counter() < deadline):
+        time.sleep(0.01)
+    # Drop the backlog so it does not leak into the next load level; in-service requests finish
+    stop.set()
+    for thread in servers:
+        thread.join()
+    return {"requests": records, "max_queue_depth": depth["max"]}
+
+
+def summarize(run: Dict[str, Any], rate: float, duration: float) -> Dict[str, Any]:
+    """
+    Throughput, queueing delay and end-to-end latency percentiles for one offered load.
+    """
+    requests = run["requests"]
+    dropped = [r for r in requests if r.get("outcome") == "dropped"]
+    done = [r for r in requests if r["finish"] is not None and r["error"] is None and r.get("outcome") != "dropped"]
+    row = {"offered_rps": rate, "arrival_rps": round(len(requests) / duration, 3), "requests": len(requests),
+           "completed": len(done), "dropped": len(dropped), "errors": sum(1 for r in requests if r["error"] is not None),
+           "unfinished": sum(1 for r in requests if r["finish"] is None), "max_queue_depth": run["max_queue_depth"]}
+    if done:
+        last = max(r["finish"] for r in done)
+        queue_delay = np.array([r["start"] - r["arrival"] + r.get("queued_s", 0.0) for r in done])
+        service = np.array([r["finish"] - r["start"] - r.get("queued_s", 0.0) for r in done])
+        e2e = np.array([r["finish"] - r["arrival"] for r in done])
+        row.update({
+            "achieved_rps": round(len(done) / max(last, duration), 3),
+            "queue_p50_s": round(float(np.percentile(queue_delay, 50)), 4),
+            "queue_p99_s": round(float(np.percentile(queue_delay, 99)), 4),
+            "service_p50_s": round(float(np.percentile(service, 50)), 4),
+            "e2e_p50_s": round(float(np.percentile(e2e, 50)), 4),
+            "e2e_p99_s": round(float(np.percentile(e2e, 99)), 4),
+        })
+    return row
+
+
+def is_saturated(row: Dict[str, Any], slo: Optional[float] = None, tolerance: float = 0.9) -> bool:
+    """
+    A load level is past saturation when requests are left unserved or dropped, the service
+    falls behind the arrivals it actually got, or the p99 latency breaks the SLO.
+    """
+    if not row["completed"] or row["unfinished"] or row.get("dropped"):
+        return True
+    behind = row["achieved_rps"] < tolerance * row["arrival_rps"]
+    return behind or (slo is not None and row["e2e_p99_s"] > slo)
+
+
+def build_node(parses: List[Dict[str, Any]], llm_latency: float, jitter: bool, planner_path: Optional[str], live: bool,
+               workers: Optional[int] = None):
+    """
+    :return: (node, handle, concurrency): handle(instruction) goes through the node's
+             dispatcher when it has one (worker pool, backpressure, drop policy) and returns
+             once the request finished or was dropped.
+    """
+    from scripts import lamma_test_node
+    if hasattr(lamma_test_node, "rclpy") and not lamma_test_node.rclpy.ok():
+        lamma_test_node.rclpy.init()
+    client = None if live else RecordedLLMClient(parses, llm_latency, jitter)
+    node = lamma_test_node.LaMMATestNode(client=client) if workers is None else lamma_test_node.LaMMATestNode(client=client, workers=workers)
+    if planner_path:
+        node.planner.executable_path = planner_path
+    if not os.path.exists(node.planner.executable_path):
+        print(f"⚠️ Planner not found at {node.planner.executable_path}; planning fails fast and service times are optimistic.")
+
+    if node.dispatcher is None:
+        # Inline node: the single-threaded executor is the only server
+        return node, lambda instruction: {"outcome": node.process(instruction)}, 1
+
+    def handle(instruction: str):
+        request = node.dispatcher.submit(instruction)
+        outcome = request.wait()
+        return {"outcome": outcome, "queued_s": (request.started or time.monotonic()) - request.received}
+    # One submitter more than the node can hold, so its drop policy kicks in once it saturates;
+    # arrivals beyond that wait in the driver like messages in the subscription queue
+    return node, handle, node.dispatcher.workers + node.dispatcher.queue_size + 1
+
+
+def recorded_parses(corpus_path: str, testcase: str) -> List[Dict[str, Any]]:
+    """
+    The testcase's parses from the corpus, falling back to its expected output (mock LLM).
+    """
+    if corpus_path and os.path.exists(corpus_path):
+        parses = [e["data"] for e in ParseCorpus(corpus_path).entries(testcases=[testcase])]
+        if parses:
+            return parses
+    for name in (f"{testcase}_expected_output.json", "expected_output.json"):
+        path = os.path.join(TESTCASES_DIR, testcase, name)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return [json.load(f)]
+    raise FileNotFoundError(f"No recorded parses for testcase {testcase}: record a corpus with run_eval.py first")
+
+
+def run_load_test(rates: List[float], duration: float, testcase: str, trace: Optional[str] = None, llm_latency: float = 0.5,
+                  jitter: bool = True, live: bool = False, corpus: str = PARSE_CORPUS, planner_path: Optional[str] = None,
+                  slo: Optional[float] = None, drain_timeout: Optional[float] = None, seed: int = 0, verbose: bool = False,
+                  workers: Optional[int] = None):
+    """
+    :param workers: Node worker threads (None = NODE_WORKERS, 0 = inline in the callback)
+    """
+    loaded = load_testcase(testcase)
+    if loaded is None:
+        return []
+    instruction, _ = loaded
+    parses = [] if live else recorded_parses(corpus, testcase)
+    node, handle, concurrency = build_node(parses, llm_latency, jitter, planner_path, live, workers)
+    trace_offsets = load_trace(trace) if trace else None
+
+    rows = []
+    try:
+        for rate in rates:
+            arrivals = trace_arrivals(trace_offsets, rate, duration) if trace_offsets else poisson_arrivals(rate, duration, seed)
+            print(f"▶ {rate:g} req/s offered: {len(arrivals)} requests over {duration:g}s")
+            # The node logs every stage; keep its output out of the report unless asked for
+            sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with sink:
+                # Distinct instruction texts, so the node does not coalesce the synthetic load
+                instructions = [f"{instruction} (request {i})" for i in range(len(arrivals))]
+                run = drive(handle, arrivals, instructions, workers=concurrency,
+                            drain_timeout=drain_timeout if drain_timeout is not None else duration)
+            row = summarize(run, rate, duration)
+            row["saturated"] = is_saturated(row, slo)
+            rows.append(row)
+            print(f"  achieved {row.get('achieved_rps', 0):6.2f} req/s | queue p50 {row.get('queue_p50_s', 0):7.3f}s "
+                  f"p99 {row.get('queue_p99_s', 0):7.3f}s | e2e p50 {row.get('e2e_p50_s', 0):7.3f}s "
+                  f"p99 {row.get('e2e_p99_s', 0):7.3f}s | dropped {row['dropped']} unfinished {row['unfinished']}")
+    finally:
+        node.shutdown()
+
+    stable = [r["offered_rps"] for r in rows if not r["saturated"]]
+    if stable:
+        print(f"📈 Saturation point: ~{max(stable):g} req/s (highest offered load the node kept up with"
+              f"{f' within p99 {slo:g}s' if slo else ''})")
+    else:
+        print("📈 The node was saturated at every offered load; try lower --rates.")
+
+    if rows:
+        if not os.path.exists(RESULTS_DIR):
+            os.makedirs(RESULTS_DIR)
+        out_path = os.path.join(RESULTS_DIR, "load_test.csv")
+        fields = list(dict.fromkeys(k for r in rows for k in r))
+        with open(out_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Saved load test results to {out_path}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop load test of the ROS node's instruction -> plan pipeline")
+    parser.add_argument("--rates", type=float, nargs="+", default=RATES, help="Offered loads to step through (requests/s)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of arrivals per load level")
+    parser.add_argument("--testcase", type=str, default="floor6")
+    parser.add_argument("--trace", type=str, default=None, help="Recorded arrival timestamps (replaces Poisson arrivals)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean seconds per recorded/mock LLM call")
+    parser.add_argument("--fixed-latency", action="store_true", help="Constant instead of exponential LLM latency")
+    parser.add_argument("--live", action="store_true", help="Call the configured LLM instead of replaying recorded parses")
+    parser.add_argument("--corpus", type=str, default=PARSE_CORPUS, help="Parse corpus to replay")
+    parser.add_argument("--planner", type=str, default=None, help="Path to fast-downward.py")
+    parser.add_argument("--slo", type=float, default=None, help="End-to-end p99 target (seconds) for the saturation point")
+    parser.add_argument("--drain-timeout", type=float, default=None, help="Seconds to wait for queued requests after arrivals stop (default: --duration)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show the node's own log output")
+    parser.add_argument("--workers", type=int, default=None, help="Node worker threads (default: NODE_WORKERS, 0 = inline)")
+
+    args = parser.parse_args()
+    run_load_test(args.rates, args.duration, args.testcase, args.trace, args.llm_latency, not args.fixed_latency, args.live,
+                  args.corpus, args.planner, args.slo, args.drain_timeout, args.seed, args.verbose, args.workers)
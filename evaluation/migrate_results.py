@@ -0,0 +1,63 @@
+import argparse
+import csv
+import glob
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.results_store import ResultsStore, normalize_row
+from core.aggregator import StreamingAggregator, SummaryFile
+from config import RESULTS_DIR
+
+# Identifies one trial row; loggers with RESULTS_FORMAT=both already put their rows in the store
+ROW_KEY = ["run_id", "timestamp", "model", "testcase"]
+
+
+def _row_key(row):
+    row = normalize_row(row)
+    return tuple(row.get(c) if row.get(c) != "" else None for c in ROW_KEY)
+
+
+def migrate(results_dir: str, compact: bool = False):
+    """
+    Copies every results_*.csv file into the partitioned Parquet store under results_dir/store
+    and rebuilds results_dir/summaries.json from the same rows.
+    Rows the store already holds (written there by the logger, or by an earlier migration that
+    was compacted since) are skipped; each CSV keeps a fixed file name in the store, so
+    re-running replaces its own earlier output rather than duplicating it.
+    """
+    store = ResultsStore(os.path.join(results_dir, "store"))
+    # Earlier migrations are left out: their files are rewritten below
+    existing = store.keys(ROW_KEY, exclude_prefix="migrated-")
+    csv_files = sorted(glob.glob(os.path.join(results_dir, "results_*.csv")))
+    if not csv_files:
+        print(f"No CSV files in {results_dir}")
+        return
+
+    total = 0
+    aggregator = StreamingAggregator()
+    for path in csv_files:
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        stem = os.path.splitext(os.path.basename(path))[0]
+        new_rows = [r for r in rows if _row_key(r) not in existing]
+        written = store.write(new_rows, basename=f"migrated-{stem}")
+        aggregator.add_rows(rows)
+        total += written
+        print(f"  {os.path.basename(path)}: {written} rows ({len(rows) - len(new_rows)} already in the store)")
+
+    if compact:
+        store.compact()
+    SummaryFile(os.path.join(results_dir, "summaries.json")).replace(aggregator)
+    print(f"Migrated {total} rows from {len(csv_files)} CSV files into {store.root}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="One-shot migration of results CSVs into the Parquet results store")
+    parser.add_argument("--results-dir", type=str, default=RESULTS_DIR, help="Directory holding the results CSVs")
+    parser.add_argument("--compact", action="store_true", help="Merge each partition into one file afterwards")
+
+    args = parser.parse_args()
+    migrate(args.results_dir, compact=args.compact)
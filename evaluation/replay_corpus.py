@@ -0,0 +1,154 @@
+import argparse
+import os
+import sys
+import copy
+import json
+import time
+import statistics
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import tracing
+from core.parse_corpus import ParseCorpus
+from evaluation.trials import TrialRunner, load_testcase
+from config import RESULTS_DIR, PARSE_CORPUS, PLANNING_MODE
+
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "replay_baseline.json")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def replay(entries: List[Dict[str, Any]], planning: str = PLANNING_MODE, repeats: int = 3,
+           planner_path: Optional[str] = None, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Feeds recorded parses through MILP -> PDDL -> planner -> plan check -> validation,
+    exactly as TrialRunner.run_trial does after the LLM call.
+    :param warmup: Untimed passes over the first entry (imports, CBC start-up, caches)
+    :return: Summary with per-stage median/p90/mean seconds per trial, and throughput.
+    """
+    tracer = tracing.configure(enabled=True)
+    runner = TrialRunner(planning, planner_path=planner_path)
+    states: Dict[str, dict] = {}
+
+    def initial_state(testcase: str) -> dict:
+        if testcase not in states:
+            loaded = load_testcase(testcase)
+            states[testcase] = loaded[1] if loaded else {}
+        return states[testcase]
+
+    def run_one(entry: Dict[str, Any]) -> Dict[str, float]:
+        result = {"success": True, "data": copy.deepcopy(entry["data"]), "instruction_id": entry["testcase"]}
+        state = initial_state(entry["testcase"])
+        tracer.start_trial()
+        planning_input = runner.allocate(result, state)
+        if planning_input:
+            runner.plan(result, *planning_input)
+        TrialRunner.score(result, state)
+        return tracer.trial_stages()
+
+    samples: Dict[str, List[float]] = {}
+    trials = 0
+    try:
+        for _ in range(warmup if entries else 0):
+            run_one(entries[0])
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for entry in entries:
+                stages = run_one(entry)
+                trials += 1
+                for name in set(samples) | set(stages):
+                    samples.setdefault(name, [0.0] * (trials - 1)).append(stages.get(name, 0.0))
+        elapsed = time.perf_counter() - start
+    finally:
+        runner.close()
+
+    return {
+        "parses": len(entries),
+        "trials": trials,
+        "planning": planning,
+        "elapsed_s": round(elapsed, 6),
+        "trials_per_s": round(trials / elapsed, 3) if elapsed > 0 else 0.0,
+        "stages": {name: {"median": round(statistics.median(v), 6), "p90": round(_percentile(v, 0.9), 6),
+                          "mean": round(statistics.fmean(v), 6)} for name, v in sorted(samples.items())},
+    }
+
+
+def compare_to_baseline(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+                        min_delta: float = 0.001) -> List[str]:
+    """
+    A stage regresses when its median exceeds the baseline median by more than `tolerance`
+    (fraction) and by more than `min_delta` seconds, so sub-millisecond jitter never fails a run.
+    :return: One message per regressed stage (empty if none).
+    """
+    regressions = []
+    for name, base in baseline.get("stages", {}).items():
+        current = summary["stages"].get(name)
+        if current is None:
+            continue
+        limit = base["median"] * (1 + tolerance)
+        if current["median"] > limit and current["median"] - base["median"] > min_delta:
+            slowdown = f"+{current['median'] / base['median'] - 1:.0%}" if base["median"] else "new cost"
+            regressions.append(f"{name}: median {current['median'] * 1000:.2f}ms vs baseline "
+                               f"{base['median'] * 1000:.2f}ms ({slowdown}, tolerance {tolerance:.0%})")
+    return regressions
+
+
+def print_summary(summary: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"Replayed {summary['parses']} parses x {summary['trials'] // max(summary['parses'], 1)} "
+          f"({summary['trials']} trials, {summary['planning']}) in {summary['elapsed_s']:.2f}s "
+          f"-> {summary['trials_per_s']:.1f} trials/s")
+    base_stages = (baseline or {}).get("stages", {})
+    for name, stats in summary["stages"].items():
+        line = f"  {name:<24} median {stats['median'] * 1000:9.3f}ms  p90 {stats['p90'] * 1000:9.3f}ms"
+        if name in base_stages:
+            line += f"  (baseline {base_stages[name]['median'] * 1000:.3f}ms)"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded LLM parses through the downstream stages")
+    parser.add_argument("--corpus", type=str, default=PARSE_CORPUS, help="Parse corpus recorded by run_eval / sweeps")
+    parser.add_argument("--testcases", type=str, nargs="+", default=None, help="Only replay parses of these testcases")
+    parser.add_argument("--models", type=str, nargs="+", default=None, help="Only replay parses from these models")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the corpus")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed warm-up trials")
+    parser.add_argument("--planning", type=str, default=PLANNING_MODE, choices=["joint", "decomposed"])
+    parser.add_argument("--planner", type=str, default=None, help="Path to fast-downward.py")
+    parser.add_argument("--baseline", type=str, default=None, help=f"Fail if a stage is slower than this baseline (e.g. {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", type=str, nargs="?", const=DEFAULT_BASELINE, default=None, help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per stage as a fraction of the baseline median")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="Ignore slowdowns smaller than this many seconds")
+
+    args = parser.parse_args()
+    if not os.path.exists(args.corpus):
+        sys.exit(f"No parse corpus at {args.corpus}; run evaluation/run_eval.py first to record one.")
+    entries = list(ParseCorpus(args.corpus).entries(args.testcases, args.models))
+    if not entries:
+        sys.exit("No corpus entries match the given filters.")
+
+    summary = replay(entries, args.planning, args.repeats, args.planner, args.warmup)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print_summary(summary, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline:
+        regressions = compare_to_baseline(summary, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print("❌ Stage regressions versus baseline:")
+            for msg in regressions:
+                print(f"  {msg}")
+            sys.exit(1)
+        print("✅ No stage regressions versus baseline.")
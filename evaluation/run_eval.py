@@ -1,7 +1,7 @@
 import argparse
 import os
 import sys
-import json
+import time
 import logging
 from tqdm import tqdm
 
@@ -10,94 +10,104 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.llm_client import LLMClient
 from core.logger import BenchmarkingLogger
-from core.validator import PlanValidator
-from core.optimizer import MILPOptimizer
-from core.pddl_generator import PDDLGenerator
-from core.planner_client import FastDownwardClient
-from config import TESTCASES_DIR
+from core import tracing, parse_corpus
+from core.profiling import RunProfiler, profile_dir
+from core.checkpoint import Checkpoint, run_id, cell_key
+from evaluation.trials import TrialRunner, PipelinedTrialRunner, load_testcase
+from evaluation.sweep import parse_limits
+from config import RESULTS_DIR, PLANNING_MODE, PIPELINE_WORKERS, PIPELINE_QUEUE_SIZE, PARSE_CORPUS
 
-def run_eval(model: str, provider: str, trials: int, quantization: str, testcase: str):
-    logger = BenchmarkingLogger(filename=f"results_{model.replace(':', '_')}_{quantization}.csv")
+def run_eval(model: str, provider: str, trials: int, quantization: str, testcase: str, planning: str = PLANNING_MODE,
+             trace_out: str = None, profile: str = None, mem_trials: tuple = (1, None), resume: bool = False,
+             run: str = None, pipeline: str = None, speculative: bool = False):
+    """
+    :param pipeline: Stage workers like 'llm=2,milp=1,planner=2' to overlap trials in a
+                     StagedPipeline; None runs the trials one after another.
+    :param speculative: Stream the LLM response and start joint planning on the partial parse
+                        (TrialRunner.run_trial_speculative).
+    """
+    # Per-stage timings go into every trial row; spans are only kept if a trace file is wanted
+    tracer = tracing.configure(enabled=True, keep_events=bool(trace_out))
+    parse_corpus.configure(PARSE_CORPUS)
+    run_name = f"results_{model.replace(':', '_')}_{quantization}"
+    logger = BenchmarkingLogger(filename=f"{run_name}.csv")
     client = LLMClient(provider=provider, model=model)
 
-    # Load test case
-    testcase_dir = os.path.join(TESTCASES_DIR, testcase)
-    
-    # Try multiple naming conventions for instruction
-    instruction_variants = [f"{testcase}_instruction.txt", "instruction.txt"]
-    instruction = ""
-    for v in instruction_variants:
-        p = os.path.join(testcase_dir, v)
-        if os.path.exists(p):
-            with open(p, 'r') as f:
-                instruction = f.read().strip()
-            break
-    
-    if not instruction:
-        logging.error(f"Could not find instruction for testcase {testcase}")
+    loaded = load_testcase(testcase)
+    if loaded is None:
         return
+    instruction, initial_state_data = loaded
 
-    # Load initial state if exists
-    initial_state_path = os.path.join(testcase_dir, "initial_state.json")
-    if not os.path.exists(initial_state_path):
-         initial_state_path = os.path.join(testcase_dir, f"{testcase}_initial_state.json")
-    
-    initial_state_data = {}
-    if os.path.exists(initial_state_path):
-        with open(initial_state_path, 'r') as f:
-            initial_state_data = json.load(f)
+    # Same parameters -> same run ID; trial indices already in its checkpoint are skipped on --resume
+    params = {"model": model, "provider": provider, "quantization": quantization, "testcase": testcase, "planning": planning}
+    run = run or run_id(**params)
+    checkpoint = Checkpoint(run, params=params, resume=resume)
+    pending = [i for i in range(trials) if not checkpoint.is_done(cell_key(model, provider, quantization, testcase, i))]
+
+    print(f"🚀 Starting evaluation for {model} ({provider}) - {trials} trials on testcase: {testcase} [{run}]")
+    if len(pending) < trials:
+        print(f"Resuming: {trials - len(pending)} trials already completed, {len(pending)} to go")
+
+    if pipeline and profile:
+        # cProfile and tracemalloc only see this process; the pipeline runs stages in worker processes
+        logging.warning("--profile runs trials sequentially; ignoring --pipeline")
+        pipeline = None
+    if speculative and planning != "joint":
+        logging.warning("--speculative needs joint planning; running without speculation")
+        speculative = False
+    if speculative and pipeline:
+        logging.warning("--speculative runs trials sequentially; ignoring --pipeline")
+        pipeline = None
+
+    def log(i, result):
+        result["run_id"] = run
+        result["trial_index"] = i
+        # The cell counts as done only once its row is written
+        key = cell_key(model, provider, quantization, testcase, i)
+        logger.log_trial(result, on_written=lambda: checkpoint.mark(key))
 
-    print(f"🚀 Starting evaluation for {model} ({provider}) - {trials} trials on testcase: {testcase}")
+    if pipeline:
+        workers = parse_limits(pipeline)
+        runner = PipelinedTrialRunner(client, instruction, initial_state_data, testcase, quantization, planning,
+                                      llm_workers=workers.get("llm", 2), milp_workers=workers.get("milp", 1),
+                                      plan_workers=workers.get("planner", 2), queue_size=PIPELINE_QUEUE_SIZE)
+        start = time.perf_counter()
+        for i, result, error in tqdm(runner.run(pending), total=len(pending)):
+            if error is not None:
+                logging.error(f"Trial {i} failed: {error}")
+                continue
+            log(i, result)
+        elapsed = time.perf_counter() - start
+        runner.close()
+        busy = runner.pipeline.utilization(elapsed)
+        print("Stage utilization: " + ", ".join(f"{name} {frac:.0%}" for name, frac in busy.items()))
+    else:
+        runner = TrialRunner(planning)
 
-    optimizer = MILPOptimizer()
-    pddl_gen = PDDLGenerator()
-    planner = FastDownwardClient()
-    domain_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'domain.pddl')
+        # Profiles land next to this run's CSV: results/profiles/<run_name>_<timestamp>/
+        profiler = RunProfiler(profile, profile_dir(RESULTS_DIR, run_name), tracer, mem_trials=mem_trials).start() if profile else None
 
-    for i in tqdm(range(trials)):
-        # Inject initial state context if available
-        prompt = instruction
-        if initial_state_data:
-            prompt = f"Environment State: {json.dumps(initial_state_data)}\n\nTask: {instruction}"
+        run_trial = runner.run_trial_speculative if speculative else runner.run_trial
+        ttp = []
+        for i in tqdm(pending):
+            result = run_trial(client, instruction, initial_state_data, testcase, quantization)
+            if speculative and result.get("planning_success"):
+                ttp.append((result["time_to_plan_s"], result["time_to_plan_nospec_s"], result["speculation"] == "confirmed"))
+            if profiler:
+                result.update(profiler.trial_done(i + 1))
+            log(i, result)
 
-        result = client.parse_instruction(prompt)
-        result["instruction_id"] = testcase
-        result["quantization"] = quantization
-        
-        if result['success']:
-            data = result['data']
-            
-            # 1. MILP Optimization
-            robots = data.get('robots', ['limo_1'])
-            tasks = data.get('tasks', [])
-            costs = {r: {t: 1.0 for t in tasks} for r in robots}
-            allocation = optimizer.allocate_tasks(robots, tasks, costs, {})
-            result["optimization_success"] = len(allocation) > 0
-            
-            # 2. PDDL Generation & Planning
-            pddl_problem = pddl_gen.generate_problem_skeleton(data)
-            
-            with open("temp_eval_problem.pddl", "w") as f:
-                f.write(pddl_problem)
-            
-            plan = planner.run_planner(domain_path, "temp_eval_problem.pddl")
-            
-            if plan:
-                result["planning_success"] = True
-                result["plan_length"] = len(plan)
-                result["executable_plan"] = json.dumps(plan)
-            else:
-                result["planning_success"] = False
-                result["plan_length"] = 0
-        
-        # Calculate logical consistency score (from LLM output alone)
-        tasks = result.get("tasks", [])
-        initial_preds = initial_state_data.get("initial_state", [])
-        logical_score = PlanValidator.calculate_logical_score(tasks, initial_preds)
-        result["logical_score"] = logical_score
-        
-        logger.log_trial(result)
+        runner.close()
+        if ttp:
+            with_spec, without_spec = (sum(t[k] for t in ttp) / len(ttp) for k in (0, 1))
+            print(f"Time to plan: {with_spec:.3f}s with speculation vs {without_spec:.3f}s without "
+                  f"({sum(t[2] for t in ttp)}/{len(ttp)} speculative plans confirmed)")
+        if profiler:
+            print(f"Profile ({profile}) written to {profiler.out_dir}: {len(profiler.stop())} files")
+    logger.close()
 
+    if trace_out:
+        print(f"Chrome trace written to {tracer.export_chrome(trace_out)} (open in ui.perfetto.dev)")
     print(f"✅ Evaluation complete. Results saved to results directory.")
 
 if __name__ == "__main__":
@@ -107,10 +117,21 @@ if __name__ == "__main__":
     parser.add_argument("--trials", type=int, default=10, help="Number of trials")
     parser.add_argument("--quantization", type=str, default="none", help="Quantization level (e.g. Q4_K_M)")
     parser.add_argument("--testcase", type=str, default="floor6", help="Name of the testcase folder")
+    parser.add_argument("--planning", type=str, default=PLANNING_MODE, choices=["joint", "decomposed"], help="Joint or per-robot decomposed planning")
+    parser.add_argument("--trace-out", type=str, default=None, help="Write a Chrome trace / Perfetto JSON of all stage spans here")
+    parser.add_argument("--profile", type=str, default=None, choices=["cpu", "mem"], help="Per-stage cProfile + sampled stacks, or tracemalloc diffs")
+    parser.add_argument("--pipeline", nargs="?", const=PIPELINE_WORKERS, default=None, metavar="STAGE=N,...",
+                        help=f"Overlap trials in a staged pipeline (default workers: {PIPELINE_WORKERS})")
+    parser.add_argument("--speculative", action="store_true", help="Stream the LLM output and start planning once the goal fields are complete")
+    parser.add_argument("--resume", action="store_true", help="Skip trials already checkpointed for this run ID")
+    parser.add_argument("--run-id", type=str, default=None, help="Override the run ID derived from the run parameters")
+    parser.add_argument("--mem-trials", type=int, nargs=2, default=[1, 0], metavar=("N", "M"), help="Trials to diff in --profile mem (M=0: last trial)")
 
     args = parser.parse_args()
     
     # Configure logging
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     
-    run_eval(args.model, args.provider, args.trials, args.quantization, args.testcase)
+    run_eval(args.model, args.provider, args.trials, args.quantization, args.testcase, args.planning, args.trace_out,
+             args.profile, (args.mem_trials[0], args.mem_trials[1] or None), args.resume, args.run_id,
+             args.pipeline, args.speculative)
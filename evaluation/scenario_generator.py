@@ -0,0 +1,145 @@
+import argparse
+import os
+import sys
+import json
+import math
+import random
+from typing import List, Dict, Any, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TESTCASES_DIR
+
+# Robot kinds that can carry objects (limo_scout only senses); names resolve to config/robot_profiles.json
+ROBOT_KINDS = ["limo_standard", "limo_heavy"]
+ROOM_SPACING_M = 4.0
+DOCK = "charging_dock"
+
+
+def _room_graph(rng: random.Random, rooms: int, extra_edges: float) -> Tuple[Dict[str, Dict[str, float]], List[List[str]]]:
+    """
+    Rooms on a jittered square grid, joined by a random spanning tree (each room links to a
+    nearby earlier one) plus extra corridors between grid neighbours with probability `extra_edges`.
+    The dock is room 0's neighbour, so the graph is always connected.
+    """
+    side = max(1, math.ceil(math.sqrt(rooms)))
+    names = [DOCK] + [f"room_{i}" for i in range(rooms)]
+    cells = [(-1, 0)] + [(i % side, i // side) for i in range(rooms)]
+    locations = {
+        name: {"x": round(gx * ROOM_SPACING_M + rng.uniform(-0.5, 0.5), 3), "z": round(gz * ROOM_SPACING_M + rng.uniform(-0.5, 0.5), 3)}
+        for name, (gx, gz) in zip(names, cells)
+    }
+
+    edges = []
+    for k in range(1, len(names)):
+        gx, gz = cells[k]
+        # Grid neighbours already placed (left, below); the first room hangs off the dock
+        earlier = [j for j in range(k) if abs(cells[j][0] - gx) + abs(cells[j][1] - gz) == 1]
+        edges.append([names[rng.choice(earlier) if earlier else 0], names[k]])
+    linked = {tuple(sorted(e)) for e in edges}
+    for a in range(1, len(names)):
+        for b in range(a + 1, len(names)):
+            adjacent = abs(cells[a][0] - cells[b][0]) + abs(cells[a][1] - cells[b][1]) == 1
+            if adjacent and (names[a], names[b]) not in linked and rng.random() < extra_edges:
+                edges.append([names[a], names[b]])
+    return locations, edges
+
+
+def generate_scenario(robots: int = 4, objects: int = 8, rooms: int = 9, goals: int = 4, seed: int = 0,
+                      extra_edges: float = 0.3) -> Dict[str, Any]:
+    """
+    Seeded pick-and-place scenario: `goals` of the `objects` must be moved to another room.
+    :return: Dict with 'instruction', 'initial_state' (testcase file), 'expected_output'
+             (the ideal LLM parse) and 'reference_plan' (a valid Fast Downward-format plan).
+    """
+    if goals > objects:
+        raise ValueError(f"goals ({goals}) cannot exceed objects ({objects})")
+    if rooms < 2:
+        raise ValueError("need at least two rooms")
+    rng = random.Random(seed)
+    scene = f"generated_r{robots}_o{objects}_m{rooms}_g{goals}_s{seed}"
+    locations, edges = _room_graph(rng, rooms, extra_edges)
+    room_names = [name for name in locations if name != DOCK]
+
+    robot_names = [f"{ROBOT_KINDS[i % len(ROBOT_KINDS)]}_{i}" for i in range(robots)]
+    object_names = [f"box_{i}" for i in range(objects)]
+    robot_at = {r: DOCK if i % 2 == 0 else rng.choice(room_names) for i, r in enumerate(robot_names)}
+    object_at = {o: rng.choice(room_names) for o in object_names}
+
+    targets = {}
+    for o in rng.sample(object_names, goals):
+        targets[o] = rng.choice([room for room in room_names if room != object_at[o]])
+
+    initial_state = [f"at({r}, {loc})" for r, loc in robot_at.items()] + [f"at({o}, {loc})" for o, loc in object_at.items()]
+    goal_predicates = [f"at({o}, {room})" for o, room in targets.items()]
+    tasks = []
+    for o, room in targets.items():
+        tasks += [f"pick_up({o})", f"move_to({room})", f"place({o}, {room})"]
+
+    # Round-robin the deliveries over the robots; each robot works its list in order
+    reference_plan = []
+    robot_pos = dict(robot_at)
+    for k, (o, room) in enumerate(targets.items()):
+        r = robot_names[k % robots]
+        src = object_at[o]
+        if robot_pos[r] != src:
+            reference_plan.append(f"move_to {r} {robot_pos[r]} {src}")
+        reference_plan += [f"pick_up {r} {o} {src}", f"move_to {r} {src} {room}", f"place {r} {o} {room}"]
+        robot_pos[r] = room
+
+    lines = [f"The fleet ({', '.join(robot_names)}) is spread over {rooms} rooms connected by corridors."]
+    lines += [f"Move {o} from {object_at[o]} to {room}." for o, room in targets.items()]
+    lines.append("Split the deliveries across the robots to keep travel short.")
+
+    return {
+        "name": scene,
+        "instruction": " ".join(lines),
+        "initial_state": {
+            "robots": robot_names,
+            "objects": object_names,
+            "locations": dict(robot_at, **object_at),
+            "initial_state": initial_state,
+            "scene": scene,
+            "room_graph": {"rooms": locations, "edges": edges},
+        },
+        "expected_output": {
+            "tasks": tasks,
+            "objects": object_names + room_names + [DOCK],
+            "initial_state": initial_state,
+            "constraints": [],
+            "robots": robot_names,
+            "goal_predicates": goal_predicates,
+        },
+        "reference_plan": reference_plan,
+    }
+
+
+def write_testcase(scenario: Dict[str, Any], out_dir: str) -> str:
+    """
+    Writes a scenario as a testcase folder (instruction.txt, initial_state.json,
+    expected_output.json, reference_plan.json) that run_eval.py can load.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "instruction.txt"), 'w') as f:
+        f.write(scenario["instruction"] + "\n")
+    for name in ("initial_state", "expected_output", "reference_plan"):
+        with open(os.path.join(out_dir, f"{name}.json"), 'w') as f:
+            json.dump(scenario[name], f, indent=2)
+    return out_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seeded synthetic testcase generator")
+    parser.add_argument("--robots", type=int, default=4)
+    parser.add_argument("--objects", type=int, default=8)
+    parser.add_argument("--rooms", type=int, default=9)
+    parser.add_argument("--goals", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--extra-edges", type=float, default=0.3, help="Probability of each extra corridor between neighbouring rooms")
+    parser.add_argument("--out", type=str, default=None, help="Testcase folder (default: testcases/<generated name>)")
+
+    args = parser.parse_args()
+    scenario = generate_scenario(args.robots, args.objects, args.rooms, args.goals, args.seed, args.extra_edges)
+    out_dir = write_testcase(scenario, args.out or os.path.join(TESTCASES_DIR, scenario["name"]))
+    print(f"Wrote testcase {scenario['name']} to {out_dir} ({len(scenario['reference_plan'])}-step reference plan)")
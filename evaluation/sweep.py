@@ -0,0 +1,275 @@
+import argparse
+import os
+import sys
+import json
+import time
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from tqdm import tqdm
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm_client import LLMClient
+from core.logger import BenchmarkingLogger
+from core import tracing, parse_corpus
+from core.checkpoint import Checkpoint, run_id, cell_key
+from evaluation.trials import TrialRunner, load_testcase
+from config import RESULTS_DIR, PLANNING_MODE, SWEEP_PROVIDER_LIMITS, SWEEP_WORKERS, PARSE_CORPUS
+
+# Concurrency for providers missing from the limits
+DEFAULT_PROVIDER_LIMIT = 1
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """
+    'ollama=1,openai=4' -> {'ollama': 1, 'openai': 4}
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        provider, _, value = item.partition("=")
+        limits[provider.strip().lower()] = max(int(value), 1)
+    return limits
+
+
+def expand_matrix(models: List[Dict[str, str]], testcases: List[str], trials: int) -> List[Dict[str, Any]]:
+    """
+    One cell per (model entry, testcase, trial index).
+    :param models: [{'name', 'provider', 'quantization'}], as in scripts/run_comparisons.py
+    """
+    return [
+        {"model": m["name"], "provider": m.get("provider", "ollama").lower(), "quantization": m.get("quantization", "none"),
+         "testcase": testcase, "trial": trial}
+        for m in models for testcase in testcases for trial in range(trials)
+    ]
+
+
+def cross_matrix(model_names: List[str], providers: List[str], quantizations: List[str], testcases: List[str],
+                 trials: int) -> List[Dict[str, Any]]:
+    """
+    Full models x providers x quantizations x testcases x trials product.
+    """
+    models = [{"name": m, "provider": p, "quantization": q}
+              for m, p, q in itertools.product(model_names, providers, quantizations)]
+    return expand_matrix(models, testcases, trials)
+
+
+def load_matrix(path: str) -> List[Dict[str, Any]]:
+    """
+    Reads a sweep matrix file: {"models": [{"name", "provider", "quantization"}], "testcases": [...], "trials": N}
+    """
+    with open(path, 'r') as f:
+        spec = json.load(f)
+    return expand_matrix(spec["models"], spec["testcases"], spec.get("trials", 1))
+
+
+class SweepRunner:
+    """
+    Runs an evaluation matrix in one process. Cells are split into one lane per provider;
+    a lane works through its models one at a time (so a local server keeps a single model
+    loaded) with up to `limits[provider]` trials in flight, and all lanes run concurrently.
+    Each worker thread has its own TrialRunner; rows go to the same per-(model, quantization)
+    CSV/store as run_eval.py. With a Checkpoint, completed cells are skipped and each new
+    cell is marked once its row is written.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, workers: Optional[int] = SWEEP_WORKERS,
+                 planning: str = PLANNING_MODE, results_dir: Optional[str] = None, progress: bool = True,
+                 checkpoint: Optional[Checkpoint] = None):
+        self.limits = parse_limits(SWEEP_PROVIDER_LIMITS) if limits is None else limits
+        self.workers = workers
+        self.planning = planning
+        self.results_dir = results_dir or RESULTS_DIR
+        self.progress = progress
+        self.checkpoint = checkpoint
+
+        self._local = threading.local()
+        self._runners: List[TrialRunner] = []
+        self._loggers: Dict[str, BenchmarkingLogger] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers) if workers else None
+        self._active: Dict[str, str] = {}  # provider -> model being evaluated
+        self._bar = None
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def limit(self, provider: str) -> int:
+        return self.limits.get(provider, DEFAULT_PROVIDER_LIMIT)
+
+    def _runner(self) -> TrialRunner:
+        runner = getattr(self._local, "runner", None)
+        if runner is None:
+            runner = self._local.runner = TrialRunner(self.planning)
+            with self._lock:
+                self._runners.append(runner)
+        return runner
+
+    def _logger(self, model: str, quantization: str) -> BenchmarkingLogger:
+        run_name = f"results_{model.replace(':', '_')}_{quantization}"
+        with self._lock:
+            logger = self._loggers.get(run_name)
+            if logger is None:
+                logger = self._loggers[run_name] = BenchmarkingLogger(filename=f"{run_name}.csv", results_dir=self.results_dir)
+        return logger
+
+    def _run_cell(self, cell: Dict[str, Any], client: LLMClient, testcases: Dict[str, Any]):
+        ok = False
+        if self._slots:
+            self._slots.acquire()
+        try:
+            instruction, initial_state_data = testcases[cell["testcase"]]
+            result = self._runner().run_trial(client, instruction, initial_state_data, cell["testcase"],
+                                              cell["quantization"])
+            on_written = None
+            if self.checkpoint:
+                result["run_id"] = self.checkpoint.run_id
+                key = cell_key(cell["model"], cell["provider"], cell["quantization"], cell["testcase"], cell["trial"])
+                on_written = lambda: self.checkpoint.mark(key)
+            result["trial_index"] = cell["trial"]
+            self._logger(cell["model"], cell["quantization"]).log_trial(result, on_written=on_written)
+            ok = True
+        except Exception as e:
+            logging.error(f"Trial {cell['model']}/{cell['testcase']}#{cell['trial']} failed: {e}")
+        finally:
+            if self._slots:
+                self._slots.release()
+        self._done(ok)
+
+    def _done(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            if self._bar is not None:
+                self._bar.set_postfix_str(" | ".join(f"{p}: {m}" for p, m in sorted(self._active.items())), refresh=False)
+                self._bar.update(1)
+
+    def _run_lane(self, provider: str, cells: List[Dict[str, Any]], testcases: Dict[str, Any]):
+        by_model: Dict[str, List[Dict[str, Any]]] = {}
+        for cell in cells:
+            by_model.setdefault(cell["model"], []).append(cell)
+
+        with ThreadPoolExecutor(max_workers=self.limit(provider), thread_name_prefix=f"sweep-{provider}") as pool:
+            for model, group in by_model.items():
+                with self._lock:
+                    self._active[provider] = model
+                try:
+                    client = LLMClient(provider=provider, model=model)
+                except Exception as e:
+                    logging.error(f"Cannot create {provider} client for {model}: {e}")
+                    for _ in group:
+                        self._done(False)
+                    continue
+                # Finish this model before the next one is requested
+                list(pool.map(lambda cell: self._run_cell(cell, client, testcases), group))
+        with self._lock:
+            self._active.pop(provider, None)
+
+    def run(self, cells: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Runs every cell; failures are logged and counted, not raised.
+        :return: {'cells', 'completed', 'failed', 'skipped', 'elapsed'}
+        """
+        # Stage timings go into every row, as in run_eval.py
+        tracing.get_tracer().enabled = True
+        start = time.perf_counter()
+
+        testcases = {}
+        runnable = []
+        for cell in cells:
+            if self.checkpoint and self.checkpoint.is_done(
+                    cell_key(cell["model"], cell["provider"], cell["quantization"], cell["testcase"], cell["trial"])):
+                self.skipped += 1
+                continue
+            name = cell["testcase"]
+            if name not in testcases:
+                testcases[name] = load_testcase(name)
+            if testcases[name] is None:
+                self.failed += 1
+            else:
+                runnable.append(cell)
+
+        lanes: Dict[str, List[Dict[str, Any]]] = {}
+        for cell in runnable:
+            lanes.setdefault(cell["provider"], []).append(cell)
+
+        self._bar = tqdm(total=len(runnable), unit="trial", disable=not self.progress)
+        try:
+            threads = [threading.Thread(target=self._run_lane, args=(provider, lane, testcases), name=f"lane-{provider}")
+                       for provider, lane in lanes.items()]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._bar.close()
+            self._bar = None
+            for logger in self._loggers.values():
+                logger.close()
+            for runner in self._runners:
+                runner.close()
+
+        return {"cells": len(cells), "completed": self.completed, "failed": self.failed, "skipped": self.skipped,
+                "elapsed": time.perf_counter() - start}
+
+
+def sweep_run_id(cells: List[Dict[str, Any]], planning: str) -> str:
+    """
+    Run ID of a matrix: its model configurations, testcases and planning mode (not the
+    trial count, so a resumed sweep can add trials).
+    """
+    models = sorted({(c["provider"], c["model"], c["quantization"]) for c in cells})
+    return run_id(kind="sweep", models=models, testcases=sorted({c["testcase"] for c in cells}), planning=planning)
+
+
+def run_sweep(cells: List[Dict[str, Any]], limits: Optional[Dict[str, int]] = None, workers: Optional[int] = SWEEP_WORKERS,
+              planning: str = PLANNING_MODE, trace_out: Optional[str] = None, resume: bool = False,
+              run: Optional[str] = None) -> Dict[str, Any]:
+    tracer = tracing.configure(enabled=True, keep_events=bool(trace_out))
+    parse_corpus.configure(PARSE_CORPUS)
+    models = sorted({(c["provider"], c["model"], c["quantization"]) for c in cells})
+    run = run or sweep_run_id(cells, planning)
+    checkpoint = Checkpoint(run, params={"models": models, "planning": planning}, resume=resume)
+    print(f"🚀 Sweep {run}: {len(cells)} trials over {len(models)} model configurations, "
+          f"{len({c['testcase'] for c in cells})} testcases")
+
+    summary = SweepRunner(limits, workers, planning, checkpoint=checkpoint).run(cells)
+
+    if trace_out:
+        print(f"Chrome trace written to {tracer.export_chrome(trace_out)} (open in ui.perfetto.dev)")
+    print(f"✅ Sweep complete: {summary['completed']}/{summary['cells']} trials in {summary['elapsed']:.1f}s "
+          f"({summary['failed']} failed, {summary['skipped']} already done). Results saved to results directory.")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LaMMA-P parallel evaluation sweep")
+    parser.add_argument("--matrix", type=str, default=None, help="JSON matrix file (models with provider/quantization, testcases, trials)")
+    parser.add_argument("--models", type=str, nargs="+", default=[], help="Model names (crossed with --providers/--quantizations)")
+    parser.add_argument("--providers", type=str, nargs="+", default=["ollama"], choices=["openai", "ollama", "openwebui"])
+    parser.add_argument("--quantizations", type=str, nargs="+", default=["none"])
+    parser.add_argument("--testcases", type=str, nargs="+", default=["floor6"])
+    parser.add_argument("--trials", type=int, default=10, help="Trials per model/testcase")
+    parser.add_argument("--limits", type=str, default=SWEEP_PROVIDER_LIMITS, help="Concurrent trials per provider, e.g. ollama=1,openai=4")
+    parser.add_argument("--workers", type=int, default=SWEEP_WORKERS, help="Global cap on in-flight trials")
+    parser.add_argument("--planning", type=str, default=PLANNING_MODE, choices=["joint", "decomposed"])
+    parser.add_argument("--trace-out", type=str, default=None, help="Write a Chrome trace / Perfetto JSON of all stage spans here")
+    parser.add_argument("--resume", action="store_true", help="Skip cells already checkpointed for this run ID")
+    parser.add_argument("--run-id", type=str, default=None, help="Override the run ID derived from the matrix")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.matrix:
+        cells = load_matrix(args.matrix)
+    elif args.models:
+        cells = cross_matrix(args.models, args.providers, args.quantizations, args.testcases, args.trials)
+    else:
+        parser.error("give --matrix or --models")
+    run_sweep(cells, parse_limits(args.limits), args.workers, args.planning, args.trace_out, args.resume, args.run_id)
@@ -0,0 +1,318 @@
+import os
+import json
+import time
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from core.llm_client import LLMClient
+from core.validator import PlanValidator
+from core.optimizer import MILPOptimizer
+from core.cost_model import CostModel
+from core.pddl_generator import PDDLGenerator
+from core.planner_client import FastDownwardClient
+from core.decomposition import DecomposedPlanner
+from core.plan_checker import PlanChecker
+from core.pipeline import Stage, StagedPipeline
+from core.speculation import SpeculativePlan, speculative_timings
+from core import tracing, parse_corpus
+from config import TESTCASES_DIR, PLANNING_MODE, PLANNER_WORKERS
+
+DOMAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'domain.pddl')
+
+
+def load_testcase(testcase: str):
+    """
+    Reads a testcase folder.
+    :return: (instruction, initial state dict), or None if it has no instruction.
+    """
+    testcase_dir = os.path.join(TESTCASES_DIR, testcase)
+
+    # Try multiple naming conventions for instruction
+    instruction_variants = [f"{testcase}_instruction.txt", "instruction.txt"]
+    instruction = ""
+    for v in instruction_variants:
+        p = os.path.join(testcase_dir, v)
+        if os.path.exists(p):
+            with open(p, 'r') as f:
+                instruction = f.read().strip()
+            break
+
+    if not instruction:
+        logging.error(f"Could not find instruction for testcase {testcase}")
+        return None
+
+    # Load initial state if exists
+    initial_state_path = os.path.join(testcase_dir, "initial_state.json")
+    if not os.path.exists(initial_state_path):
+        initial_state_path = os.path.join(testcase_dir, f"{testcase}_initial_state.json")
+
+    initial_state_data = {}
+    if os.path.exists(initial_state_path):
+        with open(initial_state_path, 'r') as f:
+            initial_state_data = json.load(f)
+    return instruction, initial_state_data
+
+
+def build_prompt(instruction: str, initial_state_data: dict) -> str:
+    # Inject initial state context if available
+    if initial_state_data:
+        return f"Environment State: {json.dumps(initial_state_data)}\n\nTask: {instruction}"
+    return instruction
+
+
+class TrialRunner:
+    """
+    Runs one evaluation trial end to end: LLM parse, cost model + MILP allocation,
+    PDDL generation, planning, plan check and logical score.
+    The stages are also callable one by one (parse / allocate / plan) for the pipelined executor.
+    Holds planner/optimizer state, so each worker thread or process uses its own runner.
+    """
+
+    def __init__(self, planning: str = PLANNING_MODE, planner_workers: int = PLANNER_WORKERS,
+                 planner_path: Optional[str] = None):
+        self.optimizer = MILPOptimizer()
+        self.pddl_gen = PDDLGenerator()
+        self.planner = FastDownwardClient(planner_path) if planner_path else FastDownwardClient()
+        self.decomposed = DecomposedPlanner(self.planner, self.pddl_gen, max_workers=planner_workers) if planning == "decomposed" else None
+        self.plan_checker = PlanChecker(DOMAIN_PATH)
+        self._cost_models = {}
+
+    def cost_model(self, scene: str, room_graph: Optional[dict] = None) -> CostModel:
+        """
+        :param room_graph: {'rooms': {name: {x, z}}, 'edges': [[a, b]]} for generated scenes
+        """
+        model = self._cost_models.get(scene)
+        if model is None:
+            model = self._cost_models[scene] = CostModel(scene=scene)
+            if room_graph:
+                model.register_scene(scene, room_graph["rooms"], room_graph.get("edges"))
+        return model
+
+    @staticmethod
+    def parse(client: LLMClient, prompt: str, testcase: str, quantization: str) -> dict:
+        return TrialRunner._label(client.parse_instruction(prompt), testcase, quantization)
+
+    @staticmethod
+    def _label(result: dict, testcase: str, quantization: str) -> dict:
+        result["instruction_id"] = testcase
+        result["quantization"] = quantization
+        parse_corpus.record(result, testcase)
+        return result
+
+    def allocate(self, result: dict, initial_state_data: dict) -> Optional[Tuple[dict, str]]:
+        """
+        MILP allocation and PDDL generation for a successful parse.
+        :return: (allocation, PDDL problem) for plan(), or None if there is nothing to plan.
+        """
+        if not result['success']:
+            return None
+        data = result['data']
+
+        # 1. MILP Optimization
+        robots = data.get('robots', ['limo_1'])
+        tasks = data.get('tasks', [])
+        cost_model = self.cost_model(initial_state_data.get("scene", "FloorPlan1"), initial_state_data.get("room_graph"))
+        costs = cost_model.build(robots, tasks, data.get('initial_state', [])).allocation_costs
+        allocation = self.optimizer.allocate_tasks(robots, tasks, costs, {})
+        result["optimization_success"] = len(allocation) > 0
+
+        # 2. PDDL Generation
+        return allocation, self.pddl_gen.generate_problem_skeleton(data)
+
+    def plan(self, result: dict, allocation: dict, pddl_problem: str):
+        """
+        Plans the problem from allocate() and checks the plan; fills in the planning fields.
+        """
+        if self.decomposed:
+            planned = self.decomposed.plan(DOMAIN_PATH, result['data'], allocation)
+            plan = planned["plan"]
+            result["planning_mode"] = planned["mode"]
+        else:
+            # Private problem file, so concurrent trials never overwrite each other's
+            with tempfile.TemporaryDirectory() as tmpdir:
+                problem_path = os.path.join(tmpdir, "problem.pddl")
+                with tracing.span("io"), open(problem_path, "w") as f:
+                    f.write(pddl_problem)
+                plan = self.planner.run_planner(DOMAIN_PATH, problem_path)
+            result["planning_mode"] = "joint"
+        self._record_plan(result, plan, pddl_problem)
+
+    def _record_plan(self, result: dict, plan, pddl_problem: str, check: Optional[dict] = None):
+        if plan:
+            result["planning_success"] = True
+            result["plan_length"] = len(plan)
+            result["executable_plan"] = json.dumps(plan)
+
+            # 3. Simulate the plan against the joint problem's :init/:goal
+            check = check or self.plan_checker.check(pddl_problem, plan)
+            result["plan_valid"] = check["valid"] and check["goal_reached"]
+            result["plan_failed_step"] = check["failed_step"]
+            if not result["plan_valid"]:
+                logging.warning(f"Plan check failed: {check['reason']}")
+        else:
+            result["planning_success"] = False
+            result["plan_length"] = 0
+
+    def _plan_problem(self, data: dict):
+        """
+        PDDL generation + joint planning for a (possibly partial) parse.
+        """
+        pddl_problem = self.pddl_gen.generate_problem_skeleton(data)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            problem_path = os.path.join(tmpdir, "problem.pddl")
+            with open(problem_path, "w") as f:
+                f.write(pddl_problem)
+            return self.planner.run_planner(DOMAIN_PATH, problem_path)
+
+    @staticmethod
+    def score(result: dict, initial_state_data: dict):
+        # Calculate logical consistency score (from LLM output alone)
+        tasks = result.get("tasks", [])
+        initial_preds = initial_state_data.get("initial_state", [])
+        result["logical_score"] = PlanValidator.calculate_logical_score(tasks, initial_preds)
+
+    def run_trial(self, client: LLMClient, instruction: str, initial_state_data: dict, testcase: str,
+                  quantization: str) -> dict:
+        """
+        :return: The trial's results row, including its stage_<name> timings.
+        """
+        tracer = tracing.get_tracer()
+        tracer.start_trial()
+        result = self.parse(client, build_prompt(instruction, initial_state_data), testcase, quantization)
+        planning_input = self.allocate(result, initial_state_data)
+        if planning_input:
+            self.plan(result, *planning_input)
+        self.score(result, initial_state_data)
+        result.update(tracer.trial_stages())
+        return result
+
+    def run_trial_speculative(self, client: LLMClient, instruction: str, initial_state_data: dict, testcase: str,
+                              quantization: str) -> dict:
+        """
+        run_trial with a streamed parse: joint planning starts on the partial parse once its
+        goal fields close and is confirmed against the full parse (core.speculation).
+        Adds 'speculation' (confirmed / discarded / not_started), 'time_to_plan_s' and the
+        counterfactual 'time_to_plan_nospec_s'. Joint planning only: decomposed planning
+        needs the allocation, which needs the tasks.
+        """
+        if self.decomposed:
+            raise ValueError("Speculative planning needs joint planning (the allocation depends on the tasks)")
+        tracer = tracing.get_tracer()
+        tracer.start_trial()
+        spec = SpeculativePlan(self._plan_problem)
+        start = time.perf_counter()
+        result = client.parse_instruction_stream(build_prompt(instruction, initial_state_data), on_fields=spec.on_fields)
+        t_parse = time.perf_counter() - start
+        self._label(result, testcase, quantization)
+
+        planning_input = self.allocate(result, initial_state_data)
+        after_parse = time.perf_counter() - start - t_parse
+        outcome = spec.resolve(result["data"] if planning_input else None, planning_input[1] if planning_input else None,
+                               self.plan_checker)
+        if outcome["status"] == "confirmed":
+            result["planning_mode"] = "joint"
+            self._record_plan(result, outcome["plan"], planning_input[1],
+                              check={"valid": True, "goal_reached": True, "failed_step": None})
+        elif planning_input:
+            if outcome["reason"]:
+                logging.info(f"Speculative plan discarded: {outcome['reason']}")
+            self.plan(result, *planning_input)
+        t_plan = time.perf_counter() - start
+
+        with_spec, without_spec = speculative_timings(t_parse, t_plan, outcome["plan_s"], after_parse, outcome["status"])
+        result["speculation"] = outcome["status"]
+        result["time_to_plan_s"] = round(with_spec, 6)
+        result["time_to_plan_nospec_s"] = round(without_spec, 6)
+        self.score(result, initial_state_data)
+        result.update(tracer.trial_stages())
+        return result
+
+    def close(self):
+        if self.decomposed:
+            self.decomposed.close()
+
+
+# --- pipelined execution ---
+
+_worker_runner: Optional[TrialRunner] = None
+
+
+def _init_worker(planning: str, planner_workers: Optional[int]):
+    global _worker_runner
+    tracing.configure(enabled=True)
+    _worker_runner = TrialRunner(planning, planner_workers)
+
+
+def _add_stages(job: Dict[str, Any], stages: Dict[str, float]):
+    totals = job.setdefault("stages", {})
+    for name, secs in stages.items():
+        totals[name] = totals.get(name, 0.0) + secs
+
+
+def _allocate_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    totals = tracing.get_tracer().start_trial()
+    job["planning_input"] = _worker_runner.allocate(job["result"], job["initial_state"])
+    _add_stages(job, tracing.get_tracer().trial_stages(totals))
+    return job
+
+
+def _plan_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    totals = tracing.get_tracer().start_trial()
+    if job.get("planning_input"):
+        _worker_runner.plan(job["result"], *job.pop("planning_input"))
+    TrialRunner.score(job["result"], job["initial_state"])
+    _add_stages(job, tracing.get_tracer().trial_stages(totals))
+    return job
+
+
+class PipelinedTrialRunner:
+    """
+    Runs many trials of one testcase as a three-stage pipeline (core.pipeline.StagedPipeline):
+    LLM parse in a thread pool (network-bound), MILP + PDDL generation in one process pool and
+    planning + plan check in another, each with its own worker count and bounded queues in
+    between. Trial i+1's LLM call overlaps trial i's planning; rows come out in trial order
+    with the same fields and stage timings as TrialRunner.run_trial.
+    Spans recorded in the worker processes are summed into the rows but are not kept for
+    Chrome trace export.
+    """
+
+    def __init__(self, client: LLMClient, instruction: str, initial_state_data: dict, testcase: str, quantization: str,
+                 planning: str = PLANNING_MODE, llm_workers: int = 2, milp_workers: int = 1, plan_workers: int = 2,
+                 queue_size: int = 2, planner_workers: Optional[int] = PLANNER_WORKERS):
+        self.client = client
+        self.prompt = build_prompt(instruction, initial_state_data)
+        self.initial_state_data = initial_state_data
+        self.testcase = testcase
+        self.quantization = quantization
+        init = (_init_worker, (planning, planner_workers))
+        self._milp_pool = ProcessPoolExecutor(max_workers=milp_workers, initializer=init[0], initargs=init[1])
+        self._plan_pool = ProcessPoolExecutor(max_workers=plan_workers, initializer=init[0], initargs=init[1])
+        self.pipeline = StagedPipeline([
+            Stage("llm", self._llm_job, llm_workers),
+            Stage("milp", _allocate_job, milp_workers, self._milp_pool),
+            Stage("planner", _plan_job, plan_workers, self._plan_pool),
+        ], queue_size=queue_size)
+
+    def _llm_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        tracer = tracing.get_tracer()
+        totals = tracer.start_trial()
+        job["result"] = TrialRunner.parse(self.client, self.prompt, self.testcase, self.quantization)
+        _add_stages(job, tracer.trial_stages(totals))
+        return job
+
+    def run(self, trials: Iterable[int]) -> Iterator[Tuple[int, Optional[dict], Optional[BaseException]]]:
+        """
+        :return: (trial index, results row or None, error or None) in trial order.
+        """
+        jobs = ({"trial": i, "initial_state": self.initial_state_data} for i in trials)
+        for job, error in self.pipeline.run(jobs):
+            result = job.get("result")
+            if result is not None:
+                result.update({k: round(v, 6) for k, v in job.get("stages", {}).items()})
+            yield job["trial"], result, error
+
+    def close(self):
+        self._milp_pool.shutdown()
+        self._plan_pool.shutdown()
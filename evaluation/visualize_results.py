@@ -1,5 +1,4 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import argparse
 import os
 import glob
 import sys
@@ -7,31 +6,94 @@ import sys
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import RESULTS_DIR
+from core import results_store
+from core.aggregator import StreamingAggregator, SummaryFile, GROUP_KEYS
+from core.tracing import PIPELINE_STAGES
 
-def generate_comparison_charts():
-    # Load all CSV results
-    all_files = glob.glob(os.path.join(RESULTS_DIR, "*.csv"))
+CHART_COLUMNS = ['model', 'provider', 'quantization', 'success', 'logical_score', 'latency', 'retries'] + \
+    [f'stage_{stage}' for stage in PIPELINE_STAGES]
+
+
+def load_results(columns=None, filters=None, since=None, source="auto"):
+    """
+    Loads trial rows from the partitioned Parquet store when it has data, else from the CSVs.
+    :param columns: Columns to load (None = all)
+    :param filters: {column: value or list}; model/provider/quantization/testcase prune partitions
+    :param since: ISO date lower bound
+    :param source: 'auto', 'store' or 'csv'
+    """
+    if source in ("auto", "store") and results_store.available():
+        store = results_store.ResultsStore(os.path.join(RESULTS_DIR, "store"))
+        if source == "store" or store.dataset() is not None:
+            return store.read(columns=columns, filters=filters, since=since)
+        if glob.glob(os.path.join(RESULTS_DIR, "results_*.csv")):
+            print("Results store is empty; reading CSVs (run evaluation/migrate_results.py to convert them).")
+
+    return load_csv_results(columns, filters, since)
+
+
+def load_csv_results(columns=None, filters=None, since=None):
+    import pandas as pd
+
+    all_files = glob.glob(os.path.join(RESULTS_DIR, "results_*.csv"))
     if not all_files:
+        return pd.DataFrame(columns=columns or [])
+
+    wanted = set(columns or []) | set(filters or {}) | {'timestamp', 'instruction_id'}
+    usecols = (lambda c: c in wanted) if columns else None
+    df = pd.concat([pd.read_csv(f, usecols=usecols) for f in all_files], ignore_index=True)
+
+    # CSV rows name the testcase 'instruction_id'; match the store's partition column
+    if 'instruction_id' in df.columns:
+        df['testcase'] = df['instruction_id']
+    for col, value in (filters or {}).items():
+        df = df[df[col].isin(value if isinstance(value, (list, tuple, set)) else [value])]
+    if since:
+        df = df[df['timestamp'].astype(str).str[:10] >= since]
+    return df.reindex(columns=columns).reset_index(drop=True) if columns else df
+
+
+def load_summaries(filters=None, since=None, source="auto", rebuild=False):
+    """
+    Per-(model, provider, quantization, stage) summaries as a DataFrame.
+    Uses the incrementally maintained summaries.json (O(groups)) unless a testcase/date
+    filter needs the raw trials, or `rebuild` recomputes and persists it from all results.
+    """
+    import pandas as pd
+
+    summary_file = SummaryFile(os.path.join(RESULTS_DIR, "summaries.json"))
+    needs_trials = since or any(col not in GROUP_KEYS for col in (filters or {}))
+
+    if rebuild:
+        df = load_results(CHART_COLUMNS, source=source)
+        aggregator = StreamingAggregator()
+        aggregator.add_rows(df.to_dict('records'))
+        summary_file.replace(aggregator)
+        print(f"Rebuilt {summary_file.path} from {len(df)} trials")
+
+    if needs_trials or source != "auto" or not os.path.exists(summary_file.path):
+        df = load_results(CHART_COLUMNS, filters, since, source)
+        aggregator = StreamingAggregator()
+        aggregator.add_rows(df.to_dict('records'))
+    else:
+        aggregator = summary_file.load()
+
+    return pd.DataFrame(aggregator.summary(filters))
+
+
+def generate_comparison_charts(filters=None, since=None, source="auto", rebuild=False):
+    # pandas/matplotlib are imported where they are used so `--help` and imports of the
+    # loaders from other scripts start quickly
+    import matplotlib.pyplot as plt
+
+    summary = load_summaries(filters, since, source, rebuild)
+    if summary.empty:
         print("No result files found in results directory.")
         return
 
-    dfs = []
-    for f in all_files:
-        dfs.append(pd.read_csv(f))
-    
-    df = pd.concat(dfs, ignore_index=True)
-    
-    # Calculate metrics grouped by model and provider
-    metrics = df.groupby(['model', 'provider']).agg({
-        'success': 'mean',
-        'logical_score': 'mean',
-        'latency': ['mean', 'std'],
-        'retries': 'mean'
-    }).reset_index()
-
-    metrics.columns = ['model', 'provider', 'validity_rate', 'logical_rate', 'latency_mean', 'latency_std', 'avg_retries']
-    metrics['validity_rate'] *= 100
-    metrics['logical_rate'] *= 100
+    summary['label'] = [m if q == 'none' else f"{m} ({q})" for m, q in zip(summary['model'], summary['quantization'])]
+    # Rates are per group; latency stats are per stage ('parse' is the LLM call itself)
+    metrics = summary[summary['stage'] == 'parse'].reset_index(drop=True)
 
     # Professional Plotting Style
     plt.style.use('ggplot')
@@ -47,7 +109,7 @@ def generate_comparison_charts():
     
     plt.title('Execution Readiness Analysis', fontsize=14, fontweight='bold')
     plt.ylabel('Success Rate (%)', fontsize=12)
-    plt.xticks(x, metrics['model'], rotation=45)
+    plt.xticks(x, metrics['label'], rotation=45)
     plt.legend()
     plt.ylim(0, 105)
     plt.grid(axis='y', linestyle='--', alpha=0.7)
@@ -58,7 +120,7 @@ def generate_comparison_charts():
 
     # Plot Latency with Error Bars
     plt.figure(figsize=(10, 6))
-    plt.bar(metrics['model'], metrics['latency_mean'], yerr=metrics['latency_std'], 
+    plt.bar(metrics['label'], metrics['latency_mean'], yerr=metrics['latency_std'].fillna(0),
             capsize=5, color='#e67e22', alpha=0.8)
     plt.title('Parsing Latency Analysis (Mean ± Std)', fontsize=14, fontweight='bold')
     plt.ylabel('Time (seconds)', fontsize=12)
@@ -68,9 +130,45 @@ def generate_comparison_charts():
     plt.savefig(os.path.join(RESULTS_DIR, 'latency_comparison.png'), dpi=300)
     print(f"Generated latency_comparison.png")
 
+    # Plot Tail Latency: p50-p95 band with p99 marker, one series per stage
+    labels = list(dict.fromkeys(summary['label']))
+    # Top-level stages only; nested spans (e.g. milp.cbc) stay in summaries.json and the table data
+    stages = [st for st in ['parse'] + PIPELINE_STAGES if st in set(summary['stage'])]
+    band = 0.8 / len(stages)
+    plt.figure(figsize=(10, 6))
+    for k, stage in enumerate(stages):
+        rows = summary[summary['stage'] == stage]
+        xs = [labels.index(l) - 0.4 + band * (k + 0.5) for l in rows['label']]
+        color = colors[k % len(colors)]
+        plt.bar(xs, rows['p95'] - rows['p50'], band * 0.9, bottom=rows['p50'], color=color, alpha=0.35,
+                label=f'{stage} p50-p95')
+        plt.scatter(xs, rows['p50'], marker='_', s=300, color=color)
+        plt.scatter(xs, rows['p99'], marker='^', color=color, label=f'{stage} p99')
+    plt.title('Tail Latency Analysis (p50 / p95 / p99)', fontsize=14, fontweight='bold')
+    plt.ylabel('Time (seconds)', fontsize=12)
+    plt.xticks(range(len(labels)), labels, rotation=45)
+    plt.ylim(bottom=0)
+    plt.legend(fontsize=8)
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(os.path.join(RESULTS_DIR, 'latency_percentiles.png'), dpi=300)
+    print(f"Generated latency_percentiles.png")
+
     # Print Summary Table for Research Notes
     print("\n--- Research Summary Table ---")
-    print(metrics[['model', 'validity_rate', 'latency_mean', 'avg_retries']].to_markdown(index=False))
+    print(metrics[['label', 'count', 'validity_rate', 'latency_mean', 'p50', 'p95', 'p99', 'avg_retries']]
+          .rename(columns={'label': 'model'}).to_markdown(index=False))
 
 if __name__ == "__main__":
-    generate_comparison_charts()
+    parser = argparse.ArgumentParser(description="LaMMA-P result charts")
+    parser.add_argument("--model", type=str, nargs="*", help="Only these models")
+    parser.add_argument("--provider", type=str, nargs="*", help="Only these providers")
+    parser.add_argument("--quantization", type=str, nargs="*", help="Only these quantization levels")
+    parser.add_argument("--testcase", type=str, nargs="*", help="Only these testcases")
+    parser.add_argument("--since", type=str, help="Only trials on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--source", type=str, default="auto", choices=["auto", "store", "csv"], help="Results backend")
+    parser.add_argument("--rebuild-summaries", action="store_true", help="Recompute summaries.json from all results first")
+
+    args = parser.parse_args()
+    filters = {col: getattr(args, col) for col in results_store.PARTITION_COLS if getattr(args, col)}
+    generate_comparison_charts(filters, args.since, args.source, args.rebuild_summaries)
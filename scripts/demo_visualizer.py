@@ -12,12 +12,18 @@ from core.pddl_generator import PDDLGenerator
 from core.optimizer import MILPOptimizer
 from core.planner_client import FastDownwardClient
 from core.thor_controller import ThorController
+from core.cost_model import CostModel
+from core.plan_checker import PlanChecker
+from core import tracing
+from config import TRACING, TRACE_EXPORT, THOR_FAST, THOR_CAPTURE_FRAMES, THOR_HEADLESS
 
 def main():
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     
     instruction = "Pick up the red block from Floor 6 hallway, move it to the lab on Floor 2, and place it on the workbench."
     print(f"🌟 Starting Visual Demonstration: {instruction}")
+    tracer = tracing.configure(enabled=TRACING, keep_events=bool(TRACE_EXPORT))
+    tracer.start_trial()
     
     # 1. LLM Parsing
     print("\n--- [Step 1: LLM Semantic Reasoning] ---")
@@ -34,7 +40,7 @@ def main():
     optimizer = MILPOptimizer()
     robots = data.get('robots', ['turtlebot3_1'])
     tasks = data.get('tasks', [])
-    costs = {r: {t: 1.0 for t in tasks} for r in robots}
+    costs = CostModel(scene="FloorPlan1").build(robots, tasks, data.get('initial_state', [])).allocation_costs
     allocation = optimizer.allocate_tasks(robots, tasks, costs, {})
     print(f"Allocations: {allocation}")
 
@@ -45,7 +51,7 @@ def main():
     domain_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core', 'domain.pddl')
     
     pddl_problem = pddl_gen.generate_problem_skeleton(data)
-    with open("demo_problem.pddl", "w") as f:
+    with tracing.span("io"), open("demo_problem.pddl", "w") as f:
         f.write(pddl_problem)
     
     plan = planner.run_planner(domain_path, "demo_problem.pddl")
@@ -53,6 +59,10 @@ def main():
         print("❌ Planning failed.")
         return
     print(f"Sequential Plan: {plan}")
+    check = PlanChecker(domain_path).check(pddl_problem, plan)
+    if not (check["valid"] and check["goal_reached"]):
+        print(f"❌ Plan check failed: {check['reason']}")
+        return
 
     # 4. AI2-THOR Execution
     print("\n--- [Step 4: AI2-THOR Visual Execution] ---")
@@ -60,13 +70,21 @@ def main():
     # since FloorPlan6 might not literally be "Floor 6" in the way requested.
     # We will try FloorPlan1 (Kitchen) as a default if FloorPlan6 isn't found.
     try:
-        thor = ThorController(scene="FloorPlan1", num_agents=1) # Common reliable scene
+        thor = ThorController(scene="FloorPlan1", num_agents=1, fast=THOR_FAST, # Common reliable scene
+                              capture_frames=THOR_CAPTURE_FRAMES, headless=THOR_HEADLESS)
         print("Simulator started. Running actions...")
-        thor.execute_plan(plan)
+        stats = thor.execute_plan(plan)
+        print(f"Executed {stats['actions']} actions in {stats['sim_steps']} simulator steps "
+              f"({stats['sim_s']:.2f}s simulating, {stats['wall_s']:.2f}s wall)")
         print("🏁 Visual Demonstration Complete!")
     except Exception as e:
         print(f"❌ Simulator error: {e}")
         print("Note: AI2-THOR usually requires an X display (Xvfb) on headless servers.")
 
+    if tracer.enabled:
+        print(f"Stage timings: {tracing.format_stages(tracer.trial_stages())}")
+    if TRACE_EXPORT:
+        print(f"Chrome trace written to {tracer.export_chrome(TRACE_EXPORT)}")
+
 if __name__ == "__main__":
     main()
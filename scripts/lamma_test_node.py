@@ -2,6 +2,10 @@
 import sys
 import os
 import json
+import argparse
+import time
+import tempfile
+import threading
 
 # Mock ROS2 rclpy if not installed
 try:
@@ -20,6 +24,7 @@ except ImportError:
         def get_logger(self):
             class Logger:
                 def info(self, msg): print(f"[INFO] {msg}")
+                def warning(self, msg): print(f"[WARN] {msg}")
             return Logger()
     class String:
         def __init__(self): self.data = ""
@@ -29,22 +34,72 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.llm_client import LLMClient
 from core.pddl_generator import PDDLGenerator
-from core.optimizer import MILPOptimizer
+from core.optimizer import MILPOptimizer, IncrementalAllocator
 from core.planner_client import FastDownwardClient
+from core.cost_model import CostModel
+from core.decomposition import DecomposedPlanner
+from core.plan_checker import PlanChecker
+from core.step_scheduler import schedule_plan
+from core import tracing
+from core.profiling import RunProfiler, profile_dir
+from core.dispatcher import InstructionDispatcher
+from config import (PLANNING_MODE, PLANNER_WORKERS, ALLOCATION_TIME_LIMIT, TRACING, TRACE_EXPORT, RESULTS_DIR,
+                    NODE_WORKERS, NODE_QUEUE_SIZE, NODE_DROP_POLICY, NODE_MAX_AGE_S)
+
+class _StagePublisher:
+    """
+    Publishes one request's staged results (intent, allocation, partial_plan, final or
+    failed) in order, each with a per-request sequence number and its timing: ms since
+    the request started and since the previous stage message.
+    partial_plan is per robot: its checked subplan in decomposed planning, or in joint
+    planning its steps of the checked plan up to the first one that waits for another robot.
+    """
+
+    def __init__(self, publisher, request_id):
+        self.publisher = publisher
+        self.request_id = request_id
+        self.start = self.last = time.monotonic()
+        self.seq = 0
+        self._lock = threading.Lock()
+
+    def publish(self, stage, **payload):
+        with self._lock:
+            now = time.monotonic()
+            message = dict(payload, request=self.request_id, seq=self.seq, stage=stage,
+                           elapsed_ms=round((now - self.start) * 1000, 1), stage_ms=round((now - self.last) * 1000, 1))
+            self.seq += 1
+            self.last = now
+        out_msg = String()
+        out_msg.data = json.dumps(message)
+        self.publisher.publish(out_msg)
+        return message
+
 
 class LaMMATestNode(Node):
-    def __init__(self):
+    def __init__(self, profile=None, client=None, workers=NODE_WORKERS):
         super().__init__('lamma_test_node')
-        self.client = LLMClient()
+        # Load tests pass a recorded/mock client here instead of a live LLM
+        self.client = client or LLMClient()
         self.pddl_gen = PDDLGenerator()
         self.optimizer = MILPOptimizer()
+        # Kept alive across instructions so each re-solve is warm-started; one solve at a time
+        self.allocator = IncrementalAllocator(self.optimizer)
+        self._allocator_lock = threading.Lock()
+        self.cost_model = CostModel()
         self.planner = FastDownwardClient()
+        self.decomposed = DecomposedPlanner(self.planner, self.pddl_gen, max_workers=PLANNER_WORKERS) if PLANNING_MODE == "decomposed" else None
         
         # PDDL Domain path (aligned with LaMMA-P architecture)
         self.domain_path = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             'core', 'domain.pddl'
         )
+        self.plan_checker = PlanChecker(self.domain_path)
+        self.tracer = tracing.configure(enabled=TRACING, keep_events=bool(TRACE_EXPORT))
+        # Opt-in profiling; every handled instruction counts as one trial
+        self.profiler = RunProfiler(profile, profile_dir(RESULTS_DIR, "lamma_test_node"), self.tracer).start() if profile else None
+        self.instructions_handled = 0
+        self._count_lock = threading.Lock()
 
         # ROS2 Interface
         self.subscription = self.create_subscription(
@@ -54,72 +109,167 @@ class LaMMATestNode(Node):
             10
         )
         self.publisher = self.create_publisher(String, 'lamma/action_plan', 10)
+        # Acks and progress per request: accepted / coalesced / dropped / rejected / started / done / failed
+        self.status_publisher = self.create_publisher(String, 'lamma/status', 10)
+        # Staged results as they become available, so robots can start before the final plan
+        self.stage_publisher = self.create_publisher(String, 'lamma/plan_stages', 10)
+
+        if profile and workers:
+            # The profilers only see the thread that handles instructions
+            self.get_logger().warning("Profiling handles instructions inline; ignoring the worker pool")
+            workers = 0
+        # The callback only enqueues, so the executor keeps spinning while plans are computed
+        self.dispatcher = InstructionDispatcher(self.process, workers, NODE_QUEUE_SIZE, NODE_DROP_POLICY, NODE_MAX_AGE_S,
+                                                on_status=self.publish_status) if workers else None
         self.get_logger().info("LaMMA Test Node Initialized (Hybrid Pipeline). Listening on /lamma/instruction")
 
     def listener_callback(self, msg):
         instruction = msg.data
         self.get_logger().info(f"Received instruction: {instruction}")
-        
+        if self.dispatcher:
+            self.dispatcher.submit(instruction)
+        else:
+            self.process(instruction)
+
+    def publish_status(self, status):
+        out_msg = String()
+        out_msg.data = json.dumps(status)
+        self.status_publisher.publish(out_msg)
+
+    def process(self, instruction, request_id=None):
+        """
+        Runs the full pipeline for one instruction on the calling thread.
+        :return: Outcome: 'published', 'plan_rejected', 'no_plan' or 'parse_failed'
+        """
+        self.tracer.start_trial()
+        try:
+            return self.handle_instruction(instruction, request_id)
+        finally:
+            if self.tracer.enabled:
+                self.get_logger().info(f"Stage timings: {tracing.format_stages(self.tracer.trial_stages())}")
+            with self._count_lock:
+                self.instructions_handled += 1
+                handled = self.instructions_handled
+            if self.profiler:
+                mem = self.profiler.trial_done(handled)
+                if mem:
+                    self.get_logger().info(f"Traced memory: {mem['mem_current_mb']} MB (peak {mem['mem_peak_mb']} MB)")
+
+    def shutdown(self, wait=True):
+        """
+        Stops the worker pool (finishing queued instructions if `wait`), then writes the
+        Chrome trace and profiling artifacts, if enabled.
+        """
+        if self.dispatcher:
+            self.dispatcher.close(wait=wait)
+        if self.decomposed:
+            self.decomposed.close()
+        if TRACE_EXPORT:
+            self.tracer.export_chrome(TRACE_EXPORT)
+        if self.profiler:
+            self.get_logger().info(f"Profile written to {self.profiler.out_dir}: {len(self.profiler.stop())} files")
+
+    def handle_instruction(self, instruction, request_id=None):
+        stages = _StagePublisher(self.stage_publisher, request_id)
+
         # 1. Parse via LLM (Semantic Reasoning)
         result = self.client.parse_instruction(instruction)
         
         if result['success']:
             data = result['data']
+            stages.publish("intent", robots=data.get('robots', []), tasks=data.get('tasks', []),
+                           goal_predicates=data.get('goal_predicates', []))
             
             # 2. Optimize Task Allocation (MILP)
             # Use real robots from result and assume standard costs
             robots = data.get('robots', ['limo_scout1', 'limo_heavy1'])
             tasks = data.get('tasks', [])
             
-            # Simple heuristic for travel costs: scout is faster/cheaper for search
-            costs = {}
-            for r in robots:
-                costs[r] = {}
-                for t in tasks:
-                    if "search" in t or "sense" in t:
-                        costs[r][t] = 1.0 if "scout" in r else 5.0
-                    elif "pick" in t or "place" in t:
-                        costs[r][t] = 5.0 if "scout" in r else 1.0
-                    else:
-                        costs[r][t] = 2.0
+            # Travel time/energy from robot profiles and scene geometry
+            costs = self.cost_model.build(robots, tasks, data.get('initial_state', [])).as_dict("allocation")
             
-            allocation = self.optimizer.allocate_tasks(robots, tasks, costs, {})
+            with self._allocator_lock:
+                self.allocator.sync(robots, tasks, costs)
+                allocation = self.allocator.solve(time_limit=ALLOCATION_TIME_LIMIT)
             self.get_logger().info(f"Optimized Multi-Robot Allocation: {allocation}")
+            stages.publish("allocation", allocation=allocation)
 
             # 3. Generate PDDL (Structured Planning)
             pddl_problem = self.pddl_gen.generate_problem_skeleton(data)
+            mode = "joint"
             
-            # Save temporary problem file
-            with open("temp_problem.pddl", "w") as f:
-                f.write(pddl_problem)
-            
-            # 4. Invoke Fast Downward
-            plan = self.planner.run_planner(self.domain_path, "temp_problem.pddl")
+            if self.decomposed:
+                # 4. Per-robot subproblems along the allocation, planned in parallel;
+                # each robot's checked subplan goes out as soon as it is ready
+                def on_subplan(robot, subplan, sub_problem):
+                    check = self.plan_checker.check(sub_problem, subplan)
+                    if check["valid"] and check["goal_reached"]:
+                        stages.publish("partial_plan", robot=robot, plan=subplan, provisional=True)
+
+                planned = self.decomposed.plan(self.domain_path, data, allocation, on_subplan=on_subplan)
+                plan = planned["plan"]
+                mode = planned["mode"]
+                self.get_logger().info(f"Planning mode: {mode}")
+            else:
+                # Private problem file, so concurrent instructions never overwrite each other's
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    problem_path = os.path.join(tmpdir, "problem.pddl")
+                    with tracing.span("io"), open(problem_path, "w") as f:
+                        f.write(pddl_problem)
+
+                    # 4. Invoke Fast Downward
+                    plan = self.planner.run_planner(self.domain_path, problem_path)
             
             if plan:
-                # Publish Plan
+                # Reject plans that are not executable from the generated :init
+                check = self.plan_checker.check(pddl_problem, plan)
+                if not (check["valid"] and check["goal_reached"]):
+                    self.get_logger().info(f"Plan check failed, not publishing: {check['reason']}")
+                    stages.publish("failed", reason="plan_rejected", detail=check["reason"])
+                    return "plan_rejected"
+
+                if mode == "joint":
+                    # No subplans went out: each robot can start on its steps that need no other robot
+                    for robot, prefix in schedule_plan(plan).robot_prefixes().items():
+                        stages.publish("partial_plan", robot=robot, plan=prefix, provisional=False)
+
+                # Publish Plan (also on the stage topic, closing the request's sequence)
+                final = stages.publish("final", plan=plan, allocation=allocation)
                 out_msg = String()
-                out_msg.data = json.dumps({"plan": plan, "allocation": allocation})
+                out_msg.data = json.dumps({"plan": plan, "allocation": allocation, "request": request_id,
+                                           "seq": final["seq"], "elapsed_ms": final["elapsed_ms"]})
                 self.publisher.publish(out_msg)
                 self.get_logger().info(f"Multi-robot action plan published: {plan}")
-            else:
-                self.get_logger().info("Fast Downward failed to find a plan.")
-        else:
-            self.get_logger().info("LLM failed to parse instruction.")
+                return "published"
+            self.get_logger().info("Fast Downward failed to find a plan.")
+            stages.publish("failed", reason="no_plan")
+            return "no_plan"
+        self.get_logger().info("LLM failed to parse instruction.")
+        stages.publish("failed", reason="parse_failed")
+        return "parse_failed"
 
 def main(args=None):
+    parser = argparse.ArgumentParser(description="LaMMA-P ROS2 test node")
+    parser.add_argument("--profile", type=str, default=None, choices=["cpu", "mem"], help="Per-stage cProfile + sampled stacks, or tracemalloc diffs")
+    parser.add_argument("--workers", type=int, default=NODE_WORKERS, help="Instruction worker threads (0 = handle inline in the callback)")
+    options, ros_args = parser.parse_known_args(args if args is not None else sys.argv[1:])
+
     if 'rclpy' in sys.modules:
-        rclpy.init(args=args)
-        node = LaMMATestNode()
-        rclpy.spin(node)
+        rclpy.init(args=[sys.argv[0]] + ros_args)
+        node = LaMMATestNode(profile=options.profile, workers=options.workers)
+        try:
+            rclpy.spin(node)
+        finally:
+            node.shutdown()
         node.destroy_node()
         rclpy.shutdown()
     else:
         # Manual test if rclpy is missing
-        node = LaMMATestNode()
+        node = LaMMATestNode(profile=options.profile, workers=options.workers)
         msg = String()
         msg.data = "Pick up the red block from the microwave."
         node.listener_callback(msg)
+        node.shutdown()
 
 if __name__ == '__main__':
     main()
@@ -5,17 +5,23 @@ from core.pddl_generator import PDDLGenerator
 from core.optimizer import MILPOptimizer
 from core.planner_client import FastDownwardClient
 from core.thor_controller import ThorController
+from core.decomposition import DecomposedPlanner
+from core import tracing
+from config import PLANNING_MODE, TRACING, TRACE_EXPORT, THOR_FAST, THOR_CAPTURE_FRAMES, THOR_HEADLESS
 
 def run_multi_robot_demo():
     logging.basicConfig(level=logging.INFO)
     print("🚀 Starting Heterogeneous Multi-Robot Demonstration")
+    tracer = tracing.configure(enabled=TRACING, keep_events=bool(TRACE_EXPORT))
+    tracer.start_trial()
     
     # 1. Setup
     llm = LLMClient()
     pddl_gen = PDDLGenerator()
     optimizer = MILPOptimizer()
     planner = FastDownwardClient()
-    thor = ThorController(scene="FloorPlan1", num_agents=2) # 2 robots for demo
+    thor = ThorController(scene="FloorPlan1", num_agents=2, fast=THOR_FAST, # 2 robots for demo
+                          capture_frames=THOR_CAPTURE_FRAMES, headless=THOR_HEADLESS)
     
     instruction = "limo_scout1 search for the red_block. limo_heavy1 pick it up from floor6_hallway and place it on floor2_lab workbench."
     
@@ -42,17 +48,29 @@ def run_multi_robot_demo():
     # Verification: Scout should have search, Heavy should have pick/place
 
     print("\n--- [Step 3: Symbolic Planning for Multi-Robot] ---")
-    pddl_problem = pddl_gen.generate_problem_skeleton(data)
-    with open("multi_demo_problem.pddl", "w") as f:
-        f.write(pddl_problem)
-        
-    plan = planner.run_planner("core/domain.pddl", "multi_demo_problem.pddl")
+    schedule = None
+    if PLANNING_MODE == "decomposed":
+        with DecomposedPlanner(planner, pddl_gen) as decomposed:
+            planned = decomposed.plan("core/domain.pddl", data, allocation)
+        plan = planned["plan"]
+        schedule = planned["schedule"]
+        print(f"Planning mode: {planned['mode']} (fallback: {planned['fallback_reason']})")
+    else:
+        pddl_problem = pddl_gen.generate_problem_skeleton(data)
+        with tracing.span("io"), open("multi_demo_problem.pddl", "w") as f:
+            f.write(pddl_problem)
+            
+        plan = planner.run_planner("core/domain.pddl", "multi_demo_problem.pddl")
     if plan:
         print(f"Sequential Plan Found: {plan}")
         
         print("\n--- [Step 4: AI2-THOR Multi-Robot Execution] ---")
-        # In this demo, we execute sequentially for visual clarity
-        thor.execute_plan(plan, wait_at_end=False)
+        # Both agents act at once wherever the plan allows (per-robot plans when decomposed)
+        stats = thor.execute_plan(plan, wait_at_end=False, schedule=schedule)
+        print(f"Executed {stats['actions']} actions in {stats['sim_steps']} simulator steps "
+              f"({stats['sim_s']:.2f}s simulating, {stats['wall_s']:.2f}s wall)")
+        print(f"Makespan {stats['makespan_ticks']} ticks over {stats['timesteps']} timesteps "
+              f"(sequential {stats['sequential_ticks']}, critical path {stats['critical_path_ticks']})")
         
         # New: 360 Cinematic Overview
         thor.cinematic_pan()
@@ -61,5 +79,10 @@ def run_multi_robot_demo():
     else:
         print("❌ Planning failed. Check domain/initial state.")
 
+    if tracer.enabled:
+        print(f"Stage timings: {tracing.format_stages(tracer.trial_stages())}")
+    if TRACE_EXPORT:
+        print(f"Chrome trace written to {tracer.export_chrome(TRACE_EXPORT)}")
+
 if __name__ == "__main__":
     run_multi_robot_demo()
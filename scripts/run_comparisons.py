@@ -1,7 +1,14 @@
-import subprocess
+import argparse
+import logging
 import os
 import sys
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.sweep import expand_matrix, parse_limits, run_sweep
+from config import SWEEP_PROVIDER_LIMITS, SWEEP_WORKERS
+
 # Define models to compare
 MODELS = [
     {"name": "mistral:7b", "provider": "ollama", "quantization": "Q4_K_M"},
@@ -9,30 +16,30 @@ MODELS = [
     {"name": "gpt-4o", "provider": "openai", "quantization": "none"}
 ]
 
+TESTCASES = ["floor6", "lab_maintenance", "kitchen_breakfast"]
+
 TRIALS = 5  # Default trials for quick ablation
 
-def run_ablation():
+def run_ablation(testcases=TESTCASES, trials=TRIALS, limits=SWEEP_PROVIDER_LIMITS, workers=SWEEP_WORKERS, resume=False):
     print("🚀 Starting Comparative Ablation Study...")
-    
-    for model in MODELS:
-        print(f"\n--- Evaluating Model: {model['name']} ---")
-        cmd = [
-            "python3", "evaluation/run_eval.py",
-            "--model", model["name"],
-            "--provider", model["provider"],
-            "--trials", str(TRIALS),
-            "--quantization", model["quantization"],
-            "--testcase", "lab_maintenance"
-        ]
-        
-        try:
-            subprocess.run(cmd, check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to evaluate {model['name']}: {e}")
+
+    # One in-process sweep: cloud and local models run side by side, each local model is loaded once
+    run_sweep(expand_matrix(MODELS, testcases, trials), parse_limits(limits), workers, resume=resume)
 
     print("\n📊 Generating Research Visualizations...")
-    subprocess.run(["python3", "evaluation/visualize_results.py"])
+    from evaluation.visualize_results import generate_comparison_charts
+    generate_comparison_charts()
     print("\n✅ Ablation Study Complete.")
 
 if __name__ == "__main__":
-    run_ablation()
+    parser = argparse.ArgumentParser(description="Comparative ablation over MODELS")
+    parser.add_argument("--testcases", type=str, nargs="+", default=TESTCASES)
+    parser.add_argument("--trials", type=int, default=TRIALS)
+    parser.add_argument("--limits", type=str, default=SWEEP_PROVIDER_LIMITS, help="Concurrent trials per provider, e.g. ollama=1,openai=4")
+    parser.add_argument("--workers", type=int, default=SWEEP_WORKERS, help="Global cap on in-flight trials")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted ablation, skipping finished trials")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    run_ablation(args.testcases, args.trials, args.limits, args.workers, args.resume)
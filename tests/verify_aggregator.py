@@ -0,0 +1,63 @@
+import sys
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.aggregator import QuantileSketch, StreamingAggregator, SummaryFile
+from core.logger import BenchmarkingLogger
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_quantiles_within_relative_accuracy_after_merge(self):
+        rng = random.Random(3)
+        values = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+        parts = [QuantileSketch(0.01) for _ in range(4)]
+        for i, v in enumerate(values):
+            parts[i % 4].add(v)
+        merged = QuantileSketch.from_dict(parts[0].to_dict())
+        for part in parts[1:]:
+            merged.merge(part)
+
+        self.assertEqual(merged.count, len(values))
+        self.assertAlmostEqual(merged.mean, float(np.mean(values)), places=6)
+        self.assertAlmostEqual(merged.std, float(np.std(values, ddof=1)), places=6)
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(merged.quantile(q) - exact) / exact, 0.011)
+
+
+class TestSummaryFile(unittest.TestCase):
+    def test_logger_batches_match_one_shot_aggregation(self):
+        rng = random.Random(5)
+        trials = [{"model": rng.choice(["mistral:7b", "phi:latest"]), "provider": "ollama",
+                   "quantization": rng.choice(["none", "Q4_K_M"]), "success": rng.random() < 0.7,
+                   "latency": rng.uniform(0.1, 5.0), "retries": rng.randint(0, 2), "stage_plan": rng.uniform(0, 1)}
+                  for _ in range(300)]
+        with tempfile.TemporaryDirectory() as tmp:
+            logger = BenchmarkingLogger("agg.csv", flush_every=17, results_dir=tmp, results_format="csv")
+            for trial in trials:
+                logger.log_trial(trial)
+            logger.close()
+            persisted = SummaryFile(os.path.join(tmp, "summaries.json")).load().summary()
+
+        direct = StreamingAggregator()
+        # The logger stores latency rounded to 4 decimals
+        direct.add_rows([dict(t, latency=f"{t['latency']:.4f}") for t in trials])
+        expected = direct.summary()
+
+        self.assertEqual(len(persisted), 8)  # 2 models x 2 quantizations x {parse, plan}
+        self.assertEqual([(r["model"], r["quantization"], r["stage"], r["count"]) for r in persisted],
+                         [(r["model"], r["quantization"], r["stage"], r["count"]) for r in expected])
+        for got, want in zip(persisted, expected):
+            for field in ("validity_rate", "avg_retries", "p50", "p95", "p99"):
+                self.assertAlmostEqual(got[field], want[field], places=9)
+
+if __name__ == "__main__":
+    unittest.main()
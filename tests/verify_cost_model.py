@@ -0,0 +1,63 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cost_model import CostModel, MANIPULATION_TIME_S, SENSING_TIME_S
+from core.optimizer import WH_PER_COST_UNIT
+
+# dock -- hall -- lab along corridors: dock->lab is 3 + 4 = 7 m, not the 5 m straight line
+LOCATIONS = {"dock": {"x": 0.0, "z": 0.0}, "hall": {"x": 3.0, "z": 0.0}, "lab": {"x": 3.0, "z": 4.0}}
+EDGES = [("dock", "hall"), ("hall", "lab")]
+ROBOTS = ["limo_standard_1", "limo_scout_1"]
+TASKS = ["move_to(limo_standard_1, lab)", "pick_up(box_1)", "search_lab", "inspect_unknown"]
+STATE = ["at(limo_standard_1, dock)", "at(limo_scout_1, lab)", "at(box_1, hall)"]
+
+
+class TestCostModel(unittest.TestCase):
+    def setUp(self):
+        self.model = CostModel(scene="test_rooms")
+        self.model.register_scene("test_rooms", LOCATIONS, EDGES)
+        self.standard = self.model._resolve_profile("limo_standard_1")
+        self.scout = self.model._resolve_profile("limo_scout_1")
+
+    def test_room_graph_distances(self):
+        index, distances = self.model.distance_matrix()
+        self.assertAlmostEqual(distances[index["dock"], index["lab"]], 7.0)
+        self.assertAlmostEqual(distances[index["hall"], index["lab"]], 4.0)
+
+    def test_only_at_predicates_place_entities(self):
+        state = STATE + ["atop(box_2, shelf)", "attached(gripper_1, limo_scout_1)", "AT (box_3, lab)"]
+        self.assertEqual(self.model.robot_locations_from_state(state),
+                         {"limo_standard_1": "dock", "limo_scout_1": "lab", "box_1": "hall", "box_3": "lab"})
+
+    def test_task_locations(self):
+        index, _ = self.model.distance_matrix()
+        locations = self.model._task_locations(TASKS + ["move_to(limo_1, halls)"], index,
+                                               self.model.robot_locations_from_state(STATE))
+        self.assertEqual(locations.tolist(), [index["lab"], index["hall"], index["lab"], -1, -1])
+
+    def test_matrices(self):
+        costs = self.model.build(ROBOTS, TASKS, STATE)
+        self.assertEqual(costs.time_s.shape, (2, 4))
+        self.assertEqual(costs.energy_wh.shape, (2, 4))
+
+        travel_m = np.array([[7.0, 3.0, 7.0, 0.0], [0.0, 4.0, 0.0, 0.0]])
+        speed = np.array([[self.standard["base_speed_mps"]], [self.scout["base_speed_mps"]]])
+        service = np.array([0.0, MANIPULATION_TIME_S, SENSING_TIME_S, 0.0])
+        travel_s = travel_m / speed
+        np.testing.assert_allclose(costs.time_s, travel_s + service)
+
+        move_w = np.array([[self.standard["move_power_w"]], [self.scout["move_power_w"]]])
+        idle_w = np.array([[self.standard["idle_power_w"]], [self.scout["idle_power_w"]]])
+        np.testing.assert_allclose(costs.energy_wh, (move_w * travel_s + idle_w * service) / 3600.0)
+        np.testing.assert_allclose(costs.allocation_costs, costs.energy_wh / WH_PER_COST_UNIT)
+        self.assertEqual(costs.as_dict("time")["limo_scout_1"]["pick_up(box_1)"], costs.time_s[1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
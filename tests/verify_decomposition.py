@@ -0,0 +1,83 @@
+import sys
+import os
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.decomposition import DecomposedPlanner
+from core.predicates import predicate_args, predicate_name
+
+
+def delivery(num_robots):
+    robots = [f"limo_standard_{i}" for i in range(num_robots)]
+    data = {"robots": robots, "objects": [], "initial_state": [], "goal_predicates": [], "tasks": [], "constraints": []}
+    allocation = {}
+    for i, r in enumerate(robots):
+        data["objects"].append(f"block_{i}")
+        data["initial_state"] += [f"at({r}, dock_{i})", f"at(block_{i}, room_{i}_a)"]
+        data["goal_predicates"].append(f"at(block_{i}, room_{i}_b)")
+        allocation[r] = [f"pick_up(block_{i})", f"place(block_{i}, room_{i}_b)"]
+        data["tasks"] += allocation[r]
+    return data, allocation
+
+
+class TestPredicates(unittest.TestCase):
+    def test_name_and_args(self):
+        self.assertEqual(predicate_name(" Atop(Box_1, table) "), "atop")
+        self.assertEqual(predicate_args("at(Limo_1 , Hall)"), ["limo_1", "hall"])
+        self.assertEqual(predicate_args("at(Limo_1, Hall)", lower=False), ["Limo_1", "Hall"])
+        self.assertEqual(predicate_args("pick_up_red_block"), [])
+        self.assertEqual(predicate_args("idle()"), [])
+
+
+class TestDecompose(unittest.TestCase):
+    def setUp(self):
+        # decompose/merge never touch the planner
+        self.planner = DecomposedPlanner(planner=object(), pddl_gen=object())
+
+    def test_independent_deliveries_split_per_robot(self):
+        data, allocation = delivery(3)
+        subproblems, reason = self.planner.decompose(data, allocation)
+        self.assertIsNone(reason)
+        self.assertEqual(sorted(subproblems), data["robots"])
+        sub = subproblems["limo_standard_1"]
+        self.assertEqual(sub["robots"], ["limo_standard_1"])
+        self.assertEqual(sub["goal_predicates"], ["at(block_1, room_1_b)"])
+        self.assertNotIn("at(limo_standard_0, dock_0)", sub["initial_state"])
+
+    def test_block_1_is_not_block_10(self):
+        # With 11+ robots block_1 is a prefix of block_10; each goal must still have one owner
+        data, allocation = delivery(12)
+        subproblems, reason = self.planner.decompose(data, allocation)
+        self.assertIsNone(reason)
+        self.assertEqual(len(subproblems), 12)
+        self.assertEqual(subproblems["limo_standard_1"]["goal_predicates"], ["at(block_1, room_1_b)"])
+
+    def test_free_form_task_names_still_attribute_goals(self):
+        data = {"robots": ["limo_heavy1", "limo_scout1"], "objects": ["red_block"],
+                "initial_state": ["at(red_block, hallway)"], "goal_predicates": ["at(red_block, lab)"]}
+        subproblems, reason = self.planner.decompose(data, {"limo_heavy1": ["pick_up_red_block"], "limo_scout1": ["search_hallway"]})
+        self.assertIsNone(reason)
+        self.assertEqual(list(subproblems), ["limo_heavy1"])
+
+    def test_shared_object_falls_back(self):
+        data, allocation = delivery(2)
+        data["goal_predicates"].append("on(block_0, block_1)")
+        allocation["limo_standard_1"].append("stack(block_0, block_1)")
+        subproblems, reason = self.planner.decompose(data, allocation)
+        self.assertIsNone(subproblems)
+        self.assertIn("candidate robots", reason)
+
+    def test_single_robot_is_not_decomposed(self):
+        data, allocation = delivery(1)
+        self.assertEqual(self.planner.decompose(data, allocation), (None, "single robot"))
+
+    def test_merge_interleaves_by_timestep(self):
+        merged = DecomposedPlanner.merge({"r2": ["b1", "b2", "b3"], "r1": ["a1", "a2"]})
+        self.assertEqual(merged, ["a1", "b1", "a2", "b2", "b3"])
+        self.assertEqual(DecomposedPlanner.merge({}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dispatcher import InstructionDispatcher
+
+
+class BlockingHandler:
+    """
+    Handler that holds every call until released, recording the instructions it ran.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, instruction, request_id):
+        self.calls.append(instruction)
+        self.release.wait(5)
+        return "published"
+
+
+class TestDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.handler = BlockingHandler()
+        self.statuses = []
+
+    def make(self, **kwargs):
+        return InstructionDispatcher(self.handler, on_status=self.statuses.append, **kwargs)
+
+    def wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertTrue(predicate())
+
+    def test_submit_does_not_block(self):
+        dispatcher = self.make(workers=1)
+        start = time.monotonic()
+        first = dispatcher.submit("go to the lab")
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertEqual(self.statuses[0]["status"], "accepted")
+        self.handler.release.set()
+        self.assertEqual(first.wait(2), "published")
+        dispatcher.close()
+
+    def test_identical_instructions_are_coalesced(self):
+        dispatcher = self.make(workers=2)
+        first = dispatcher.submit("pick up the box")
+        second = dispatcher.submit("  pick up   the box ")
+        self.assertIs(first, second)
+        self.handler.release.set()
+        first.wait(2)
+        dispatcher.close()
+        self.assertEqual(self.handler.calls, ["pick up the box"])
+        self.assertEqual(first.coalesced, [2])
+        # Once finished, the same instruction is computed again
+        dispatcher = self.make(workers=1)
+        dispatcher.submit("pick up the box").wait(2)
+        dispatcher.close()
+        self.assertEqual(len(self.handler.calls), 2)
+
+    def test_oldest_policy_drops_longest_waiting(self):
+        dispatcher = self.make(workers=1, queue_size=2, policy="oldest")
+        running = dispatcher.submit("a")
+        self.wait_for(lambda: self.handler.calls == ["a"])
+        b, c, d = dispatcher.submit("b"), dispatcher.submit("c"), dispatcher.submit("d")
+        self.assertEqual(b.wait(0), "dropped")
+        self.handler.release.set()
+        dispatcher.close()
+        self.assertEqual(self.handler.calls, ["a", "c", "d"])
+        self.assertEqual([running.outcome, c.outcome, d.outcome], ["published"] * 3)
+
+    def test_newest_policy_rejects_incoming(self):
+        dispatcher = self.make(workers=1, queue_size=1, policy="newest")
+        dispatcher.submit("a")
+        self.wait_for(lambda: self.handler.calls == ["a"])
+        dispatcher.submit("b")
+        rejected = dispatcher.submit("c")
+        self.assertEqual(rejected.outcome, "dropped")
+        self.assertEqual(self.statuses[-1]["status"], "rejected")
+        self.handler.release.set()
+        dispatcher.close()
+        self.assertEqual(self.handler.calls, ["a", "b"])
+
+    def test_supersede_keeps_only_latest_waiting(self):
+        dispatcher = self.make(workers=1, policy="supersede")
+        dispatcher.submit("a")
+        self.wait_for(lambda: self.handler.calls == ["a"])
+        for name in "bcd":
+            dispatcher.submit(name)
+        self.handler.release.set()
+        dispatcher.close()
+        self.assertEqual(self.handler.calls, ["a", "d"])
+        self.assertEqual(dispatcher.counts["dropped"], 2)
+
+    def test_stale_requests_are_dropped(self):
+        dispatcher = self.make(workers=1, max_age=0.05)
+        dispatcher.submit("a")
+        self.wait_for(lambda: self.handler.calls == ["a"])
+        stale = dispatcher.submit("b")
+        time.sleep(0.1)
+        self.handler.release.set()
+        self.assertEqual(stale.wait(2), "dropped")
+        dispatcher.close()
+        self.assertEqual(self.handler.calls, ["a"])
+        self.assertIn("stale", [s.get("reason") for s in self.statuses])
+
+
+class TestNodeMockMode(unittest.TestCase):
+    def test_callback_acks_and_publishes_from_workers(self):
+        from scripts import lamma_test_node
+        if hasattr(lamma_test_node, "rclpy"):
+            self.skipTest("rclpy installed; this covers the mock mode")
+        from evaluation.load_test import RecordedLLMClient
+        data = {"tasks": ["navigate(limo_1, lab_door)"], "robots": ["limo_1"], "objects": [],
+                "initial_state": ["at(limo_1, floor6_charging_dock)"], "constraints": [],
+                "goal_predicates": ["at(limo_1, lab_door)"]}
+        node = lamma_test_node.LaMMATestNode(client=RecordedLLMClient([data], latency=0.2), workers=2)
+        statuses = []
+        node.status_publisher.publish = lambda msg: statuses.append(msg.data)
+        msg = lamma_test_node.String()
+        msg.data = "Go to the lab door"
+        start = time.monotonic()
+        node.listener_callback(msg)
+        node.listener_callback(msg)
+        self.assertLess(time.monotonic() - start, 0.1)
+        node.shutdown()
+        kinds = [s.split('"status": "')[1].split('"')[0] for s in statuses]
+        # The worker may start the first request before the duplicate arrives; it is coalesced either way
+        self.assertEqual(kinds[0], "accepted")
+        self.assertEqual(kinds.count("coalesced"), 1)
+        self.assertEqual(kinds.count("started"), 1)
+        self.assertEqual(kinds[-1], "done")
+        self.assertEqual(node.instructions_handled, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import subprocess
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("openai", "pydantic", "pulp", "pyarrow", "pandas", "matplotlib", "ai2thor")
+
+# Entry point -> (statement run in a fresh interpreter, module to time, cumulative budget in ms,
+# heavy packages that must not be loaded by the import alone).
+# Budgets are ~2-3x the warm import time on a dev laptop; scale them with IMPORT_BUDGET_SCALE on slow CI.
+ENTRY_POINTS = {
+    "run_eval": ("import evaluation.run_eval", "evaluation.run_eval", 600, HEAVY),
+    "ros_node": ("import sys; sys.path.insert(0, 'scripts'); import lamma_test_node", "lamma_test_node", 500, HEAVY),
+    "visualizer": ("import evaluation.visualize_results", "evaluation.visualize_results", 300, HEAVY),
+    "llm_client": ("import core.llm_client", "core.llm_client", 250, HEAVY),
+    "thor_controller": ("import core.thor_controller", "core.thor_controller", 400, ("ai2thor",)),
+}
+
+
+def import_profile(statement: str):
+    """
+    Runs `statement` under `python -X importtime`.
+    :return: {module name: cumulative microseconds} for every module imported.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(f"'{statement}' failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestImportTime(unittest.TestCase):
+    def test_entry_points_do_not_load_heavy_dependencies(self):
+        for entry, (statement, _, _, forbidden) in ENTRY_POINTS.items():
+            with self.subTest(entry=entry):
+                loaded = import_profile(statement)
+                self.assertEqual([pkg for pkg in forbidden if pkg in loaded], [])
+
+    def test_entry_points_within_budget(self):
+        scale = float(os.getenv("IMPORT_BUDGET_SCALE", "1"))
+        for entry, (statement, module, budget_ms, _) in ENTRY_POINTS.items():
+            with self.subTest(entry=entry):
+                # Best of three: the first run may still be writing .pyc files
+                best = min(import_profile(statement)[module] for _ in range(3)) / 1000
+                self.assertLess(best, budget_ms * scale, f"{entry} imports in {best:.0f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
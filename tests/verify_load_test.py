@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.load_test import poisson_arrivals, trace_arrivals, load_trace, drive, summarize, is_saturated
+
+
+def _service(seconds):
+    return lambda instruction: time.sleep(seconds)
+
+
+class TestArrivals(unittest.TestCase):
+    def test_poisson_is_seeded_and_hits_the_rate(self):
+        arrivals = poisson_arrivals(50, 20, seed=1)
+        self.assertEqual(arrivals, poisson_arrivals(50, 20, seed=1))
+        self.assertAlmostEqual(len(arrivals) / 20, 50, delta=5)
+        self.assertTrue(all(b >= a for a, b in zip(arrivals, arrivals[1:])))
+
+    def test_trace_is_rescaled_to_the_rate(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("100.0\n100.1\n100.2\n103.0\n")
+        try:
+            trace = load_trace(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(trace[0], 0.0)
+        arrivals = trace_arrivals(trace, rate=10, duration=4)
+        self.assertAlmostEqual(len(arrivals) / 4, 10, delta=1)
+        # The burst shape survives: three close arrivals, then a long gap
+        self.assertLess(arrivals[1] - arrivals[0], arrivals[3] - arrivals[2])
+
+
+class TestOpenLoopDriver(unittest.TestCase):
+    def test_below_capacity_has_little_queueing(self):
+        row = summarize(drive(_service(0.01), poisson_arrivals(20, 1.0), ["go"]), 20, 1.0)
+        self.assertFalse(is_saturated(row))
+        self.assertLess(row["queue_p50_s"], 0.02)
+
+    def test_overload_builds_a_queue(self):
+        # 20ms service caps the single worker at 50 req/s; offer 150
+        row = summarize(drive(_service(0.02), poisson_arrivals(150, 1.0), ["go"], drain_timeout=0.2), 150, 1.0)
+        self.assertTrue(is_saturated(row))
+        self.assertGreater(row["unfinished"], 0)
+        self.assertGreater(row["e2e_p99_s"], 0.2)
+
+    def test_more_workers_raise_capacity(self):
+        arrivals = poisson_arrivals(100, 1.0, seed=2)
+        one = summarize(drive(_service(0.02), arrivals, ["go"], workers=1, drain_timeout=0.2), 100, 1.0)
+        four = summarize(drive(_service(0.02), arrivals, ["go"], workers=4, drain_timeout=0.2), 100, 1.0)
+        self.assertGreater(four["completed"], one["completed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
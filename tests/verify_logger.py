@@ -0,0 +1,135 @@
+import sys
+import os
+import csv
+import tempfile
+import threading
+import unittest
+import multiprocessing
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.logger import BenchmarkingLogger, BASE_HEADERS
+from core import results_store
+from evaluation.migrate_results import migrate
+
+
+def _log_from_process(results_dir, worker, count):
+    logger = BenchmarkingLogger("shared.csv", flush_every=7, results_dir=results_dir)
+    for i in range(count):
+        logger.log_trial({"model": f"proc{worker}", "success": True, "latency": 0.1, "trial_index": i})
+    logger.close()
+
+
+class TestBufferedLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.results_dir = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_rows(self, filename):
+        with open(os.path.join(self.results_dir, filename), newline='') as f:
+            return list(csv.DictReader(f))
+
+    def test_extra_fields_extend_schema(self):
+        logger = BenchmarkingLogger("schema.csv", results_dir=self.results_dir)
+        logger.log_trial({"model": "m", "success": True, "latency": 1.0})
+        logger.flush()
+        logger.log_trial({"model": "m", "success": True, "latency": 2.0, "planning_success": True,
+                          "plan_length": 5, "data": {"tasks": []}})
+        logger.close()
+
+        rows = self.read_rows("schema.csv")
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(list(rows[0].keys()), BASE_HEADERS + ["planning_success", "plan_length"])
+        self.assertEqual(rows[0]["plan_length"], "")
+        self.assertEqual(rows[1]["plan_length"], "5")
+
+    def test_concurrent_threads_lose_nothing(self):
+        logger = BenchmarkingLogger("threads.csv", flush_every=10, flush_interval=0.05, results_dir=self.results_dir)
+
+        def worker(w):
+            for i in range(200):
+                logger.log_trial({"model": f"t{w}", "success": True, "latency": 0.0, "trial_index": i})
+
+        threads = [threading.Thread(target=worker, args=(w,)) for w in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        logger.close()
+
+        rows = self.read_rows("threads.csv")
+        self.assertEqual(len(rows), 1600)
+        self.assertEqual(len({(r["model"], r["trial_index"]) for r in rows}), 1600)
+
+    def test_concurrent_processes_share_one_file(self):
+        procs = [multiprocessing.Process(target=_log_from_process, args=(self.results_dir, w, 50)) for w in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        rows = self.read_rows("shared.csv")
+        self.assertEqual(len(rows), 200)
+        self.assertEqual(len({(r["model"], r["trial_index"]) for r in rows}), 200)
+
+    @unittest.skipUnless(results_store.available(), "pyarrow not installed")
+    def test_store_receives_typed_partitioned_rows(self):
+        logger = BenchmarkingLogger("store.csv", results_dir=self.results_dir, results_format="both")
+        for i in range(6):
+            logger.log_trial({"model": "mistral:7b" if i % 2 else "gpt-4o", "provider": "ollama",
+                              "instruction_id": "floor6", "success": True, "latency": 0.5 * i, "plan_length": i})
+        logger.close()
+
+        store = results_store.ResultsStore(os.path.join(self.results_dir, "store"))
+        df = store.read(columns=["model", "latency", "plan_length"], filters={"model": "mistral:7b"})
+        self.assertEqual(sorted(df["latency"].tolist()), [0.5, 1.5, 2.5])
+        self.assertEqual(set(df["model"]), {"mistral:7b"})
+        self.assertEqual(len(store.read(columns=["model"], filters={"testcase": "floor6"})), 6)
+        self.assertEqual(len(self.read_rows("store.csv")), 6)
+
+    @unittest.skipUnless(results_store.available(), "pyarrow not installed")
+    def test_close_compacts_own_store_batches(self):
+        store_dir = os.path.join(self.results_dir, "store")
+        other = results_store.ResultsStore(store_dir)
+        other.write([{"model": "gpt-4o", "success": True, "latency": 9.0}], basename="other-run")
+
+        logger = BenchmarkingLogger("compact.csv", results_dir=self.results_dir, results_format="parquet")
+        for i in range(5):
+            logger.log_trial({"model": "gpt-4o", "success": True, "latency": float(i)})
+            logger.flush()
+        logger.close()
+
+        files = sorted(f for _, _, names in os.walk(store_dir) for f in names if f.endswith(".parquet"))
+        self.assertEqual(len(files), 2)
+        self.assertTrue(files[0].startswith("compact-"))
+        self.assertEqual(files[1], "other-run-0.parquet")
+        self.assertEqual(sorted(other.read(columns=["latency"])["latency"]), [0.0, 1.0, 2.0, 3.0, 4.0, 9.0])
+
+    @unittest.skipUnless(results_store.available(), "pyarrow not installed")
+    def test_migrate_skips_rows_the_logger_stored(self):
+        logger = BenchmarkingLogger("results_both.csv", results_dir=self.results_dir, results_format="both")
+        for i in range(5):
+            logger.log_trial({"model": "gpt-4o", "instruction_id": "floor6", "success": True, "run_id": "r1", "trial_index": i})
+        logger.close()
+        # History from before the store existed
+        history = BenchmarkingLogger("results_old.csv", results_dir=self.results_dir, results_format="csv")
+        for i in range(3):
+            history.log_trial({"model": "mistral:7b", "instruction_id": "floor6", "success": False, "trial_index": i})
+        history.close()
+
+        store = results_store.ResultsStore(os.path.join(self.results_dir, "store"))
+        for _ in range(2):
+            migrate(self.results_dir)
+            self.assertEqual(len(store.read(columns=["model"])), 8)
+        migrate(self.results_dir, compact=True)
+        migrate(self.results_dir)
+        df = store.read(columns=["model", "trial_index"])
+        self.assertEqual(len(df), 8)
+        self.assertEqual(len(df[df["model"] == "mistral:7b"]), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import sys
+import os
+import time
+import random
+import unittest
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.optimizer import MILPOptimizer, IncrementalAllocator
+
+ROBOT_KINDS = ["limo_scout", "limo_heavy", "limo_standard", "turtlebot3"]
+TASK_VERBS = ["pick_up", "place_on", "open", "search_for", "detect", "move_to", "inspect"]
+
+
+def random_instance(rng: random.Random):
+    robots = [f"{rng.choice(ROBOT_KINDS)}_{i}" for i in range(rng.randint(1, 5))]
+    tasks = [f"{rng.choice(TASK_VERBS)}_obj{j}" for j in range(rng.randint(0, 9))]
+    scale = rng.choice([1.0, 4.0, 9.0])  # larger scales make battery constraints bind
+    costs = {r: {t: rng.uniform(0.1, scale) for t in tasks} for r in robots}
+    return robots, tasks, costs
+
+
+def total_cost(allocation, costs):
+    return sum(costs[r][t] for r, ts in allocation.items() for t in ts)
+
+
+class TestFastAllocationEquivalence(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = MILPOptimizer()
+
+    def solve_with_cbc(self, robots, tasks, costs):
+        cost_matrix = np.array([[costs[r][t] for t in tasks] for r in robots], dtype=float).reshape(len(robots), len(tasks))
+        profiles = [self.optimizer._resolve_profile(r) for r in robots]
+        return self.optimizer._solve_cbc(
+            robots, tasks, cost_matrix,
+            self.optimizer._capability_mask(profiles, tasks),
+            self.optimizer._battery_capacities(profiles)
+        )
+
+    def test_matches_cbc_on_random_instances(self):
+        rng = random.Random(1234)
+        solvers = set()
+        for _ in range(150):
+            robots, tasks, costs = random_instance(rng)
+            fast = self.optimizer.allocate_tasks(robots, tasks, costs, {})
+            solvers.add(self.optimizer.last_solver)
+            reference = self.solve_with_cbc(robots, tasks, costs)
+
+            # Continuous random costs give a unique optimum, so allocations match exactly
+            self.assertEqual(
+                {r: sorted(ts) for r, ts in fast.items()},
+                {r: sorted(ts) for r, ts in reference.items()},
+                msg=f"robots={robots} tasks={tasks}"
+            )
+            self.assertAlmostEqual(total_cost(fast, costs), total_cost(reference, costs), places=6)
+
+        # The suite must exercise every dispatch branch
+        self.assertEqual(solvers, {"fast", "cbc", "infeasible"})
+
+    def test_single_robot_over_capacity_is_infeasible(self):
+        costs = {"limo_scout_1": {"move_to_a": 6.0, "move_to_b": 6.0}}
+        allocation = self.optimizer.allocate_tasks(["limo_scout_1"], ["move_to_a", "move_to_b"], costs, {})
+        self.assertEqual(self.optimizer.last_solver, "infeasible")
+        self.assertEqual(allocation, {"limo_scout_1": []})
+
+    def test_capability_only_assignment_skips_cbc(self):
+        robots = ["limo_scout1", "limo_heavy1"]
+        tasks = ["search_red_block", "pick_up_red_block", "move_to_lab", "place_on_workbench"]
+        costs = {
+            "limo_scout1": {"search_red_block": 1.0, "pick_up_red_block": 10.0, "move_to_lab": 2.0, "place_on_workbench": 10.0},
+            "limo_heavy1": {"search_red_block": 5.0, "pick_up_red_block": 2.0, "move_to_lab": 5.0, "place_on_workbench": 2.0}
+        }
+        allocation = self.optimizer.allocate_tasks(robots, tasks, costs, {})
+        self.assertEqual(self.optimizer.last_solver, "fast")
+        self.assertEqual(allocation["limo_scout1"], ["search_red_block", "move_to_lab"])
+        self.assertEqual(allocation["limo_heavy1"], ["pick_up_red_block", "place_on_workbench"])
+
+class TestIncrementalAllocator(unittest.TestCase):
+    def test_streaming_updates_match_cold_solves(self):
+        rng = random.Random(42)
+        optimizer = MILPOptimizer()
+        allocator = IncrementalAllocator(optimizer, initial_slots=2)
+        robots = ["limo_scout_0", "limo_heavy_1", "limo_standard_2", "limo_standard_3"]
+        active = robots[:2]
+        tasks, costs = [], {r: {} for r in robots}
+        for r in active:
+            allocator.add_robot(r, {})
+
+        for step in range(60):
+            op = rng.random()
+            if op < 0.5 or not tasks:
+                t = f"{rng.choice(TASK_VERBS)}_obj{step}"
+                tasks.append(t)
+                for r in robots:
+                    costs[r][t] = rng.uniform(0.5, 6.0)
+                allocator.add_task(t, {r: costs[r][t] for r in active})
+            elif op < 0.7:
+                t = tasks.pop(rng.randrange(len(tasks)))
+                allocator.remove_task(t)
+            elif op < 0.8:
+                r = rng.choice(robots)
+                if r in active and len(active) > 1:
+                    active.remove(r)
+                    allocator.remove_robot(r)
+                elif r not in active:
+                    active.append(r)
+                    allocator.add_robot(r, {t: costs[r][t] for t in tasks})
+            else:
+                t, r = rng.choice(tasks), rng.choice(active)
+                costs[r][t] = rng.uniform(0.5, 6.0)
+                allocator.update_cost(r, t, costs[r][t])
+
+            incremental = allocator.solve()
+            cold = optimizer.allocate_tasks(allocator.robots, tasks, costs, {})
+            self.assertEqual(sum(map(len, incremental.values())), sum(map(len, cold.values())))
+            self.assertAlmostEqual(total_cost(incremental, costs), total_cost(cold, costs), places=6)
+
+    def test_deadline_returns_incumbent(self):
+        # Every robot prefers the same tasks, so the greedy fast path overloads robot 0 and CBC
+        # has to run; at this size it cannot prove optimality within the deadline
+        rng = random.Random(1)
+        robots = [f"limo_standard_{i}" for i in range(8)]
+        tasks = [f"move_to_p{j}" for j in range(120)]
+        base = {t: rng.uniform(0.5, 1.5) for t in tasks}
+        scale = 15.0 * len(robots) / sum(base.values()) * 0.9
+        costs = {r: {t: base[t] * scale * (1 + 0.05 * i) * rng.uniform(0.9, 1.1) for t in tasks}
+                 for i, r in enumerate(robots)}
+        allocator = IncrementalAllocator()
+        allocator.sync(robots, tasks, costs)
+
+        time_limit = 0.5
+        start = time.perf_counter()
+        allocation = allocator.solve(time_limit=time_limit)
+        elapsed = time.perf_counter() - start
+
+        # CBC start-up and model I/O come on top of its own time limit
+        self.assertLess(elapsed, time_limit + 1.0)
+        self.assertIn(allocator.last_solver, ("cbc_timeout", "incumbent"))
+        self.assertEqual(allocation, {r: [t for t in tasks if allocator.incumbent[t] == r] for r in robots})
+        self.assertEqual(sorted(allocator.incumbent), sorted(tasks))
+        capacity = allocator.optimizer._battery_capacities([allocator.optimizer._resolve_profile(r) for r in robots])
+        for i, r in enumerate(robots):
+            self.assertLessEqual(sum(costs[r][t] for t in allocation[r]), capacity[i] + 1e-6)
+
+if __name__ == "__main__":
+    unittest.main()
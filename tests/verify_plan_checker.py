@@ -0,0 +1,64 @@
+import sys
+import os
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plan_checker import PlanChecker
+
+PROBLEM = """(define (problem deliver)
+  (:domain lamma_p_domain)
+  (:objects
+    limo_heavy1 - robot
+    red_block hallway lab - target)
+  (:init
+    (at limo_heavy1 hallway)
+    (at red_block hallway)
+    (can_manipulate limo_heavy1))
+  (:goal (and
+      (at red_block lab))))
+"""
+
+PLAN = ["pick_up limo_heavy1 red_block hallway", "move_to limo_heavy1 hallway lab", "place limo_heavy1 red_block lab"]
+
+
+class TestPlanChecker(unittest.TestCase):
+    def setUp(self):
+        self.checker = PlanChecker()
+
+    def test_valid_plan_reaches_goal(self):
+        check = self.checker.check(PROBLEM, PLAN)
+        self.assertEqual((check["valid"], check["goal_reached"], check["failed_step"]), (True, True, None))
+        self.assertEqual(check["steps"], 3)
+
+    def test_reports_first_failing_step(self):
+        # Placing in the lab before moving there: step 2 needs (at limo_heavy1 lab)
+        plan = [PLAN[0], "place limo_heavy1 red_block lab", PLAN[1]]
+        check = self.checker.check(PROBLEM, plan)
+        self.assertFalse(check["valid"])
+        self.assertFalse(check["goal_reached"])
+        self.assertEqual(check["failed_step"], 1)
+        self.assertEqual(check["steps"], 1)
+        self.assertIn("step 2 'place limo_heavy1 red_block lab'", check["reason"])
+        self.assertIn("unsatisfied precondition (at limo_heavy1 lab)", check["reason"])
+
+    def test_repeated_pick_and_unknown_action(self):
+        check = self.checker.check(PROBLEM, [PLAN[0], PLAN[0]])
+        self.assertEqual(check["failed_step"], 1)
+        self.assertIn("unsatisfied precondition (at red_block hallway)", check["reason"])
+
+        check = self.checker.check(PROBLEM, ["fly limo_heavy1 lab"])
+        self.assertEqual(check["failed_step"], 0)
+        self.assertIn("unknown action 'fly'", check["reason"])
+
+    def test_executable_plan_that_misses_goal(self):
+        check = self.checker.check(PROBLEM, PLAN[:2])
+        self.assertTrue(check["valid"])
+        self.assertFalse(check["goal_reached"])
+        self.assertIsNone(check["failed_step"])
+        self.assertEqual(check["reason"], "goal not reached: (at red_block lab)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import robot_profiles
+from core.robot_profiles import ProfileRegistry
+from core.optimizer import MILPOptimizer
+from core.pddl_generator import PDDLGenerator
+
+PROFILES = {
+    "limo_heavy": {"capabilities": ["can_manipulate"], "battery_capacity_wh": 200},
+    "limo_heavy_xl": {"capabilities": ["can_manipulate"], "battery_capacity_wh": 400},
+    "limo_scout": {"capabilities": ["can_sense"], "battery_capacity_wh": 100},
+    "limo_standard": {"capabilities": ["can_sense", "can_manipulate"], "battery_capacity_wh": 150},
+}
+
+
+class TestProfileRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "robot_profiles.json")
+        self.write(PROFILES)
+
+    def tearDown(self):
+        robot_profiles.configure()
+        self.tmpdir.cleanup()
+
+    def write(self, profiles, bump_ns=0):
+        with open(self.path, 'w') as f:
+            json.dump(profiles, f)
+        if bump_ns:
+            # Coarse filesystem timestamps could otherwise hide an edit made within the same tick
+            stat = os.stat(self.path)
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+
+    def test_longest_prefix_resolution_and_memo(self):
+        snapshot = ProfileRegistry(self.path).snapshot()
+        self.assertEqual(snapshot.resolve("limo_heavy_xl_2")["battery_capacity_wh"], 400)
+        self.assertEqual(snapshot.resolve("limo_heavy_2")["battery_capacity_wh"], 200)
+        self.assertEqual(snapshot.resolve("my_limo_scout")["capabilities"], ["can_sense"])
+        self.assertEqual(snapshot.resolve("robot1")["battery_capacity_wh"], 150)
+        self.assertIs(snapshot.resolve("limo_heavy_2"), snapshot.resolve("limo_heavy_2"))
+
+    def test_hot_reload_swaps_snapshot(self):
+        registry = ProfileRegistry(self.path, check_interval=0.0)
+        before = registry.snapshot()
+        self.assertIs(registry.snapshot(), before)
+
+        self.write(dict(PROFILES, limo_scout={"capabilities": ["can_sense", "can_manipulate"]}), bump_ns=10 ** 9)
+        after = registry.snapshot()
+        self.assertEqual(after.version, before.version + 1)
+        self.assertIn("can_manipulate", after.resolve("limo_scout1")["capabilities"])
+        # A snapshot held across the reload keeps its own version
+        self.assertEqual(before.resolve("limo_scout1")["capabilities"], ["can_sense"])
+
+        with open(self.path, 'w') as f:
+            f.write("{ not json")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+        self.assertIs(registry.snapshot().profiles, after.profiles)
+
+    def test_consumers_follow_the_shared_registry(self):
+        robot_profiles.configure(self.path, check_interval=0.0)
+        optimizer, generator = MILPOptimizer(), PDDLGenerator()
+        data = {"robots": ["limo_scout1"], "goal_predicates": ["at(limo_scout1, lab_door)"]}
+        self.assertNotIn("(can_manipulate limo_scout1)", generator.generate_problem_skeleton(data))
+
+        self.write(dict(PROFILES, limo_scout={"capabilities": ["can_manipulate"], "battery_capacity_wh": 100}),
+                   bump_ns=10 ** 9)
+        self.assertIn("(can_manipulate limo_scout1)", generator.generate_problem_skeleton(data))
+        allocation = optimizer.allocate_tasks(["limo_scout1"], ["pick_up_box"], {"limo_scout1": {"pick_up_box": 1.0}}, {})
+        self.assertEqual(allocation, {"limo_scout1": ["pick_up_box"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
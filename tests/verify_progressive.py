@@ -0,0 +1,98 @@
+import sys
+import os
+import json
+import stat
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.decomposition import DecomposedPlanner
+from core.planner_client import FastDownwardClient
+from evaluation.bench_decomposed_planning import make_delivery_scenario, DOMAIN_PATH
+
+# Stand-in for fast-downward.py: a one-step plan naming the problem it was given
+FAKE_PLANNER = """#!/usr/bin/env python3
+import sys
+name = open(sys.argv[-1]).read().split("(problem ")[1].split(")")[0]
+open("sas_plan", "w").write("(step " + name + ")\\n; cost = 1\\n")
+"""
+
+# Stand-in for fast-downward.py that solves the single-robot navigation problem below
+JOINT_PLANNER = """#!/usr/bin/env python3
+open("sas_plan", "w").write("(move_to limo_1 floor6_charging_dock lab_door)\\n; cost = 1\\n")
+"""
+
+
+class TestSubplanCallback(unittest.TestCase):
+    def test_each_robot_subplan_is_reported_before_the_merge(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            planner_path = os.path.join(tmpdir, "fake_fd.py")
+            with open(planner_path, "w") as f:
+                f.write(FAKE_PLANNER)
+            os.chmod(planner_path, os.stat(planner_path).st_mode | stat.S_IEXEC)
+
+            data, _ = make_delivery_scenario(3)
+            allocation = {r: [t for t in data["tasks"] if f"block_{i}" in t] for i, r in enumerate(data["robots"])}
+            reported = {}
+            with DecomposedPlanner(FastDownwardClient(planner_path), max_workers=2) as planner:
+                result = planner.plan(DOMAIN_PATH, data, allocation,
+                                      on_subplan=lambda r, plan, problem: reported.setdefault(r, (plan, problem)))
+        self.assertEqual(result["mode"], "decomposed")
+        self.assertEqual(sorted(reported), sorted(data["robots"]))
+        for robot, (plan, problem) in reported.items():
+            self.assertEqual(plan, [f"step robotics_task_{robot}"])
+            self.assertIn(f"robotics_task_{robot}", problem)
+        self.assertEqual(list(result["schedule"]), data["robots"])
+
+
+class TestNodeStages(unittest.TestCase):
+    def test_stage_messages_are_sequenced_and_timed(self):
+        from scripts import lamma_test_node
+        if hasattr(lamma_test_node, "rclpy"):
+            self.skipTest("rclpy installed; this covers the mock mode")
+        from evaluation.load_test import RecordedLLMClient
+        data = {"tasks": ["navigate(limo_1, lab_door)"], "robots": ["limo_1"], "objects": [],
+                "initial_state": ["at(limo_1, floor6_charging_dock)"], "constraints": [],
+                "goal_predicates": ["at(limo_1, lab_door)"]}
+        node = lamma_test_node.LaMMATestNode(client=RecordedLLMClient([data]), workers=0)
+        node.planner.executable_path = "/nonexistent/fast-downward.py"
+        messages = []
+        node.stage_publisher.publish = lambda msg: messages.append(json.loads(msg.data))
+        self.assertEqual(node.process("Go to the lab door", request_id=7), "no_plan")
+        node.shutdown()
+        self.assertEqual([m["stage"] for m in messages], ["intent", "allocation", "failed"])
+        self.assertEqual([m["seq"] for m in messages], [0, 1, 2])
+        self.assertTrue(all(m["request"] == 7 for m in messages))
+        elapsed = [m["elapsed_ms"] for m in messages]
+        self.assertEqual(elapsed, sorted(elapsed))
+        self.assertEqual(messages[1]["allocation"], {"limo_1": ["navigate(limo_1, lab_door)"]})
+
+    def test_joint_plan_publishes_robot_prefixes(self):
+        from scripts import lamma_test_node
+        if hasattr(lamma_test_node, "rclpy"):
+            self.skipTest("rclpy installed; this covers the mock mode")
+        from evaluation.load_test import RecordedLLMClient
+        data = {"tasks": ["navigate(limo_1, lab_door)"], "robots": ["limo_1"], "objects": [],
+                "initial_state": ["at(limo_1, floor6_charging_dock)"], "constraints": [],
+                "goal_predicates": ["at(limo_1, lab_door)"]}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            planner_path = os.path.join(tmpdir, "fake_fd.py")
+            with open(planner_path, "w") as f:
+                f.write(JOINT_PLANNER)
+            os.chmod(planner_path, os.stat(planner_path).st_mode | stat.S_IEXEC)
+            node = lamma_test_node.LaMMATestNode(client=RecordedLLMClient([data]), workers=0)
+            node.planner.executable_path = planner_path
+            messages = []
+            node.stage_publisher.publish = lambda msg: messages.append(json.loads(msg.data))
+            outcome = node.process("Go to the lab door", request_id=8)
+            node.shutdown()
+        self.assertEqual(outcome, "published")
+        self.assertEqual([m["stage"] for m in messages], ["intent", "allocation", "partial_plan", "final"])
+        self.assertEqual(messages[2]["robot"], "limo_1")
+        self.assertEqual(messages[2]["plan"], messages[3]["plan"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.parse_corpus import ParseCorpus
+from evaluation.replay_corpus import replay, compare_to_baseline
+
+DATA = {"tasks": ["navigate(limo_1, lab_door)"], "robots": ["limo_1"], "objects": [],
+        "initial_state": ["at(limo_1, floor6_charging_dock)"], "constraints": [],
+        "goal_predicates": ["at(limo_1, lab_door)"]}
+
+
+def _parse(data, model="fake:1b"):
+    return {"data": data, "success": True, "provider": "ollama", "model": model, "quantization": "none"}
+
+
+class TestParseCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "corpus.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_records_distinct_successful_parses_once(self):
+        corpus = ParseCorpus(self.path)
+        self.assertTrue(corpus.record(_parse(DATA), "floor6"))
+        self.assertFalse(corpus.record(_parse(DATA, model="other:7b"), "floor6"))
+        self.assertTrue(corpus.record(_parse(DATA), "lab_maintenance"))
+        self.assertFalse(corpus.record(dict(_parse(DATA), success=False), "kitchen_breakfast"))
+        # A reopened corpus still deduplicates, and skips a torn final line
+        with open(self.path, "a") as f:
+            f.write('{"id": "torn')
+        reopened = ParseCorpus(self.path)
+        self.assertEqual(len(reopened), 2)
+        self.assertFalse(reopened.record(_parse(DATA), "floor6"))
+        self.assertEqual([e["testcase"] for e in reopened.entries(testcases=["floor6"])], ["floor6"])
+
+    def test_concurrent_records_do_not_interleave(self):
+        corpus = ParseCorpus(self.path)
+        threads = [threading.Thread(target=lambda k=k: [corpus.record(_parse(dict(DATA, constraints=[f"c{k}_{i}"])), "floor6")
+                                                      for i in range(25)]) for k in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 100)
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay_reports_stage_timings(self):
+        entries = [{"id": "a", "testcase": "floor6", "data": DATA}]
+        summary = replay(entries, planning="joint", repeats=3, warmup=1)
+        self.assertEqual(summary["trials"], 3)
+        self.assertIn("stage_milp", summary["stages"])
+        self.assertIn("stage_validate", summary["stages"])
+
+    def test_baseline_regressions(self):
+        baseline = {"stages": {"stage_milp": {"median": 0.010}, "stage_planner": {"median": 0.0001}}}
+        current = {"stages": {"stage_milp": {"median": 0.020}, "stage_planner": {"median": 0.0005}}}
+        regressions = compare_to_baseline(current, baseline, tolerance=0.25, min_delta=0.001)
+        # The planner is 5x slower but only by 0.4ms, below the noise floor
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("stage_milp"))
+        self.assertEqual(compare_to_baseline(current, baseline, tolerance=1.5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
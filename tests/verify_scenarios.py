@@ -0,0 +1,51 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.scenario_generator import generate_scenario, write_testcase
+from core.cost_model import CostModel
+from core.pddl_generator import PDDLGenerator
+from core.plan_checker import PlanChecker
+
+
+class TestScenarioGenerator(unittest.TestCase):
+    def test_same_seed_same_scenario(self):
+        self.assertEqual(generate_scenario(6, 10, 12, 5, seed=3), generate_scenario(6, 10, 12, 5, seed=3))
+        self.assertNotEqual(generate_scenario(6, 10, 12, 5, seed=3)["initial_state"],
+                            generate_scenario(6, 10, 12, 5, seed=4)["initial_state"])
+
+    def test_reference_plan_reaches_goals(self):
+        for seed in range(5):
+            scenario = generate_scenario(robots=3, objects=12, rooms=16, goals=7, seed=seed)
+            problem = PDDLGenerator().generate_problem_skeleton(scenario["expected_output"])
+            check = PlanChecker().check(problem, scenario["reference_plan"])
+            self.assertTrue(check["valid"] and check["goal_reached"], check["reason"])
+
+    def test_write_testcase_files(self):
+        scenario = generate_scenario(seed=1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            write_testcase(scenario, tmpdir)
+            self.assertEqual(sorted(os.listdir(tmpdir)), ["expected_output.json", "initial_state.json",
+                                                          "instruction.txt", "reference_plan.json"])
+            with open(os.path.join(tmpdir, "initial_state.json")) as f:
+                self.assertEqual(json.load(f)["scene"], scenario["name"])
+
+
+class TestRegisterScene(unittest.TestCase):
+    def test_distances_follow_corridors(self):
+        # a - b - c in a line, plus d next to a but only reachable through c
+        rooms = {"a": {"x": 0, "z": 0}, "b": {"x": 1, "z": 0}, "c": {"x": 2, "z": 0}, "d": {"x": 0, "z": 1}}
+        model = CostModel(scene="corridors")
+        model.register_scene("corridors", rooms, [["a", "b"], ["b", "c"], ["c", "d"]])
+        index, _, distances = model._distance_cache["corridors"]
+        self.assertAlmostEqual(distances[index["a"], index["c"]], 2.0)
+        self.assertAlmostEqual(distances[index["a"], index["d"]], 2.0 + 5 ** 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
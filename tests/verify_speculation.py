@@ -0,0 +1,120 @@
+import sys
+import os
+import json
+import stat
+import time
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.partial_json import PartialJSONObject
+from core.llm_client import LLMClient
+from evaluation.trials import TrialRunner
+
+DATA = {"robots": ["limo_1"], "objects": ["lab_door"], "initial_state": ["at(limo_1, floor6_charging_dock)"],
+        "goal_predicates": ["at(limo_1, lab_door)"], "tasks": ["navigate(limo_1, lab_door)"], "constraints": []}
+
+# Stand-in for fast-downward.py: slow enough that overlapping it with generation shows
+FAKE_PLANNER = """#!/usr/bin/env python3
+import time
+time.sleep(0.3)
+open("sas_plan", "w").write("(move_to limo_1 floor6_charging_dock lab_door)\\n; cost = 1\\n")
+"""
+
+
+class FakeStream:
+    """
+    OpenAI-style chat.completions.create(stream=True): the goal fields arrive at once,
+    'tasks' and 'constraints' only after `tail_delay` seconds.
+    """
+
+    def __init__(self, content, tail_delay=0.4):
+        self.content = content
+        self.tail_delay = tail_delay
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        assert kwargs.get("stream")
+        self.calls.append(kwargs)
+        split = self.content.index('"tasks"')
+        for k, part in enumerate([self.content[:split], self.content[split:]]):
+            if k:
+                time.sleep(self.tail_delay)
+            for i in range(0, len(part), 16):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part[i:i + 16]))])
+
+
+class TestPartialJSON(unittest.TestCase):
+    def test_fields_close_in_order_for_any_chunking(self):
+        doc = "```json\n" + json.dumps(DATA) + "\n```"
+        for size in (1, 5, len(doc)):
+            scanner, order = PartialJSONObject(), []
+            for i in range(0, len(doc), size):
+                order += list(scanner.feed(doc[i:i + size]))
+            self.assertEqual(scanner.fields, DATA)
+            self.assertEqual(order, list(DATA))
+            self.assertTrue(scanner.closed)
+
+
+class TestStreamedParse(unittest.TestCase):
+    def test_stream_and_plain_parse_share_prompt_and_retries(self):
+        client = LLMClient(provider="ollama", model="fake:1b")
+        stream = client.client = FakeStream(json.dumps(DATA), tail_delay=0.0)
+        seen = []
+        result = client.parse_instruction_stream("Go to the lab door", on_fields=seen.append)
+        self.assertEqual((result["success"], result["retries"]), (True, 0))
+        self.assertEqual(seen[-1], DATA)
+
+        plain = []
+
+        def create(**kwargs):
+            plain.append(kwargs)
+            content = "not json" if len(plain) == 1 else json.dumps(DATA)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        result = client.parse_instruction("Go to the lab door")
+        self.assertEqual((result["success"], result["retries"], result["data"]["robots"]), (True, 1, ["limo_1"]))
+        # The no-speculation baseline is measured on the same prompt as the streamed parse
+        self.assertEqual(plain[0]["messages"], stream.calls[0]["messages"])
+        self.assertEqual(plain[1]["messages"], plain[0]["messages"])
+
+
+class TestSpeculativeTrial(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        planner_path = os.path.join(self.tmpdir.name, "fake_fd.py")
+        with open(planner_path, "w") as f:
+            f.write(FAKE_PLANNER)
+        os.chmod(planner_path, os.stat(planner_path).st_mode | stat.S_IEXEC)
+        self.runner = TrialRunner(planning="joint", planner_path=planner_path)
+        self.client = LLMClient(provider="ollama", model="fake:1b")
+
+    def tearDown(self):
+        self.runner.close()
+        self.tmpdir.cleanup()
+
+    def test_confirmed_plan_arrives_before_sequential_time(self):
+        self.client.client = FakeStream(json.dumps(DATA))
+        result = self.runner.run_trial_speculative(self.client, "Go to the lab door", {}, "floor6", "none")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["speculation"], "confirmed")
+        self.assertTrue(result["plan_valid"])
+        # Planning (0.3s) overlapped the 0.4s tail of the stream
+        self.assertLess(result["time_to_plan_s"], result["time_to_plan_nospec_s"] - 0.2)
+
+    def test_invalid_final_response_discards_speculation(self):
+        broken = {k: v for k, v in DATA.items() if k != "constraints"}
+        self.client.client = FakeStream(json.dumps(broken), tail_delay=0.0)
+        result = self.runner.run_trial_speculative(self.client, "Go to the lab door", {}, "floor6", "none")
+        self.assertFalse(result["success"])
+        self.assertEqual(result["speculation"], "discarded")
+        self.assertNotIn("plan_valid", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pipeline import Stage, StagedPipeline
+from evaluation.trials import PipelinedTrialRunner
+
+
+def _sleeper(seconds):
+    def fn(item):
+        time.sleep(seconds)
+        return item + [seconds]
+    return fn
+
+
+class FakeClient:
+    provider, model = "ollama", "fake:1b"
+
+    def parse_instruction(self, prompt):
+        time.sleep(0.01)
+        data = {"tasks": ["navigate(limo_1, lab_door)"], "robots": ["limo_1"], "objects": [],
+                "initial_state": ["at(limo_1, floor6_charging_dock)"], "constraints": [],
+                "goal_predicates": ["at(limo_1, lab_door)"]}
+        return {"data": data, "latency": 0.01, "retries": 0, "success": True, "provider": self.provider, "model": self.model}
+
+
+class TestStagedPipeline(unittest.TestCase):
+    def test_results_in_input_order(self):
+        # Random-ish per-item delays in a 4-worker stage finish out of order
+        pipeline = StagedPipeline([Stage("slow", lambda i: (time.sleep(0.001 * ((i * 7) % 5)), i)[1], workers=4),
+                                   Stage("double", lambda i: i * 2, workers=2)])
+        out = [item for item, error in pipeline.run(range(40))]
+        self.assertEqual(out, [i * 2 for i in range(40)])
+
+    def test_throughput_tracks_slowest_stage(self):
+        stages = [Stage("llm", _sleeper(0.02)), Stage("milp", _sleeper(0.01)), Stage("planner", _sleeper(0.02))]
+        n = 30
+        start = time.perf_counter()
+        out = list(StagedPipeline(stages).run([] for _ in range(n)))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(out), n)
+        sequential = n * 0.05
+        self.assertLess(elapsed, 0.75 * sequential)
+
+    def test_backpressure_bounds_items_in_flight(self):
+        admitted = []
+        lock = threading.Lock()
+
+        def source():
+            for i in range(50):
+                with lock:
+                    admitted.append(i)
+                yield i
+
+        pipeline = StagedPipeline([Stage("a", lambda i: i), Stage("b", lambda i: (time.sleep(0.005), i)[1])],
+                                  queue_size=1, max_inflight=4)
+        for item, _ in pipeline.run(source()):
+            with lock:
+                # The feeder can be at most max_inflight items (plus the one it holds) ahead of the consumer
+                self.assertLessEqual(len(admitted) - item, 5)
+
+    def test_failed_item_skips_later_stages(self):
+        def boom(i):
+            if i == 3:
+                raise ValueError("bad item")
+            return i
+
+        pipeline = StagedPipeline([Stage("check", boom), Stage("square", lambda i: i * i)])
+        out = list(pipeline.run(range(5)))
+        self.assertEqual([item for item, _ in out], [0, 1, 4, 3, 16])
+        self.assertIsInstance(out[3][1], ValueError)
+        self.assertTrue(all(error is None for i, (_, error) in enumerate(out) if i != 3))
+
+
+class TestPipelinedTrials(unittest.TestCase):
+    def test_rows_in_trial_order_with_stage_timings(self):
+        runner = PipelinedTrialRunner(FakeClient(), "Go to the lab door", {"initial_state": []}, "floor6", "none",
+                                      planning="joint", llm_workers=2, milp_workers=1, plan_workers=2)
+        try:
+            rows = list(runner.run(range(6)))
+        finally:
+            runner.close()
+        self.assertEqual([i for i, _, _ in rows], list(range(6)))
+        for _, result, error in rows:
+            self.assertIsNone(error)
+            self.assertTrue(result["optimization_success"])
+            self.assertIn("stage_milp", result)
+            self.assertIn("stage_validate", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
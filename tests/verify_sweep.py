@@ -0,0 +1,148 @@
+import sys
+import os
+import csv
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.checkpoint import Checkpoint, run_id
+from evaluation import sweep
+from evaluation.sweep import SweepRunner, cross_matrix, expand_matrix, parse_limits
+
+
+class FlakyClient:
+    """
+    Fails every trial of the model named 'flaky' until `healthy` is set, like an Ollama OOM mid-sweep.
+    """
+    healthy = False
+
+    def __init__(self, provider, model):
+        self.provider, self.model = provider, model
+
+    def parse_instruction(self, prompt):
+        if self.model == "flaky" and not FlakyClient.healthy:
+            raise RuntimeError("model runner crashed")
+        return {"data": {}, "latency": 0.01, "retries": 0, "success": False, "provider": self.provider, "model": self.model}
+
+
+class FakeClient:
+    """
+    Stands in for LLMClient: records concurrency per provider and the order models are called in.
+    """
+    lock = threading.Lock()
+    in_flight = {}
+    peak = {}
+    calls = []
+
+    def __init__(self, provider, model):
+        self.provider, self.model = provider, model
+
+    def parse_instruction(self, prompt):
+        cls = FakeClient
+        with cls.lock:
+            cls.in_flight[self.provider] = cls.in_flight.get(self.provider, 0) + 1
+            cls.peak[self.provider] = max(cls.peak.get(self.provider, 0), cls.in_flight[self.provider])
+            cls.calls.append((self.provider, self.model))
+        time.sleep(0.01)
+        with cls.lock:
+            cls.in_flight[self.provider] -= 1
+        return {"data": {}, "latency": 0.01, "retries": 0, "success": False, "provider": self.provider, "model": self.model}
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        FakeClient.in_flight, FakeClient.peak, FakeClient.calls = {}, {}, []
+        patcher = patch.object(sweep, "LLMClient", FakeClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_matrix_expansion(self):
+        cells = cross_matrix(["a", "b"], ["ollama"], ["none", "Q4_K_M"], ["floor6", "lab_maintenance"], 3)
+        self.assertEqual(len(cells), 2 * 2 * 2 * 3)
+        self.assertEqual(parse_limits("ollama=1, openai=4"), {"ollama": 1, "openai": 4})
+
+    def test_limits_grouping_and_output(self):
+        models = [{"name": "local_a", "provider": "ollama"}, {"name": "local_b", "provider": "ollama"},
+                  {"name": "cloud", "provider": "openai"}]
+        cells = expand_matrix(models, ["floor6", "lab_maintenance"], 4)
+        runner = SweepRunner({"ollama": 1, "openai": 3}, planning="joint", results_dir=self.tmpdir.name, progress=False)
+        summary = runner.run(cells)
+
+        self.assertEqual((summary["completed"], summary["failed"]), (len(cells), 0))
+        self.assertEqual(FakeClient.peak["ollama"], 1)
+        self.assertLessEqual(FakeClient.peak["openai"], 3)
+        # Local models are not interleaved: all of local_a, then all of local_b
+        local = [model for provider, model in FakeClient.calls if provider == "ollama"]
+        self.assertEqual(local, ["local_a"] * 8 + ["local_b"] * 8)
+
+        with open(os.path.join(self.tmpdir.name, "results_cloud_none.csv"), newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sorted(r["instruction_id"] for r in rows), ["floor6"] * 4 + ["lab_maintenance"] * 4)
+        self.assertIn("stage_validate", rows[0])
+
+    def test_unknown_testcase_counts_as_failed(self):
+        cells = expand_matrix([{"name": "m", "provider": "openai"}], ["no_such_testcase"], 2)
+        summary = SweepRunner({"openai": 2}, results_dir=self.tmpdir.name, progress=False).run(cells)
+        self.assertEqual((summary["completed"], summary["failed"]), (0, 2))
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.ckpt_dir = os.path.join(self.tmpdir.name, "checkpoints")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_run_id_is_deterministic(self):
+        self.assertEqual(run_id(model="m", testcase="floor6"), run_id(testcase="floor6", model="m"))
+        self.assertNotEqual(run_id(model="m", testcase="floor6"), run_id(model="m", testcase="kitchen_breakfast"))
+
+    def test_journal_survives_torn_line_and_concurrent_marks(self):
+        ckpt = Checkpoint("run-x", self.ckpt_dir, resume=False)
+        threads = [threading.Thread(target=lambda t=t: [ckpt.mark(f"cell{t}_{i}") for i in range(50)]) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with open(ckpt.path, 'a') as f:
+            f.write('{"cell": "half-writ')
+        self.assertEqual(len(Checkpoint("run-x", self.ckpt_dir).completed()), 200)
+        self.assertEqual(Checkpoint("run-x", self.ckpt_dir, resume=False).completed(), set())
+
+    @patch.object(sweep, "LLMClient", FlakyClient)
+    def test_resume_runs_only_missing_cells(self):
+        models = [{"name": "steady", "provider": "openai"}, {"name": "flaky", "provider": "ollama"}]
+        cells = expand_matrix(models, ["floor6"], 5)
+        run = sweep.sweep_run_id(cells, "joint")
+
+        FlakyClient.healthy = False
+        first = SweepRunner({"ollama": 1, "openai": 2}, results_dir=self.tmpdir.name, progress=False,
+                            checkpoint=Checkpoint(run, self.ckpt_dir, resume=False)).run(cells)
+        self.assertEqual((first["completed"], first["failed"]), (5, 5))
+
+        FlakyClient.healthy = True
+        second = SweepRunner({"ollama": 1, "openai": 2}, results_dir=self.tmpdir.name, progress=False,
+                             checkpoint=Checkpoint(run, self.ckpt_dir, resume=True)).run(cells)
+        self.assertEqual((second["completed"], second["skipped"]), (5, 5))
+
+        # Every cell has exactly one row across both runs
+        for model in ("steady", "flaky"):
+            with open(os.path.join(self.tmpdir.name, f"results_{model}_none.csv"), newline='') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(sorted(int(r["trial_index"]) for r in rows), list(range(5)))
+            self.assertEqual({r["run_id"] for r in rows}, {run})
+        self.assertEqual(len(Checkpoint(run, self.ckpt_dir).completed()), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
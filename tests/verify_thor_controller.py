@@ -0,0 +1,160 @@
+import sys
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import thor_controller
+from core.thor_controller import ThorController
+from core.frame_writer import FrameWriter
+from core.step_scheduler import schedule_plan
+
+PLAN = [
+    "(move_to limo_heavy1 floor6_charging_dock floor6_hallway)",
+    "(pick_up limo_heavy1 red_block floor6_hallway)",
+    "(move_to limo_heavy1 floor6_hallway floor2_lab)",
+    "(place limo_heavy1 red_block floor2_lab)",
+]
+
+
+class _AgentEvent:
+    def __init__(self):
+        self.frame = np.zeros((6, 8, 3), dtype=np.uint8)
+        self.third_party_camera_frames = [np.full((6, 8, 3), 255, dtype=np.uint8)]
+        self.metadata = {"agent": {"position": {"x": 0.0, "y": 0.9, "z": 0.0}}}
+
+
+class _MultiEvent:
+    def __init__(self, agents):
+        self.events = [_AgentEvent() for _ in range(agents)]
+
+
+class FakeController:
+    """
+    Stand-in for ai2thor.controller.Controller: records every step and returns fresh frames.
+    """
+
+    def __init__(self, agents=1):
+        self.agents = agents
+        self.actions = []
+        self.last_event = _MultiEvent(agents)
+
+    def step(self, **action):
+        self.actions.append(action)
+        self.last_event = _MultiEvent(self.agents)
+        return self.last_event
+
+
+class TestFastExecution(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_fast_mode_never_sleeps(self):
+        fake = FakeController()
+        thor = ThorController(fast=True, controller=fake, frame_dir=self.tmpdir.name)
+        with mock.patch.object(thor_controller.time, "sleep", side_effect=AssertionError("slept in fast mode")):
+            stats = thor.execute_plan(PLAN, wait_at_end=True)
+        # Initial placement + one teleport per move + one rotation per pick/place
+        self.assertEqual(stats["sim_steps"], 1 + 4)
+        self.assertEqual(stats["actions"], 4)
+        self.assertEqual(stats["paused_s"], 0.0)
+        self.assertEqual(stats["frames_queued"], 0)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_visual_mode_keeps_interpolation(self):
+        thor = ThorController(controller=FakeController(), capture_frames=False)
+        with mock.patch.object(thor_controller.time, "sleep"):
+            stats = thor.execute_plan(PLAN, wait_at_end=False)
+        self.assertEqual(stats["sim_steps"], 1 + 2 * thor_controller.MOVE_INTERPOLATION_STEPS + 2 * 3)
+        self.assertGreater(stats["paused_s"], 4 * thor_controller.STEP_PAUSE_S)
+
+    def test_frames_written_in_background(self):
+        frame_dir = os.path.join(self.tmpdir.name, "frames")
+        thor = ThorController(fast=True, capture_frames=True, controller=FakeController(), frame_dir=frame_dir,
+                              max_pending_frames=1)
+        stats = thor.execute_plan(PLAN, wait_at_end=False)
+        self.assertEqual(stats["frames_queued"], 2 * len(PLAN))
+        self.assertEqual(stats["frames_written"], 2 * len(PLAN))
+        self.assertIn("demo_step_4_overview.png", os.listdir(frame_dir))
+
+    def test_frame_writer_bounds_pending_frames(self):
+        def slow_write(frame, path):
+            time.sleep(0.02)
+            with writer._lock:
+                writer.written += 1
+            writer._slots.release()
+
+        with FrameWriter(self.tmpdir.name, workers=1, max_pending=2) as writer:
+            writer._write = slow_write
+            for i in range(6):
+                writer.submit(np.zeros((2, 2, 3), dtype=np.uint8), f"f{i}.png")
+                # Frames submitted but not yet written never exceed max_pending
+                self.assertLessEqual(i + 1 - writer.written, 2)
+            writer.flush()
+            self.assertEqual(writer.written, 6)
+            self.assertGreater(writer.blocked_s, 0.0)
+
+
+# limo_heavy2 picks up the box only after limo_heavy1 has put it down in the lab
+HANDOVER_PLAN = [
+    "(move_to limo_heavy1 floor6_charging_dock floor6_hallway)",
+    "(move_to limo_heavy2 floor6_charging_dock floor2_lab)",
+    "(pick_up limo_heavy1 red_block floor6_hallway)",
+    "(move_to limo_heavy1 floor6_hallway floor2_lab)",
+    "(place limo_heavy1 red_block floor2_lab)",
+    "(pick_up limo_heavy2 red_block floor2_lab)",
+    "(move_to limo_heavy2 floor2_lab floor6_hallway)",
+]
+
+
+class TestConcurrentExecution(unittest.TestCase):
+    def test_dependencies_and_timesteps(self):
+        steps = schedule_plan(HANDOVER_PLAN)
+        deps = {a.index: a.deps for a in steps.actions}
+        # Shared places do not order robots; the handed-over block does
+        self.assertEqual(deps[1], set())
+        self.assertEqual(deps[5], {1, 4})
+        self.assertEqual([[a.index for a in t] for t in steps.timesteps], [[0, 1], [2], [3], [4], [5], [6]])
+        self.assertEqual(steps.critical_path({a.index: 1 for a in steps.actions}), 6)
+        # limo_heavy2 has to wait for the handover after its first move
+        self.assertEqual(steps.robot_prefixes(), {"limo_heavy1": [HANDOVER_PLAN[i] for i in (0, 2, 3, 4)],
+                                                  "limo_heavy2": [HANDOVER_PLAN[1]]})
+
+    def test_makespan_reaches_critical_path(self):
+        fake = FakeController(agents=2)
+        thor = ThorController(num_agents=2, fast=True, controller=fake)
+        stats = thor.execute_plan(HANDOVER_PLAN, wait_at_end=False)
+        self.assertTrue(stats["concurrent"])
+        self.assertEqual(stats["sequential_ticks"], 7)
+        self.assertEqual(stats["makespan_ticks"], stats["critical_path_ticks"])
+        self.assertEqual(stats["makespan_ticks"], 6)
+        # Placement teleports, then both agents' first moves issued back to back in one tick
+        self.assertEqual([a.get("agentId") for a in fake.actions[3:5]], [0, 1])
+        steps = [(a["action"], a["agentId"]) for a in fake.actions[3:]]
+        self.assertLess(steps.index(("RotateLeft", 0)), steps.index(("RotateRight", 1)))
+
+    def test_per_robot_schedule_runs_in_parallel(self):
+        schedule = {r: [f"(move_to {r} floor6_charging_dock floor6_hallway)", f"(pick_up {r} box_{r} floor6_hallway)",
+                        f"(move_to {r} floor6_hallway floor2_lab)", f"(place {r} box_{r} floor2_lab)"]
+                    for r in ("limo_heavy1", "limo_heavy2")}
+        thor = ThorController(num_agents=2, controller=FakeController(agents=2), capture_frames=False)
+        with mock.patch.object(thor_controller.time, "sleep"):
+            stats = thor.execute_plan([], wait_at_end=False, schedule=schedule)
+        per_robot = 2 * thor_controller.MOVE_INTERPOLATION_STEPS + 2 * 3
+        self.assertEqual(stats["actions"], 8)
+        self.assertEqual(stats["sequential_ticks"], 2 * per_robot)
+        self.assertEqual(stats["makespan_ticks"], per_robot)
+        self.assertEqual(stats["sim_steps"], 2 + 2 * per_robot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import tracing
+from core.tracing import Tracer
+from core.optimizer import MILPOptimizer
+from core.profiling import RunProfiler
+
+
+class TestTracing(unittest.TestCase):
+    def tearDown(self):
+        tracing.configure(enabled=False, keep_events=False)
+        tracing.get_tracer().reset()
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(enabled=False, keep_events=True)
+        totals = tracer.start_trial()
+        with tracer.span("milp"):
+            pass
+        self.assertEqual(totals, {})
+        self.assertEqual(tracer.events, [])
+
+    def test_nested_spans_sum_per_trial_and_export(self):
+        tracer = tracing.configure(enabled=True, keep_events=True)
+        tracer.start_trial()
+        with tracing.span("planner"):
+            with tracing.span("planner.subprocess", alias="lama-first"):
+                time.sleep(0.01)
+        MILPOptimizer().allocate_tasks(["limo_1", "limo_2"], ["pick_up(a)", "move_to(b)"],
+                                       {"limo_1": {"pick_up(a)": 1, "move_to(b)": 2},
+                                        "limo_2": {"pick_up(a)": 2, "move_to(b)": 1}}, {})
+        stages = tracer.trial_stages()
+
+        self.assertGreaterEqual(stages["stage_planner"], stages["stage_planner.subprocess"])
+        self.assertGreaterEqual(stages["stage_planner.subprocess"], 0.01)
+        self.assertIn("stage_milp", stages)
+        self.assertIn("stage_milp.fast", stages)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(tracer.export_chrome(os.path.join(tmp, "trace.json"))) as f:
+                events = [e for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+        outer = next(e for e in events if e["name"] == "planner")
+        inner = next(e for e in events if e["name"] == "planner.subprocess")
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+        self.assertEqual(inner["args"], {"alias": "lama-first"})
+
+    def test_concurrent_trials_keep_separate_breakdowns(self):
+        tracer = tracing.configure(enabled=True)
+        results = {}
+
+        def trial(name, delay):
+            tracer.start_trial()
+            with tracing.span("llm"):
+                time.sleep(delay)
+            results[name] = tracer.trial_stages()
+
+        threads = [threading.Thread(target=trial, args=(n, d)) for n, d in (("fast", 0.01), ("slow", 0.05))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLess(results["fast"]["stage_llm"], 0.04)
+        self.assertGreaterEqual(results["slow"]["stage_llm"], 0.05)
+
+    def test_cpu_profile_per_stage_and_collapsed_stacks(self):
+        tracer = tracing.configure(enabled=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            with RunProfiler("cpu", tmp, tracer, sample_interval=0.001):
+                for _ in range(3):
+                    with tracing.span("milp"):
+                        with tracing.span("milp.fast"):
+                            deadline = time.perf_counter() + 0.02
+                            while time.perf_counter() < deadline:
+                                sum(range(1000))
+            files = set(os.listdir(tmp))
+            with open(os.path.join(tmp, "cpu_samples.collapsed")) as f:
+                stacks = [line.rsplit(" ", 1) for line in f.read().splitlines()]
+        self.assertIn("cpu_milp.prof", files)
+        self.assertIn("cpu_milp.txt", files)
+        self.assertNotIn("cpu_milp.fast.prof", files)
+        self.assertTrue(any(stack.startswith("milp;") and int(n) > 0 for stack, n in stacks))
+        self.assertEqual(tracer.hooks, [])
+
+    def test_mem_profile_diffs_growth_between_trials(self):
+        retained = []
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = RunProfiler("mem", tmp, mem_trials=(1, 3)).start()
+            for trial in range(1, 5):
+                retained.append(bytearray(512 * 1024))
+                row = profiler.trial_done(trial)
+            paths = profiler.stop()
+            with open(os.path.join(tmp, "mem_diff_trial1_trial3.txt")) as f:
+                report = f.read()
+        self.assertIn("mem_current_mb", row)
+        self.assertEqual(len(paths), 3)
+        self.assertIn("verify_tracing.py", report.splitlines()[2])
+
+    def test_profiler_restores_tracer_state(self):
+        for was_enabled in (False, True):
+            tracer = Tracer(enabled=was_enabled)
+            with tempfile.TemporaryDirectory() as tmp:
+                with RunProfiler("cpu", tmp, tracer, sample_interval=0.001):
+                    self.assertTrue(tracer.enabled)
+            self.assertEqual(tracer.enabled, was_enabled)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+import os
+import random
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.validator import PlanValidator, CompiledPlanValidator
+
+OBJECTS = ["apple", "box", "fridge", "microwave", "coffee_machine", ""]
+ACTIONS = ["pick_up", "place", "drop", "open", "close", "switch_on", "switch_off", "move_to", "navigate", "wave"]
+PREDICATES = ["closed", "opened", "switchedon", "switchedoff", "at"]
+
+
+def random_task(rng: random.Random) -> str:
+    action = rng.choice(ACTIONS)
+    args = ", ".join(rng.choice(OBJECTS) for _ in range(rng.randint(1, 2)))
+    task = f"{action}({args})"
+    # Exercise the grammar: casing, padding, prose around the call, unparseable entries
+    variant = rng.random()
+    if variant < 0.1:
+        return task.upper()
+    if variant < 0.2:
+        return f"  then {task} now "
+    if variant < 0.25:
+        return action
+    return task
+
+
+def random_initial_state(rng: random.Random):
+    preds = [f"{rng.choice(PREDICATES)}({rng.choice(OBJECTS[:-1])})" for _ in range(rng.randint(0, 4))]
+    preds += [f"inside({rng.choice(OBJECTS[:2])}, {rng.choice(OBJECTS[2:4])})" for _ in range(rng.randint(0, 2))]
+    return preds
+
+
+class TestCompiledValidatorEquivalence(unittest.TestCase):
+    def test_identical_verdicts_on_random_sequences(self):
+        rng = random.Random(7)
+        compiled = CompiledPlanValidator()
+        verdicts = set()
+        for _ in range(3000):
+            tasks = [random_task(rng) for _ in range(rng.randint(0, 8))]
+            init = random_initial_state(rng)
+            expected = PlanValidator.validate_task_sequence(tasks, init)
+            self.assertEqual(compiled.validate(tasks, init), expected, msg=f"tasks={tasks} init={init}")
+            verdicts.add(expected)
+        self.assertEqual(verdicts, {True, False})
+
+    def test_batch_matches_single_and_pool(self):
+        rng = random.Random(11)
+        init = ["closed(fridge)", "inside(apple, fridge)"]
+        sequences = [[random_task(rng) for _ in range(rng.randint(0, 6))] for _ in range(500)]
+        expected = [PlanValidator.validate_task_sequence(t, init) for t in sequences]
+
+        compiled = CompiledPlanValidator()
+        self.assertEqual(compiled.validate_batch(sequences, init), expected)
+        self.assertEqual(compiled.validate_batch(sequences, init, workers=2, chunksize=100), expected)
+        self.assertEqual(compiled.validate_batch([(t, init) for t in sequences]), expected)
+
+    def test_caches_are_bounded(self):
+        rng = random.Random(13)
+        compiled = CompiledPlanValidator(max_tasks=16, max_inits=4)
+        for _ in range(500):
+            tasks = [random_task(rng) for _ in range(rng.randint(0, 8))]
+            init = random_initial_state(rng)
+            self.assertEqual(compiled.validate(tasks, init), PlanValidator.validate_task_sequence(tasks, init))
+        self.assertLessEqual(len(compiled._ops), 16)
+        self.assertLessEqual(len(compiled._inits), 4)
+
+if __name__ == "__main__":
+    unittest.main()